@@ -0,0 +1,120 @@
+"""
+api.blocking
+------------
+
+This module contains blocking, thread-safe facades over the
+asynchronous API clients. Every facade runs its coroutines on one
+shared background event loop thread, so sessions, warm connections
+and rate limiter state survive between calls.
+"""
+
+import asyncio
+import atexit
+import functools
+import inspect
+import threading
+import typing
+import weakref
+
+class _LoopThread:
+  def __init__ (self):
+    self.loop = asyncio.new_event_loop()
+    self.thread = threading.Thread(target = self._run, name = 'cpt-event-loop', daemon = True)
+    self.thread.start()
+
+  def _run (self):
+    asyncio.set_event_loop(self.loop)
+    self.loop.run_forever()
+
+  def run (self, coroutine: typing.Awaitable, timeout: float = None) -> typing.Any:
+    if threading.current_thread() is self.thread:
+      raise RuntimeError('blocking call made from the background event loop thread')
+    return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+_loop_thread: _LoopThread = None
+_loop_thread_lock = threading.Lock()
+_clients = weakref.WeakSet()
+
+def get_loop_thread () -> _LoopThread:
+  global _loop_thread
+  with _loop_thread_lock:
+    if _loop_thread is None:
+      _loop_thread = _LoopThread()
+      atexit.register(_shutdown)
+  return _loop_thread
+
+def _shutdown ():
+  for client in list(_clients):
+    client.close()
+  _loop_thread.loop.call_soon_threadsafe(_loop_thread.loop.stop)
+
+class BlockingClient:
+  def __init__ (self, factory: typing.Callable[..., typing.Any], *args, **kwargs):
+    async def construct ():
+      # clients that open a session in __init__ must do so on the background loop
+      return factory(*args, **kwargs)
+
+    self._loop_thread = get_loop_thread()
+    self._client = self._loop_thread.run(construct())
+    self._closed = False
+    _clients.add(self)
+
+  def __getattr__ (self, name: str) -> typing.Any:
+    attribute = getattr(self._client, name)
+    if inspect.isasyncgenfunction(attribute):
+      @functools.wraps(attribute)
+      def iterating (*args, **kwargs):
+        return self._iterate(attribute(*args, **kwargs))
+      return iterating
+    if not asyncio.iscoroutinefunction(attribute):
+      return attribute
+
+    @functools.wraps(attribute)
+    def blocking (*args, **kwargs):
+      return self._loop_thread.run(attribute(*args, **kwargs))
+    return blocking
+
+  def _iterate (self, generator: typing.AsyncGenerator) -> typing.Iterator:
+    # async generators (paginate) become plain iterators, every item is pulled
+    # on the background loop and an abandoned iteration closes the generator there
+    async def next_item ():
+      return await generator.__anext__()
+
+    async def close ():
+      await generator.aclose()
+
+    try:
+      while True:
+        try:
+          item = self._loop_thread.run(next_item())
+        except StopAsyncIteration:
+          return
+        yield item
+    finally:
+      self._loop_thread.run(close())
+
+  def close (self) -> None:
+    if self._closed:
+      return
+    self._closed = True
+    if hasattr(self._client, 'close'):
+      self._loop_thread.run(self._client.close())
+
+  def __enter__ (self):
+    return self
+
+  def __exit__ (self, exc_type, exc_val, exc_tb):
+    self.close()
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} {self._client!r}>'
+
+class BlockingCodeforcesAPI (BlockingClient):
+  def __init__ (self, **kwargs):
+    from .codeforces.codeforces import CodeforcesAPI
+    super().__init__(CodeforcesAPI, **kwargs)
+
+class BlockingLeetcodeAPI (BlockingClient):
+  def __init__ (self, **kwargs):
+    from .leetcode.leetcode import LeetcodeAPI
+    super().__init__(LeetcodeAPI, **kwargs)
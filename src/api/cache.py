@@ -0,0 +1,60 @@
+"""
+api.cache
+---------
+
+This module contains the on-disk cache shared by the API clients.
+Entries are JSON files below $CPT_CACHE_DIR (default ~/.cache/cpt)
+and are written atomically, so concurrent clones never observe a
+half written entry.
+"""
+
+import os
+import tempfile
+import typing
+
+from . import jsoncodec, profiling
+
+def cache_dir () -> str:
+  return os.environ.get('CPT_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'cpt')
+
+def cache_path (*parts: str) -> str:
+  return os.path.join(cache_dir(), *parts)
+
+def read_json (path: str) -> typing.Optional[typing.Any]:
+  try:
+    with profiling.phase('cache.read'), open(path, 'rb') as file:
+      return jsoncodec.loads(file.read())
+  except (FileNotFoundError, ValueError):
+    return None
+
+def write_text (path: str, text: str) -> bool:
+  """Atomically write text to path, returns False if the file was already up to date"""
+
+  try:
+    with profiling.phase('file.read'), open(path, 'r', encoding = 'utf-8') as file:
+      if file.read() == text:
+        return False
+  except (FileNotFoundError, UnicodeDecodeError):
+    pass
+
+  write_bytes(path, text.encode('utf-8'))
+  return True
+
+def write_bytes (path: str, data: bytes) -> None:
+  with profiling.phase('file.write'):
+    _write_bytes(path, data)
+
+def _write_bytes (path: str, data: bytes) -> None:
+  directory = os.path.dirname(path) or '.'
+  os.makedirs(directory, exist_ok = True)
+  descriptor, temporary = tempfile.mkstemp(dir = directory, prefix = '.tmp-')
+  try:
+    with os.fdopen(descriptor, 'wb') as file:
+      file.write(data)
+    os.replace(temporary, path)
+  except BaseException:
+    os.unlink(temporary)
+    raise
+
+def write_json (path: str, data: typing.Any) -> bool:
+  return write_text(path, jsoncodec.dumps(data))
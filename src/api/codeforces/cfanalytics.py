@@ -0,0 +1,237 @@
+"""
+api.codeforces.cfanalytics
+--------------------------
+
+This module computes contest analytics from the contest.status
+stream: verdict histograms and first accepted times per problem,
+time-to-solve distributions by rating band and language share.
+
+Submissions are consumed page by page. Every page is turned into a
+few integer columns and aggregated with numpy, so only the running
+totals and one page of Submission objects are held at any time.
+"""
+
+import asyncio
+import numpy as np
+import sys
+import time
+import typing
+
+from .cfobject import Submission
+
+# solve pairs are packed as handle << _PROBLEM_BITS | problem
+_PROBLEM_BITS = 20
+
+class _Codes:
+  """Maps values to dense integer codes, shared by every chunk"""
+
+  def __init__ (self):
+    self.values = []
+    self.lookup = {}
+
+  def encode (self, values: typing.Iterable, count: int) -> np.ndarray:
+    lookup = self.lookup
+    known = self.values
+
+    def code (value):
+      result = lookup.get(value)
+      if result is None:
+        result = lookup[value] = len(known)
+        known.append(value)
+      return result
+
+    return np.fromiter(map(code, values), dtype = np.int64, count = count)
+
+  def __len__ (self):
+    return len(self.values)
+
+def _grow (array: np.ndarray, shape: typing.Tuple[int, ...], fill: typing.Any = 0) -> np.ndarray:
+  if array.shape == shape:
+    return array
+  grown = np.full(shape, fill, dtype = array.dtype)
+  grown[tuple(slice(0, size) for size in array.shape)] = array
+  return grown
+
+def _handle (submission: Submission) -> str:
+  members = submission.author.members
+  return members[0].handle if len(members) == 1 else (submission.author.team_name or '')
+
+class ContestAnalytics:
+  def __init__ (
+    self, *,
+    ratings: typing.Dict[str, int] = None,
+    band_width: int = 200,
+    participant_types: typing.Iterable[str] = ('CONTESTANT',)
+  ):
+    """
+    :param ratings: participant ratings used for the time-to-solve bands,
+      without them submissions are banded by problem rating
+    :param participant_types: parties counted for first accepted and
+      time-to-solve (verdicts and languages count every submission)
+    """
+
+    self.ratings = ratings
+    self.band_width = band_width
+    self.participant_types = set(participant_types)
+
+    self.problems = _Codes()
+    self.verdicts = _Codes()
+    self.languages = _Codes()
+    self.handles = _Codes()
+    self.problem_ratings: typing.Dict[str, int] = {}
+
+    self.submissions = 0
+    self.verdict_counts = np.zeros((0, 0), dtype = np.int64)
+    self.language_counts = np.zeros(0, dtype = np.int64)
+    self.first_accepted = np.zeros(0, dtype = np.float64)
+    self.solve_keys = np.zeros(0, dtype = np.int64)
+    self.solve_times = np.zeros(0, dtype = np.int64)
+
+  def update (self, submissions: typing.List[Submission]) -> None:
+    count = len(submissions)
+    if count == 0:
+      return
+
+    problem = self.problems.encode((s.problem.index for s in submissions), count)
+    verdict = self.verdicts.encode((s.verdict or 'TESTING' for s in submissions), count)
+    language = self.languages.encode((s.programming_language for s in submissions), count)
+    handle = self.handles.encode(map(_handle, submissions), count)
+    relative_time = np.fromiter((s.relative_time_seconds for s in submissions), dtype = np.int64, count = count)
+    counted = np.fromiter(
+      (s.author.participant_type in self.participant_types for s in submissions),
+      dtype = bool, count = count
+    )
+    for s in submissions:
+      self.problem_ratings.setdefault(s.problem.index, s.problem.rating)
+
+    problems, verdicts, languages = len(self.problems), len(self.verdicts), len(self.languages)
+    self.submissions += count
+
+    self.verdict_counts = _grow(self.verdict_counts, (problems, verdicts))
+    self.verdict_counts += np.bincount(
+      problem * verdicts + verdict, minlength = problems * verdicts
+    ).reshape(problems, verdicts)
+
+    self.language_counts = _grow(self.language_counts, (languages,))
+    self.language_counts += np.bincount(language, minlength = languages)
+
+    accepted = counted & (verdict == self.verdicts.lookup.get('OK', -1))
+    first = np.full(problems, np.inf)
+    np.minimum.at(first, problem[accepted], relative_time[accepted])
+    self.first_accepted = np.minimum(_grow(self.first_accepted, (problems,), np.inf), first)
+
+    # keep the earliest accepted submission of every (handle, problem) pair
+    keys = np.concatenate((self.solve_keys, handle[accepted] << _PROBLEM_BITS | problem[accepted]))
+    times = np.concatenate((self.solve_times, relative_time[accepted]))
+    order = np.lexsort((times, keys))
+    keys, times = keys[order], times[order]
+    first_of_key = np.ones(len(keys), dtype = bool)
+    first_of_key[1:] = keys[1:] != keys[:-1]
+    self.solve_keys, self.solve_times = keys[first_of_key], times[first_of_key]
+
+  def _bands (self) -> np.ndarray:
+    if self.ratings is not None:
+      ratings = np.array([self.ratings.get(handle, -1) for handle in self.handles.values], dtype = np.int64)
+      rating = ratings[self.solve_keys >> _PROBLEM_BITS] if len(ratings) else np.zeros(0, dtype = np.int64)
+    else:
+      ratings = np.array([self.problem_ratings.get(index) or -1 for index in self.problems.values], dtype = np.int64)
+      rating = ratings[self.solve_keys & ((1 << _PROBLEM_BITS) - 1)] if len(ratings) else np.zeros(0, dtype = np.int64)
+    return np.where(rating > 0, rating // self.band_width * self.band_width, -1)
+
+  def report (self) -> dict:
+    solve_problem = self.solve_keys & ((1 << _PROBLEM_BITS) - 1)
+    solved_by = np.bincount(solve_problem, minlength = len(self.problems))
+
+    problems = {}
+    for code in sorted(range(len(self.problems)), key = lambda code: self.problems.values[code]):
+      counts = self.verdict_counts[code]
+      first = self.first_accepted[code]
+      problems[self.problems.values[code]] = {
+        'submissions': int(counts.sum()),
+        'verdicts': { self.verdicts.values[v]: int(counts[v]) for v in np.flatnonzero(counts) },
+        'first_accepted': None if np.isinf(first) else int(first),
+        'solved_by': int(solved_by[code])
+      }
+
+    time_to_solve = {}
+    bands = self._bands()
+    order = np.lexsort((self.solve_times, bands))
+    bands, times = bands[order], self.solve_times[order]
+    for band, group in zip(*np.unique(bands, return_index = True)):
+      end = np.searchsorted(bands, band, side = 'right')
+      values = times[group:end]
+      label = 'unrated' if band < 0 else f'{band}-{band + self.band_width - 1}'
+      p25, median, p75 = np.percentile(values, [25, 50, 75])
+      time_to_solve[label] = {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'p25': float(p25), 'median': float(median), 'p75': float(p75)
+      }
+
+    total = max(int(self.language_counts.sum()), 1)
+    languages = {
+      self.languages.values[code]: int(self.language_counts[code]) / total
+      for code in np.argsort(-self.language_counts, kind = 'stable')
+    }
+
+    return {
+      'submissions': self.submissions,
+      'problems': problems,
+      'time_to_solve': time_to_solve,
+      'languages': languages
+    }
+
+async def contest_analytics (
+  api,
+  contest_id: int, *,
+  page_size: int = 10000,
+  **kwargs
+) -> dict:
+  analytics = ContestAnalytics(**kwargs)
+  async for page in api.paginate(api.contest_status, page_size = page_size, contest_id = contest_id):
+    analytics.update(page)
+  return analytics.report()
+
+def main ():
+  from .codeforces import CodeforcesAPI
+  from .cfobject import Member, Party, Problem
+
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+  languages = ['GNU C++17', 'GNU C++20 (64)', 'Python 3', 'PyPy 3', 'Java 11']
+  verdicts = ['OK', 'WRONG_ANSWER', 'TIME_LIMIT_EXCEEDED', 'RUNTIME_ERROR']
+  problems = [Problem(1642, None, index, index, 'PROGRAMMING', 0.0, 800 + 300 * i, []) for i, index in enumerate('ABCDEF')]
+  parties = [Party(1642, [Member(f'user{i}', None)], 'CONTESTANT', None, None, False, None, 0) for i in range(20000)]
+
+  def page (start: int, size: int) -> typing.List[Submission]:
+    return [
+      Submission(
+        i, 1642, 0, (i * 7) % 7200, problems[i % 6], parties[i % 20000],
+        languages[i % 5], verdicts[(i // 6) % 4], 'TESTS', 0, 0, 0, 0.0
+      )
+      for i in range(start, min(start + size, count))
+    ]
+
+  start = time.perf_counter()
+  analytics = ContestAnalytics()
+  for offset in range(0, count, 10000):
+    analytics.update(page(offset, 10000))
+  report = analytics.report()
+  elapsed = time.perf_counter() - start
+
+  print(f'Submissions: {report["submissions"]}')
+  print(f'Problems: {list(report["problems"])}')
+  print(f'Bands: {list(report["time_to_solve"])}')
+  print(f'Elapsed (object construction included): {elapsed:.2f} s')
+
+  async def async_main (contest_id: int):
+    API = CodeforcesAPI()
+    report = await contest_analytics(API, contest_id)
+    for index, problem in report['problems'].items():
+      print(index, problem)
+    await API.close()
+
+  if len(sys.argv) > 2:
+    asyncio.run(async_main(int(sys.argv[2])))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,99 @@
+"""
+api.codeforces.cfauth
+---------------------
+
+This module contains request signing for authorized Codeforces
+API calls and a pool of API keys, each with its own rate limiter.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import ratelimit
+import string
+import time
+import typing
+
+def sign_params (
+  path: str,
+  params: dict,
+  api_key: str,
+  secret: str,
+  time_seconds: int = None
+) -> dict:
+  """Return params with apiKey, time and apiSig added
+
+  The timestamp is taken when the request is signed, Codeforces rejects
+  signatures older than five minutes.
+  """
+
+  signed = dict(params)
+  signed['apiKey'] = api_key
+  signed['time'] = round(time.time()) if time_seconds is None else time_seconds
+
+  padding = ''.join(random.sample(string.ascii_letters + string.digits, 6))
+  query = '&'.join(
+    f'{key}={value}'
+    for key, value in sorted((key, str(value)) for key, value in signed.items())
+  )
+  hash = hashlib.sha512(f'{padding}/{path}?{query}#{secret}'.encode()).hexdigest()
+
+  signed['apiSig'] = padding + hash
+  return signed
+
+class APIKey:
+  def __init__ (
+    self,
+    api_key: str,
+    secret: str, *,
+    calls: int = 1,
+    period: int = 2
+  ):
+    self.api_key = api_key
+    self.secret = secret
+    self._limited_call = ratelimit.limits(calls = calls, period = period)(self._call)
+
+  @staticmethod
+  async def _call (callback, *args, **kwargs):
+    return await callback(*args, **kwargs)
+
+  def sign (self, path: str, params: dict, time_seconds: int = None) -> dict:
+    return sign_params(path, params, self.api_key, self.secret, time_seconds)
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.api_key[:4]}...]>'
+
+class APIKeyPool:
+  def __init__ (self, keys: typing.List[APIKey]):
+    if not keys:
+      raise ValueError('API key pool needs at least one key')
+    self.keys = list(keys)
+    self._next = 0
+
+  @classmethod
+  def from_env (cls, variable: str = 'CODEFORCES_API_KEYS', **kwargs) -> 'APIKeyPool':
+    """Create a pool from "key:secret;key:secret" stored in an environment variable"""
+
+    value = os.environ.get(variable, '')
+    keys = [
+      APIKey(*pair.split(':', 1), **kwargs)
+      for pair in value.split(';') if pair.strip()
+    ]
+    return cls(keys)
+
+  async def call (self, callback: typing.Callable[[APIKey], typing.Awaitable]) -> typing.Any:
+    """Run callback(key) with the next key whose limiter has budget left"""
+
+    while True:
+      wait = None
+
+      for _ in range(len(self.keys)):
+        key = self.keys[self._next]
+        self._next = (self._next + 1) % len(self.keys)
+        try:
+          return await key._limited_call(callback, key)
+        except ratelimit.RateLimitException as e:
+          wait = e.period_remaining if wait is None else min(wait, e.period_remaining)
+
+      await asyncio.sleep(wait)
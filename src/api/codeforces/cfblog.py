@@ -0,0 +1,197 @@
+"""
+api.codeforces.cfblog
+---------------------
+
+This module contains tools for blog entries and their comments: a
+comment tree builder that links the flat blogEntry.comments list in
+one pass and computes subtree aggregates, and a local inverted full
+text index over blog entries and comments for offline search.
+"""
+
+import collections
+import heapq
+import html
+import math
+import re
+import typing
+
+from .. import cache
+from .cfobject import BlogEntry, Comment
+
+class CommentNode:
+  def __init__ (self, comment: Comment):
+    self.comment = comment
+    self.parent: typing.Optional['CommentNode'] = None
+    self.children: typing.List['CommentNode'] = []
+    self.depth = 0
+    # aggregates over the subtree, the comment itself included in rating_sum
+    self.reply_count = 0
+    self.rating_sum = comment.rating
+
+  def walk (self) -> typing.Iterator['CommentNode']:
+    """Nodes of the subtree in pre-order, without recursion"""
+
+    stack = [self]
+    while stack:
+      node = stack.pop()
+      yield node
+      stack.extend(reversed(node.children))
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.comment.id} - {len(self.children)} children]>'
+
+def build_comment_tree (comments: typing.List[Comment]) -> typing.List[CommentNode]:
+  """Link comments into trees in O(n), returns the roots in the original order
+
+  Comments whose parent is missing from the list are treated as roots.
+  """
+
+  nodes = { comment.id: CommentNode(comment) for comment in comments }
+  roots = []
+
+  for comment in comments:
+    node = nodes[comment.id]
+    parent = nodes.get(comment.parent_comment_id)
+    if parent is None or parent is node:
+      roots.append(node)
+    else:
+      node.parent = parent
+      parent.children.append(node)
+
+  # breadth first order has every parent before its children, so walking
+  # it backwards folds each subtree into its parent exactly once
+  order = list(roots)
+  for node in order:
+    for child in node.children:
+      child.depth = node.depth + 1
+      order.append(child)
+
+  for node in reversed(order):
+    parent = node.parent
+    if parent is not None:
+      parent.reply_count += node.reply_count + 1
+      parent.rating_sum += node.rating_sum
+
+  return roots
+
+_TAG = re.compile(r'<[^>]+>')
+_TOKEN = re.compile(r'[^\W_]{2,}')
+
+def tokenize (text: typing.Optional[str]) -> typing.List[str]:
+  if not text:
+    return []
+  return _TOKEN.findall(html.unescape(_TAG.sub(' ', text)).lower())
+
+class BlogIndex:
+  """Inverted index from words to blog entries and comments
+
+  Documents are ("blog", blog_id, None) or ("comment", blog_id, comment_id),
+  postings map a document number to the term frequency.
+  """
+
+  def __init__ (self, path: str = None):
+    self.path = path if path is not None else cache.cache_path('codeforces', 'blog_index.json')
+    self.documents: typing.List[typing.Tuple[str, int, typing.Optional[int]]] = []
+    self.postings: typing.Dict[str, typing.Dict[int, int]] = collections.defaultdict(dict)
+    self._positions: typing.Dict[tuple, int] = {}
+    # the words of every document, so removing one touches only its own postings
+    self._tokens: typing.Dict[int, typing.List[str]] = {}
+    # numbers of removed documents, reused so that re-indexing does not grow the index
+    self._free: typing.List[int] = []
+
+  def _add (self, document: tuple, text: str) -> None:
+    # a replaced document gets its old number back (it is freed last)
+    if document in self._positions:
+      self.remove(document)
+    if self._free:
+      number = self._free.pop()
+      self.documents[number] = document
+    else:
+      number = len(self.documents)
+      self.documents.append(document)
+    self._positions[document] = number
+    counts = collections.Counter(tokenize(text))
+    self._tokens[number] = list(counts)
+    for token, count in counts.items():
+      self.postings[token][number] = count
+
+  def remove (self, document: tuple) -> None:
+    number = self._positions.pop(document, None)
+    if number is None:
+      return
+    # the slot stays allocated until reused, so document numbers in other
+    # postings stay valid
+    self.documents[number] = None
+    self._free.append(number)
+    for token in self._tokens.pop(number, ()):
+      posting = self.postings.get(token)
+      if posting is not None and posting.pop(number, None) is not None and not posting:
+        del self.postings[token]
+
+  def add_blog_entry (self, blog_entry: BlogEntry) -> None:
+    text = ' '.join(filter(None, [blog_entry.title, blog_entry.content, ' '.join(blog_entry.tags or [])]))
+    self._add(('blog', blog_entry.id, None), text)
+
+  def add_comments (self, blog_id: int, comments: typing.List[Comment]) -> None:
+    for comment in comments:
+      self._add(('comment', blog_id, comment.id), comment.text)
+
+  def search (self, query: str, limit: int = 20) -> typing.List[typing.Tuple[tuple, float]]:
+    """Documents containing every word of query, ranked by tf-idf"""
+
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+      return []
+    postings = [self.postings.get(token) for token in tokens]
+    if not all(postings):
+      return []
+
+    # intersect starting from the rarest word
+    postings.sort(key = len)
+    matches = set(postings[0])
+    for posting in postings[1:]:
+      matches.intersection_update(posting)
+      if not matches:
+        return []
+
+    total = len(self._positions)
+    weights = [math.log(1 + total / len(posting)) for posting in postings]
+    scores = (
+      (number, sum(weight * posting[number] for weight, posting in zip(weights, postings)))
+      for number in matches
+    )
+    best = heapq.nsmallest(limit, scores, key = lambda item: (-item[1], item[0]))
+    return [(self.documents[number], score) for number, score in best]
+
+  def save (self) -> None:
+    cache.write_json(self.path, {
+      'documents': self.documents,
+      'postings': { token: list(posting.items()) for token, posting in self.postings.items() }
+    })
+
+  def load (self) -> 'BlogIndex':
+    data = cache.read_json(self.path)
+    if data is None:
+      return self
+
+    self.documents = [tuple(document) if document is not None else None for document in data['documents']]
+    self._positions = { document: number for number, document in enumerate(self.documents) if document is not None }
+    self._free = [number for number, document in enumerate(self.documents) if document is None]
+    self.postings = collections.defaultdict(dict, {
+      token: dict(map(tuple, posting)) for token, posting in data['postings'].items()
+    })
+    self._tokens = collections.defaultdict(list)
+    for token, posting in self.postings.items():
+      for number in posting:
+        self._tokens[number].append(token)
+    self._tokens = dict(self._tokens)
+    return self
+
+async def index_blog_entry (api, index: BlogIndex, blog_id: int) -> typing.List[CommentNode]:
+  """Fetch a blog entry with its comments, add both to index and return the comment tree"""
+
+  blog_entry = (await api.blogentry_view(blogentry_id = blog_id))[0]
+  comments = await api.blogentry_comments(blogentry_id = blog_id)
+  index.add_blog_entry(blog_entry)
+  index.add_comments(blog_id, comments)
+  return build_comment_tree(comments)
@@ -17,3 +17,26 @@ class CommentNotFoundError (Exception):
 
 class ResultNotFoundError (Exception):
   """Codeforces API call response does not contain result"""
+
+class CallLimitExceededError (StatusFailedError):
+  """Codeforces API call response contains the "Call limit exceeded" comment"""
+
+class InvalidResponseError (Exception):
+  """Codeforces API call response is not valid JSON (usually an HTML error page)"""
+
+class ServerError (Exception):
+  """Codeforces API call failed with an HTTP 5xx or 429 status"""
+
+  def __init__ (self, status: int, retry_after: float = None):
+    super().__init__(status, retry_after)
+    self.status = status
+    self.retry_after = retry_after
+
+  def __str__ (self):
+    return f'HTTP {self.status}'
+
+class OfflineResponseNotFoundError (Exception):
+  """Codeforces API call has no stored response and the client is offline"""
+
+class StandingsShiftedError (Exception):
+  """Contest standings kept shifting while they were fetched in slices"""
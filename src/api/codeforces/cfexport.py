@@ -0,0 +1,126 @@
+"""
+api.codeforces.cfexport
+-----------------------
+
+This module contains row writers that stream Codeforces objects
+as NDJSON or CSV, one row at a time, or as a table (cftable).
+"""
+
+import csv
+import inspect
+import typing
+
+from .. import jsoncodec, profiling
+from .cfobject import CodeforcesObject
+from .cftable import TableWriter
+
+def flatten (obj: CodeforcesObject) -> dict:
+  """Flatten an object into a single level dict with dotted column names"""
+
+  row = {}
+
+  def visit (prefix: str, value: typing.Any):
+    if isinstance(value, dict):
+      for key, item in value.items():
+        visit(f'{prefix}.{key}' if prefix else key, item)
+    elif isinstance(value, list):
+      if value and all(isinstance(item, dict) and 'handle' in item for item in value):
+        row[prefix] = ';'.join(item.get('handle') for item in value)
+      elif all(not isinstance(item, (dict, list)) for item in value):
+        row[prefix] = ';'.join(str(item) for item in value)
+      else:
+        row[prefix] = jsoncodec.dumps(value)
+    else:
+      row[prefix] = value
+
+  visit('', obj.to_dict())
+  return row
+
+def columns (cls: typing.Type[CodeforcesObject]) -> typing.List[str]:
+  """Dotted column names of a class, as flatten() names them when every nested object is present"""
+
+  # interned subclasses (FrozenProblem) take any arguments, the attributes
+  # are the ones of the plain class further down the mro
+  for base in cls.__mro__:
+    if '__init__' not in vars(base):
+      continue
+    parameters = list(inspect.signature(base.__init__).parameters.values())[1:]
+    if not any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+      break
+
+  names = []
+  for parameter in parameters:
+    nested = cls._nested.get(parameter.name)
+    # lists of nested objects are flattened into a single column
+    if nested is None or typing.get_origin(parameter.annotation) is list:
+      names.append(parameter.name)
+    else:
+      names.extend(f'{parameter.name}.{name}' for name in columns(nested))
+  return names
+
+class NDJSONWriter:
+  def __init__ (self, file: typing.TextIO):
+    self.file = file
+    self.count = 0
+
+  def write (self, obj: CodeforcesObject) -> None:
+    self.file.write(jsoncodec.dumps(obj.to_dict()))
+    self.file.write('\n')
+    self.count += 1
+
+  def flush (self) -> None:
+    self.file.flush()
+
+class CSVWriter:
+  def __init__ (self, file: typing.TextIO):
+    self.file = file
+    self.count = 0
+    self._writer = None
+
+  def write (self, obj: CodeforcesObject) -> None:
+    row = flatten(obj)
+
+    # the columns come from the class, so nested objects missing (None) in the
+    # first row still get their columns; cells of missing fields stay empty
+    if self._writer is None:
+      fieldnames = columns(type(obj))
+      nested = { name.rpartition('.')[0] for name in fieldnames }
+      fieldnames += [name for name in row if name not in fieldnames and name not in nested]
+      self._writer = csv.DictWriter(self.file, fieldnames = fieldnames, extrasaction = 'ignore')
+      self._writer.writeheader()
+
+    self._writer.writerow(row)
+    self.count += 1
+
+  def flush (self) -> None:
+    self.file.flush()
+
+_writers = {
+  'ndjson': NDJSONWriter,
+  'csv': CSVWriter,
+  'table': TableWriter,
+}
+
+def get_writer (
+  format: str,
+  file: typing.TextIO,
+  columns: typing.List[str] = None
+) -> typing.Union[NDJSONWriter, CSVWriter, TableWriter]:
+  if format not in _writers:
+    raise ValueError(f"Export format '{format}' is invalid! Choose from: {', '.join(_writers)}")
+  if columns is not None:
+    if format != 'table':
+      raise ValueError('Columns can only be selected for the table format')
+    return TableWriter(file, columns = columns)
+  return _writers[format](file)
+
+async def export (
+  pages: typing.AsyncIterator[typing.List[CodeforcesObject]],
+  writer: typing.Union[NDJSONWriter, CSVWriter, TableWriter]
+) -> int:
+  async for page in pages:
+    with profiling.phase('export.write'):
+      for obj in page:
+        writer.write(obj)
+      writer.flush()
+  return writer.count
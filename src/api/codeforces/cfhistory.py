@@ -0,0 +1,227 @@
+"""
+api.codeforces.cfhistory
+------------------------
+
+This module contains a local store of user.rating histories for
+many handles. Every handle keeps its rating changes as sorted numpy
+columns. For cohort wide questions ("rating of every tracked user
+at time t") the columns are packed once into one array sorted by
+(handle, time), so a single searchsorted answers the lookup for all
+handles together.
+"""
+
+import asyncio
+import numpy as np
+import os
+import time
+import typing
+
+from .. import cache
+from .cfobject import RatingChange
+
+# packed keys are handle_index << _TIME_BITS | time
+_TIME_BITS = 40
+
+class _Packed:
+  def __init__ (self, handles: typing.List[str], columns: typing.Dict[str, typing.Dict[str, np.ndarray]]):
+    self.handles = handles
+    lengths = np.array([len(columns[handle]['time']) for handle in handles], dtype = np.int64)
+    self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+    self.time = np.concatenate([columns[handle]['time'] for handle in handles] or [np.zeros(0, np.int64)])
+    self.rating = np.concatenate([columns[handle]['rating'] for handle in handles] or [np.zeros(0, np.int32)])
+    owner = np.repeat(np.arange(len(handles), dtype = np.int64), lengths)
+    self.keys = owner << _TIME_BITS | self.time
+
+  def ratings_at (self, seconds: int) -> np.ndarray:
+    """Rating of every handle after the last change at or before seconds, -1 if unrated"""
+
+    handles = np.arange(len(self.handles), dtype = np.int64)
+    positions = np.searchsorted(self.keys, handles << _TIME_BITS | seconds, side = 'right') - 1
+    rated = positions >= self.offsets[:-1]
+    return np.where(rated, self.rating[np.maximum(positions, 0)] if len(self.rating) else -1, -1)
+
+class RatingHistoryStore:
+  _COLUMNS = { 'time': np.int64, 'contest_id': np.int64, 'old_rating': np.int32, 'rating': np.int32 }
+
+  def __init__ (self, path: str = None):
+    self.path = path if path is not None else cache.cache_path('codeforces', 'rating_history.npz')
+    self.columns: typing.Dict[str, typing.Dict[str, np.ndarray]] = {}
+    self.fetched_at: typing.Dict[str, float] = {}
+    self._packed = None
+
+  @property
+  def handles (self) -> typing.List[str]:
+    return list(self.columns)
+
+  def load (self) -> 'RatingHistoryStore':
+    if not os.path.exists(self.path):
+      return self
+
+    with np.load(self.path, allow_pickle = False) as data:
+      handles = data['handles'].tolist()
+      offsets = data['offsets']
+      fetched_at = data['fetched_at']
+      packed = { name: data[name] for name in self._COLUMNS }
+
+    for index, handle in enumerate(handles):
+      start, end = offsets[index], offsets[index + 1]
+      self.columns[handle] = { name: values[start:end] for name, values in packed.items() }
+      self.fetched_at[handle] = float(fetched_at[index])
+    self._packed = None
+    return self
+
+  def save (self) -> None:
+    handles = self.handles
+    lengths = [len(self.columns[handle]['time']) for handle in handles]
+    arrays = {
+      name: np.concatenate([self.columns[handle][name] for handle in handles] or [np.zeros(0, dtype)])
+      for name, dtype in self._COLUMNS.items()
+    }
+
+    os.makedirs(os.path.dirname(self.path) or '.', exist_ok = True)
+    temporary = self.path + '.tmp.npz'
+    np.savez(
+      temporary,
+      handles = np.array(handles, dtype = str),
+      offsets = np.concatenate(([0], np.cumsum(lengths, dtype = np.int64))),
+      fetched_at = np.array([self.fetched_at.get(handle, 0.0) for handle in handles]),
+      **arrays
+    )
+    os.replace(temporary, self.path)
+
+  def update (self, handle: str, ratingchanges: typing.List[RatingChange], fetched_at: float = None) -> int:
+    """Append the changes newer than the stored history, returns how many were added"""
+
+    existing = self.columns.get(handle)
+    last = existing['time'][-1] if existing is not None and len(existing['time']) else -1
+    changes = sorted(
+      (change for change in ratingchanges if change.rating_update_time_seconds > last),
+      key = lambda change: change.rating_update_time_seconds
+    )
+
+    added = {
+      'time': np.array([change.rating_update_time_seconds for change in changes], dtype = np.int64),
+      'contest_id': np.array([change.contest_id for change in changes], dtype = np.int64),
+      'old_rating': np.array([change.old_rating for change in changes], dtype = np.int32),
+      'rating': np.array([change.new_rating for change in changes], dtype = np.int32),
+    }
+    if existing is not None:
+      added = { name: np.concatenate((existing[name], values)) for name, values in added.items() }
+
+    self.columns[handle] = added
+    self.fetched_at[handle] = time.time() if fetched_at is None else fetched_at
+    self._packed = None
+    return len(changes)
+
+  def remove (self, handle: str) -> None:
+    self.columns.pop(handle, None)
+    self.fetched_at.pop(handle, None)
+    self._packed = None
+
+  async def refresh (
+    self,
+    api,
+    handles: typing.Iterable[str] = None, *,
+    max_age: float = 24 * 60 * 60
+  ) -> typing.Tuple[int, typing.Dict[str, Exception]]:
+    """Fetch user.rating for handles missing or older than max_age
+
+    Returns the number of new changes and the handles that failed (e.g. renamed
+    or unknown handles) with their error; the other handles are still updated.
+    """
+
+    now = time.time()
+    handles = self.handles if handles is None else list(handles)
+    stale = [handle for handle in handles if now - self.fetched_at.get(handle, 0.0) >= max_age]
+
+    # calls are queued behind the API rate limiter, results are merged as they
+    # arrive; every call has finished (or failed) before this returns
+    async def fetch (handle: str) -> int:
+      return self.update(handle, await api.user_rating(handle = handle))
+
+    results = await asyncio.gather(*map(fetch, stale), return_exceptions = True)
+    failed = { handle: result for handle, result in zip(stale, results) if isinstance(result, Exception) }
+    added = sum(result for result in results if not isinstance(result, BaseException))
+    return added, failed
+
+  def history (self, handle: str) -> typing.Tuple[np.ndarray, np.ndarray]:
+    columns = self.columns[handle]
+    return columns['time'], columns['rating']
+
+  def rating_of (self, handle: str, seconds: int) -> typing.Optional[int]:
+    times, ratings = self.history(handle)
+    position = np.searchsorted(times, seconds, side = 'right') - 1
+    return int(ratings[position]) if position >= 0 else None
+
+  def _get_packed (self) -> _Packed:
+    if self._packed is None:
+      self._packed = _Packed(self.handles, self.columns)
+    return self._packed
+
+  def ratings_at (self, seconds: int) -> typing.Dict[str, int]:
+    """Rating of every tracked (and by then rated) handle at a point in time"""
+
+    packed = self._get_packed()
+    ratings = packed.ratings_at(seconds)
+    return { packed.handles[index]: int(ratings[index]) for index in np.flatnonzero(ratings >= 0) }
+
+  def climbers (self, start: int, end: int, top: int = 10) -> typing.List[typing.Tuple[str, int, int, int]]:
+    """Largest rating gains between start and end as (handle, before, after, delta)
+
+    Handles unrated at start are left out, their first rating is not a climb.
+    """
+
+    packed = self._get_packed()
+    before = packed.ratings_at(start)
+    after = packed.ratings_at(end)
+    rated = np.flatnonzero(before >= 0)
+    delta = after[rated] - before[rated]
+    order = rated[np.argsort(-delta, kind = 'stable')[:top]]
+    return [
+      (packed.handles[index], int(before[index]), int(after[index]), int(after[index] - before[index]))
+      for index in order
+    ]
+
+def main ():
+  import random
+  import sys
+
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+  store = RatingHistoryStore(path = os.path.join(cache.cache_dir(), 'rating_history_benchmark.npz'))
+  random.seed(0)
+
+  for user in range(count):
+    rating = 1400
+    changes = []
+    for contest in range(random.randint(1, 120)):
+      delta = random.randint(-80, 100)
+      changes.append(RatingChange(contest, '', f'user{user}', 1, 1500000000 + contest * 604800 + user, rating, rating + delta))
+      rating += delta
+    store.update(f'user{user}', changes, fetched_at = 0.0)
+
+  start = time.perf_counter()
+  store.ratings_at(1500000000 + 60 * 604800)
+  packed = time.perf_counter() - start
+
+  start = time.perf_counter()
+  ratings = store.ratings_at(1500000000 + 61 * 604800)
+  lookup = time.perf_counter() - start
+
+  start = time.perf_counter()
+  naive = { handle: store.rating_of(handle, 1500000000 + 61 * 604800) for handle in store.handles }
+  naive_elapsed = time.perf_counter() - start
+  assert ratings == { handle: rating for handle, rating in naive.items() if rating is not None }
+
+  print(f'Handles: {count}, rating changes: {len(store._get_packed().time)}')
+  print(f'Pack + cohort lookup: {packed * 1000:.1f} ms')
+  print(f'Cohort lookup: {lookup * 1000:.1f} ms (per handle loop: {naive_elapsed * 1000:.1f} ms)')
+  print('Climbers:', store.climbers(1500000000 + 10 * 604800, 1500000000 + 50 * 604800, top = 3))
+
+  store.save()
+  start = time.perf_counter()
+  RatingHistoryStore(path = store.path).load()
+  print(f'Load: {(time.perf_counter() - start) * 1000:.1f} ms')
+  os.remove(store.path)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,165 @@
+"""
+api.codeforces.cfindex
+----------------------
+
+This module contains an inverted index over Codeforces problems
+with posting lists per tag and per rating bucket and a solved set
+per handle. Posting lists are stored as integer bitmaps, so queries
+are answered with a handful of bitwise operations.
+"""
+
+import asyncio
+import time
+import typing
+
+from .cfobject import (
+  Problem, Submission
+)
+
+def _problem_key (contest_id: int, index: str) -> typing.Tuple[int, str]:
+  return contest_id, index
+
+def _bits (mask: int) -> typing.Iterator[int]:
+  while mask:
+    low = mask & -mask
+    yield low.bit_length() - 1
+    mask ^= low
+
+class ProblemIndex:
+  def __init__ (self, problems: typing.List[Problem], *, bucket_size: int = 100):
+    self.bucket_size = bucket_size
+    self.problems: typing.List[Problem] = []
+    self.tags: typing.Dict[str, int] = {}
+    self.buckets: typing.Dict[int, int] = {}
+    self.solved: typing.Dict[str, int] = {}
+    self._ordinals: typing.Dict[typing.Tuple[int, str], int] = {}
+    self._all = 0
+
+    for problem in problems:
+      self.add_problem(problem)
+
+  def add_problem (self, problem: Problem) -> None:
+    key = _problem_key(problem.contest_id, problem.index)
+    if key in self._ordinals:
+      return
+
+    ordinal = len(self.problems)
+    bit = 1 << ordinal
+    self._ordinals[key] = ordinal
+    self.problems.append(problem)
+    self._all |= bit
+
+    for tag in problem.tags or []:
+      self.tags[tag] = self.tags.get(tag, 0) | bit
+
+    # unrated problems (None, or 0 as problem_parse stores a missing rating)
+    # are in no bucket, so a rating bound leaves them out
+    if problem.rating:
+      bucket = self._bucket(problem.rating)
+      self.buckets[bucket] = self.buckets.get(bucket, 0) | bit
+
+  def add_submissions (self, handle: str, submissions: typing.List[Submission]) -> None:
+    mask = self.solved.get(handle, 0)
+
+    for submission in submissions:
+      if submission.verdict != 'OK' or submission.problem is None:
+        continue
+      ordinal = self._ordinals.get(_problem_key(submission.problem.contest_id, submission.problem.index))
+      if ordinal is not None:
+        mask |= 1 << ordinal
+
+    self.solved[handle] = mask
+
+  def _bucket (self, rating: int) -> int:
+    return rating // self.bucket_size * self.bucket_size
+
+  def _rating_mask (self, rating_low: int, rating_high: int) -> int:
+    mask = 0
+    for bucket, posting in self.buckets.items():
+      if bucket + self.bucket_size > rating_low and bucket <= rating_high:
+        mask |= posting
+    return mask
+
+  def query_mask (
+    self, *,
+    tags: typing.List[str] = None,
+    any_tag: bool = False,
+    rating_low: int = None,
+    rating_high: int = None,
+    unsolved_by: typing.List[str] = None
+  ) -> int:
+    mask = self._all
+
+    if tags:
+      postings = [self.tags.get(tag, 0) for tag in tags]
+      if any_tag:
+        tag_mask = 0
+        for posting in postings:
+          tag_mask |= posting
+        mask &= tag_mask
+      else:
+        for posting in postings:
+          mask &= posting
+
+    if rating_low is not None or rating_high is not None:
+      low = rating_low if rating_low is not None else 0
+      high = rating_high if rating_high is not None else float('inf')
+      mask &= self._rating_mask(low, high)
+
+    for handle in unsolved_by or []:
+      mask &= ~self.solved.get(handle, 0)
+
+    return mask
+
+  def query (self, **kwargs) -> typing.List[Problem]:
+    problems = [self.problems[ordinal] for ordinal in _bits(self.query_mask(**kwargs))]
+
+    # buckets are coarse, the exact rating bounds are checked per result
+    rating_low = kwargs.get('rating_low')
+    rating_high = kwargs.get('rating_high')
+    if rating_low is not None:
+      problems = [problem for problem in problems if problem.rating >= rating_low]
+    if rating_high is not None:
+      problems = [problem for problem in problems if problem.rating <= rating_high]
+
+    return problems
+
+  def unsolved (
+    self,
+    handles: typing.List[str], *,
+    tags: typing.List[str] = None,
+    rating_low: int = None,
+    rating_high: int = None
+  ) -> typing.List[Problem]:
+    return self.query(
+      tags = tags, rating_low = rating_low,
+      rating_high = rating_high, unsolved_by = handles
+    )
+
+def main ():
+  from .codeforces import CodeforcesAPI
+
+  async def async_main (handles: typing.List[str]):
+    API = CodeforcesAPI()
+
+    problems, _ = await API.problemset_problems()
+    index = ProblemIndex(problems)
+
+    for handle in handles:
+      index.add_submissions(handle, await API.user_status(handle = handle))
+
+    start = time.perf_counter()
+    unsolved = index.unsolved(handles, tags = ['dp'], rating_low = 1900, rating_high = 2100)
+    elapsed = time.perf_counter() - start
+
+    print(f'Indexed problems: {len(index.problems)}')
+    print(f'Unsolved: {len(unsolved)} ({elapsed * 1000:.2f} ms)')
+    for problem in unsolved[:10]:
+      print(problem)
+
+    await API.close()
+
+  asyncio.run(async_main(['4rrow', 'tourist', 'Petr', 'jiangly', 'Um_nik']))
+
+if __name__ == '__main__':
+  main()
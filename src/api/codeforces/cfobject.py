@@ -1,3 +1,5 @@
+import contextlib
+import contextvars
 import typing
 import json
 
@@ -11,6 +13,9 @@ def _try_typecast (value: typing.Any, to_type: typing.Type, default: typing.Any
   return typecasted_value
 
 class CodeforcesObject:
+  # attributes holding nested objects (or lists of them), used by from_dict
+  _nested: typing.Dict[str, typing.Type['CodeforcesObject']] = {}
+
   @staticmethod
   def to_str (attribute):
     return 'None' if attribute is None else str(attribute)
@@ -18,6 +23,28 @@ class CodeforcesObject:
   def __repr__ (self):
     return f'<{self.__class__.__name__}>'
 
+  def to_dict (self) -> dict:
+    def convert (value):
+      if isinstance(value, CodeforcesObject):
+        return value.to_dict()
+      if isinstance(value, (list, tuple)):
+        return [convert(item) for item in value]
+      return value
+
+    return { key: convert(value) for key, value in vars(self).items() }
+
+  @classmethod
+  def from_dict (cls, data: dict) -> 'CodeforcesObject':
+    def convert (key, value):
+      nested = cls._nested.get(key)
+      if nested is None or value is None:
+        return value
+      if isinstance(value, list):
+        return [nested.from_dict(item) for item in value]
+      return nested.from_dict(value)
+
+    return cls(**{ key: convert(key, value) for key, value in data.items() })
+
 class Member (CodeforcesObject):
   def __init__ (
     self,
@@ -35,6 +62,8 @@ Handle: {self.to_str(self.handle)}
     return member
 
 class Party (CodeforcesObject):
+  _nested = { 'members': Member }
+
   def __init__ (
     self,
     contest_id: int,
@@ -149,6 +178,8 @@ Best Submission Time: {self.to_str(datetime.fromtimestamp(self.best_submission_t
     return problemresult
 
 class Submission (CodeforcesObject):
+  _nested = { 'problem': Problem, 'author': Party }
+
   def __init__ (
     self,
     id: int,
@@ -346,6 +377,8 @@ Creation time: {self.to_str(datetime.fromtimestamp(self.creation_time_seconds))}
     return comment
 
 class RecentAction (CodeforcesObject):
+  _nested = { 'blog_entry': BlogEntry, 'comment': Comment }
+
   def __init__ (
     self,
     time_seconds: int,
@@ -465,6 +498,8 @@ Rating Update Time: {self.to_str(datetime.fromtimestamp(self.rating_update_time_
     return rating_change
 
 class Hack (CodeforcesObject):
+  _nested = { 'hacker': Party, 'defender': Party, 'problem': Problem }
+
   def __init__ (
     self,
     id: int,
@@ -507,6 +542,8 @@ Judge Protocol: {self.to_str(json.dumps(self.judge_protocol, indent = 2))}
     return hack
 
 class RanklistRow (CodeforcesObject):
+  _nested = { 'party': Party, 'problem_results': ProblemResult }
+
   def __init__ (
     self,
     party: Party,
@@ -548,6 +585,113 @@ Last Submission Time: {
 """
     return ranklist_row
 
+class _Frozen:
+  """Mixin of the interned classes, whose instances are shared and must not change"""
+
+  def __init__ (self, *args, **kwargs):
+    # built as the plain class (e.g. by from_dict), then frozen
+    plain = next(cls for cls in type(self).__mro__[1:] if not issubclass(cls, _Frozen))
+    self.__dict__.update(_frozen_values(vars(plain(*args, **kwargs))))
+
+  def __setattr__ (self, name: str, value: typing.Any) -> None:
+    raise AttributeError(f'{self.__class__.__name__} instances are interned and read-only')
+
+  def __delattr__ (self, name: str) -> None:
+    raise AttributeError(f'{self.__class__.__name__} instances are interned and read-only')
+
+class FrozenMember (_Frozen, Member):
+  pass
+
+class FrozenParty (_Frozen, Party):
+  _nested = { 'members': FrozenMember }
+
+class FrozenProblem (_Frozen, Problem):
+  pass
+
+def _frozen_values (values: dict) -> dict:
+  # lists become tuples, so nothing reachable from a shared instance is mutable
+  return { key: tuple(value) if isinstance(value, list) else value for key, value in values.items() }
+
+def _freeze (obj: CodeforcesObject, cls: typing.Type[CodeforcesObject]) -> CodeforcesObject:
+  obj.__dict__.update(_frozen_values(vars(obj)))
+  obj.__class__ = cls
+  return obj
+
+class IdentityMap:
+  """Canonical Problem, Party and Member instances keyed by their identity
+
+  A contest's submissions mention the same few problems and authors over and
+  over, with an identity map they all share one instance instead of each row
+  parsing its own copy. Shared instances are frozen (FrozenProblem, ...,
+  lists become tuples). A problem whose data changed (e.g. its rating was
+  set) replaces the canonical instance, and each kind keeps at most max_size
+  entries, the oldest are dropped first.
+  """
+
+  def __init__ (self, max_size: int = 100000):
+    self.max_size = max_size
+    self.problems: typing.Dict[tuple, typing.Tuple[tuple, Problem]] = {}
+    self.parties: typing.Dict[tuple, Party] = {}
+    self.members: typing.Dict[tuple, Member] = {}
+
+  def _bound (self, objects: dict) -> None:
+    if len(objects) > self.max_size:
+      del objects[next(iter(objects))]
+
+  def problem (self, data: dict) -> Problem:
+    key = (data.get('contestId'), data.get('problemsetName'), data.get('index'))
+    version = (data.get('rating'), data.get('name'), data.get('points'), data.get('type'), data.get('tags'))
+    entry = self.problems.get(key)
+    if entry is not None and entry[0] == version:
+      return entry[1]
+
+    problem = _freeze(problem_parse([data])[0], FrozenProblem)
+    self.problems[key] = (version, problem)
+    self._bound(self.problems)
+    return problem
+
+  def member (self, member: Member) -> Member:
+    key = (member.handle, member.name)
+    canonical = self.members.get(key)
+    if canonical is None:
+      canonical = self.members[key] = _freeze(member, FrozenMember)
+      self._bound(self.members)
+    return canonical
+
+  def party (self, data: dict) -> Party:
+    key = (
+      data.get('contestId'), tuple(member.get('handle') for member in data.get('members') or ()),
+      data.get('participantType'), data.get('teamId'), data.get('teamName'), data.get('ghost'),
+      data.get('room'), data.get('startTimeSeconds')
+    )
+    party = self.parties.get(key)
+    if party is None:
+      party = party_parse([data])[0]
+      party.members = [self.member(member) for member in party.members]
+      party = self.parties[key] = _freeze(party, FrozenParty)
+      self._bound(self.parties)
+    return party
+
+_identity_map: contextvars.ContextVar = contextvars.ContextVar('identity_map', default = None)
+
+@contextlib.contextmanager
+def identity_map (shared: IdentityMap = None) -> typing.Iterator[IdentityMap]:
+  """Share one identity map between every parse inside the block (session scope)
+
+  Without it every parse call uses its own map. Parsing offloaded to a process
+  pool runs outside the block and falls back to a map per parse call.
+  """
+
+  token = _identity_map.set(shared if shared is not None else IdentityMap())
+  try:
+    yield _identity_map.get()
+  finally:
+    _identity_map.reset(token)
+
+def _current_identity_map () -> IdentityMap:
+  objects = _identity_map.get()
+  return objects if objects is not None else IdentityMap()
+
 def member_parse (members: typing.List[dict]) -> typing.List[Member]:
   member_list = []
 
@@ -633,16 +777,17 @@ def problemresult_parse (problemresults: typing.List[dict]) -> typing.List[Probl
 
 def submission_parse (submissions: typing.List[dict]) -> typing.List[Submission]:
   submission_list = []
+  objects = _current_identity_map()
 
   for submission in submissions:
     problem = None
     author = None
     
     if submission.get('problem') is not None:
-      problem = problem_parse([submission.get('problem')])[0]
+      problem = objects.problem(submission.get('problem'))
     
     if submission.get('author') is not None:
-      author = party_parse([submission.get('author')])[0]
+      author = objects.party(submission.get('author'))
     
     contest_id = _try_typecast(submission.get('contestId'), int, 'NA')
     points = _try_typecast(submission.get('points'), float, 0.0)
@@ -812,6 +957,7 @@ def ratingchange_parse (ratingchanges: typing.List[dict]) -> typing.List[RatingC
 
 def hack_parse (hacks: typing.List[dict]) -> typing.List[Hack]:
   hack_list = []
+  objects = _current_identity_map()
 
   for hack in hacks:
     hacker = None
@@ -819,11 +965,11 @@ def hack_parse (hacks: typing.List[dict]) -> typing.List[Hack]:
     problem = None
 
     if hack.get('hacker') is not None:
-      hacker = party_parse([hack.get('hacker')])[0]
+      hacker = objects.party(hack.get('hacker'))
     if hack.get('defender') is not None:
-      defender = party_parse([hack.get('defender')])[0]
+      defender = objects.party(hack.get('defender'))
     if hack.get('problem') is not None:
-      problem = problem_parse([hack.get('problem')])[0]
+      problem = objects.problem(hack.get('problem'))
     
     id = int(hack.get('id'))
     creation_time_seconds = int(hack.get('creationTimeSeconds'))
@@ -840,13 +986,14 @@ def hack_parse (hacks: typing.List[dict]) -> typing.List[Hack]:
 
 def ranklistrow_parse (ranklistrows: typing.List[dict]) -> typing.List[RanklistRow]:
   ranklistrow_list = []
+  objects = _current_identity_map()
 
   for ranklistrow in ranklistrows:
     party = None
     problem_results = []
 
     if ranklistrow.get('party') is not None:
-      party = party_parse([ranklistrow.get('party')])[0]
+      party = objects.party(ranklistrow.get('party'))
     if ranklistrow.get('problemResult') is not None:
       problem_results = problemresult_parse(ranklistrow.get('problemResult'))
     
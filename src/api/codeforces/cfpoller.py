@@ -0,0 +1,201 @@
+"""
+api.codeforces.cfpoller
+-----------------------
+
+This module contains a poller for the Codeforces "firehose" methods,
+recentActions and problemset.recentStatus. Both return a window of
+the latest events, so consecutive polls overlap. The poller drops
+events it has already seen, using a bounded ring buffer of ids, and
+adapts the polling interval and window size to the event rate so
+that windows keep overlapping without fetching far more than needed.
+Every new event is delivered exactly once to every subscriber.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+import typing
+
+from .cfobject import RecentAction, Submission
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+class SeenIds:
+  def __init__ (self, size: int = 10000):
+    self.order = collections.deque()
+    self.ids = set()
+    self.size = size
+
+  def add (self, id: typing.Hashable) -> bool:
+    """Remember id, returns False if it was already seen"""
+
+    if id in self.ids:
+      return False
+    self.ids.add(id)
+    self.order.append(id)
+    if len(self.order) > self.size:
+      self.ids.discard(self.order.popleft())
+    return True
+
+  def __contains__ (self, id: typing.Hashable) -> bool:
+    return id in self.ids
+
+class Subscription:
+  def __init__ (self, poller: 'FirehosePoller'):
+    self.poller = poller
+    self.queue: asyncio.Queue = asyncio.Queue()
+
+  def __aiter__ (self):
+    return self
+
+  async def __anext__ (self) -> typing.Any:
+    event = await self.queue.get()
+    if event is _CLOSED:
+      raise StopAsyncIteration
+    return event
+
+  def close (self) -> None:
+    self.poller.unsubscribe(self)
+    self.queue.put_nowait(_CLOSED)
+
+class FirehosePoller:
+  def __init__ (
+    self,
+    fetch: typing.Callable[[int], typing.Awaitable[typing.List[typing.Any]]],
+    key: typing.Callable[[typing.Any], typing.Hashable], *,
+    accept: typing.Callable[[typing.Any], bool] = None,
+    min_count: int = 10,
+    max_count: int = 100,
+    min_interval: float = 2.0,
+    max_interval: float = 60.0,
+    seen_size: int = 10000
+  ):
+    """
+    :param fetch: fetch(count) returns the latest count events, newest first
+    :param key: unique id of an event
+    :param accept: events failing it are neither delivered nor remembered,
+      so they are seen again on a later poll (e.g. submissions still testing)
+    """
+
+    self.fetch = fetch
+    self.key = key
+    self.accept = accept
+    self.min_count = min_count
+    self.max_count = max_count
+    self.min_interval = min_interval
+    self.max_interval = max_interval
+
+    self.seen = SeenIds(seen_size)
+    self.subscribers: typing.List[Subscription] = []
+    self.count = min_count
+    self.interval = min_interval
+    self.rate = 0.0
+    self.last_error: typing.Optional[Exception] = None
+    self._last_poll = None
+
+  def subscribe (self) -> Subscription:
+    subscription = Subscription(self)
+    self.subscribers.append(subscription)
+    return subscription
+
+  def unsubscribe (self, subscription: Subscription) -> None:
+    if subscription in self.subscribers:
+      self.subscribers.remove(subscription)
+
+  def _adapt (self, fetched: int, new: int, overlapped: bool) -> None:
+    now = time.monotonic()
+    if self._last_poll is not None:
+      elapsed = max(now - self._last_poll, 1e-3)
+      # exponentially weighted events per second
+      self.rate = 0.7 * self.rate + 0.3 * (new / elapsed)
+    self._last_poll = now
+
+    if fetched >= self.count and not overlapped:
+      # a full window without known events may have skipped some
+      self.count = min(self.count * 2, self.max_count)
+      self.interval = max(self.interval / 2, self.min_interval)
+      return
+
+    # aim for half a window of new events per poll, so consecutive windows overlap
+    if self.rate > 0:
+      self.interval = min(max(self.count / 2 / self.rate, self.min_interval), self.max_interval)
+    else:
+      self.interval = min(self.interval * 1.5, self.max_interval)
+    expected = self.rate * self.interval * 2
+    self.count = int(min(max(expected, self.min_count), self.max_count))
+
+  async def poll (self) -> typing.List[typing.Any]:
+    """Fetch once and deliver the new events, oldest first"""
+
+    events = await self.fetch(self.count)
+    new_events = []
+    overlapped = False
+
+    for event in reversed(events):
+      if self.accept is not None and not self.accept(event):
+        continue
+      if self.seen.add(self.key(event)):
+        new_events.append(event)
+      else:
+        overlapped = True
+
+    self._adapt(len(events), len(new_events), overlapped)
+
+    for subscription in list(self.subscribers):
+      for event in new_events:
+        subscription.queue.put_nowait(event)
+    return new_events
+
+  def close (self) -> None:
+    for subscription in list(self.subscribers):
+      subscription.close()
+
+  async def run (self) -> None:
+    """Poll until cancelled, subscriptions are closed when it stops"""
+
+    failures = 0
+    try:
+      while True:
+        try:
+          await self.poll()
+        except Exception as e:
+          # an open circuit, a timeout or exhausted retries: back off and keep polling
+          failures += 1
+          self.last_error = e
+          delay = min(self.interval * 2 ** failures, self.max_interval)
+          logger.warning('poll failed (%s: %s), retrying in %.1f s', e.__class__.__name__, e, delay)
+          await asyncio.sleep(delay)
+        else:
+          failures = 0
+          await asyncio.sleep(self.interval)
+    finally:
+      self.close()
+
+def recent_actions_poller (api, **kwargs) -> FirehosePoller:
+  def key (action: RecentAction) -> typing.Hashable:
+    # recent actions have no id, a comment or blog entry update identifies one
+    comment = action.comment
+    blog_entry = action.blog_entry
+    return (
+      action.time_seconds,
+      blog_entry.id if blog_entry is not None else None,
+      comment.id if comment is not None else None
+    )
+
+  kwargs.setdefault('max_count', 100)
+  return FirehosePoller(lambda count: api.recent_actions(max_count = count), key, **kwargs)
+
+def recent_submissions_poller (api, *, problemset_name: str = None, final_only: bool = True, **kwargs) -> FirehosePoller:
+  def final (submission: Submission) -> bool:
+    return submission.verdict not in (None, 'TESTING')
+
+  kwargs.setdefault('max_count', 1000)
+  return FirehosePoller(
+    lambda count: api.problemset_recent_status(count = count, problemset_name = problemset_name),
+    lambda submission: submission.id,
+    accept = final if final_only else None,
+    **kwargs
+  )
@@ -0,0 +1,159 @@
+"""
+api.codeforces.cfrating
+-----------------------
+
+This module predicts Codeforces rating changes for a whole
+contest locally from its standings and pre-contest ratings.
+
+It follows the published Codeforces rating algorithm, but instead
+of computing every seed with an O(n^2) loop over participants it
+builds one table of seeds for every integer rating with a single
+convolution of the rating histogram against the Elo win
+probability curve, and answers every lookup from that table.
+"""
+
+import asyncio
+import numpy as np
+import time
+import typing
+
+from .cfobject import (
+  RanklistRow, RatingChange, User
+)
+
+_RATING_LOW = 1
+_RATING_HIGH = 8000
+
+def ratings_from_ratingchanges (ratingchanges: typing.List[RatingChange]) -> typing.Dict[str, int]:
+  return { ratingchange.handle: ratingchange.old_rating for ratingchange in ratingchanges }
+
+def ratings_from_users (users: typing.List[User]) -> typing.Dict[str, int]:
+  return { user.handle: user.rating for user in users }
+
+def _tie_ranks (ranks: np.ndarray) -> np.ndarray:
+  # Codeforces gives tied rows the same (first) rank, while the rating
+  # algorithm places every tied contestant at the last position of the tie
+  _, inverse, counts = np.unique(ranks, return_inverse = True, return_counts = True)
+  return np.cumsum(counts)[inverse]
+
+def _seed_table (ratings: np.ndarray, low: int, high: int) -> np.ndarray:
+  """seed_table[r - low] = 1 + sum of P(contestant beats rating r) over all contestants"""
+
+  rating_min = int(ratings.min())
+  rating_max = int(ratings.max())
+  histogram = np.bincount(ratings - rating_min).astype(np.float64)
+
+  # probability[j] is the win probability of a contestant rated (r - d) against
+  # rating r, where d = j + low - rating_max
+  differences = np.arange(low - rating_max, high - rating_min + 1, dtype = np.float64)
+  probability = 1.0 / (1.0 + np.power(10.0, differences / 400.0))
+
+  seeds = np.convolve(histogram, probability)
+  offset = rating_max - rating_min
+  return 1.0 + seeds[offset:offset + high - low + 1]
+
+def _java_div (numerator: np.ndarray, denominator: int) -> np.ndarray:
+  return np.trunc(numerator / denominator).astype(np.int64)
+
+def predict_deltas (
+  ratings: typing.Sequence[int],
+  ranks: typing.Sequence[int]
+) -> np.ndarray:
+  ratings = np.asarray(ratings, dtype = np.int64)
+  ranks = _tie_ranks(np.asarray(ranks, dtype = np.int64)).astype(np.float64)
+  n = len(ratings)
+
+  if n == 0:
+    return np.zeros(0, dtype = np.int64)
+
+  low = min(_RATING_LOW, int(ratings.min()))
+  high = max(_RATING_HIGH, int(ratings.max()))
+  seed_table = _seed_table(ratings, low, high)
+
+  # a contestant does not play against themselves, P(r beats r) = 0.5
+  seeds = seed_table[ratings - low] - 0.5
+  mid_ranks = np.sqrt(ranks * seeds)
+
+  # equivalent of the reference binary search over (1, 8000): the largest
+  # rating whose seed is still at least the mid rank, or 1 if there is none
+  searchable = -seed_table[_RATING_LOW + 1 - low:_RATING_HIGH - low]
+  need_ratings = _RATING_LOW + np.searchsorted(searchable, -mid_ranks, side = 'right')
+
+  deltas = _java_div(need_ratings - ratings, 2)
+
+  deltas += _java_div(-deltas.sum(), n) - 1
+
+  order = np.argsort(-ratings, kind = 'stable')
+  zero_sum_count = min(4 * int(np.floor(np.sqrt(n) + 0.5)), n)
+  top_sum = deltas[order[:zero_sum_count]].sum()
+  deltas += min(max(int(_java_div(-top_sum, zero_sum_count)), -10), 0)
+
+  return deltas
+
+def predict_rating_changes (
+  rows: typing.List[RanklistRow],
+  ratings: typing.Dict[str, int],
+  *,
+  default_rating: int = 1400
+) -> typing.Dict[str, int]:
+  handles = []
+  contestant_ratings = []
+  ranks = []
+
+  for row in rows:
+    if row.party is None or row.party.participant_type != 'CONTESTANT':
+      continue
+    if len(row.party.members) != 1:
+      continue
+    handle = row.party.members[0].handle
+    handles.append(handle)
+    contestant_ratings.append(ratings.get(handle, default_rating))
+    ranks.append(row.rank)
+
+  deltas = predict_deltas(contestant_ratings, ranks)
+  return dict(zip(handles, deltas.tolist()))
+
+def _seeds_naive (ratings: typing.Sequence[int]) -> typing.List[float]:
+  def win_probability (a: int, b: int) -> float:
+    return 1.0 / (1.0 + 10 ** ((b - a) / 400.0))
+
+  return [
+    1 + sum(win_probability(other, rating) for j, other in enumerate(ratings) if j != i)
+    for i, rating in enumerate(ratings)
+  ]
+
+def main ():
+  from .codeforces import CodeforcesAPI
+
+  async def async_main (contest_id: int):
+    API = CodeforcesAPI()
+
+    ratingchanges = await API.contest_rating_changes(contest_id = contest_id)
+    _, _, rows = await API.contest_standings(contest_id = contest_id)
+
+    ratings = ratings_from_ratingchanges(ratingchanges)
+    actual = { rc.handle: rc.new_rating - rc.old_rating for rc in ratingchanges }
+
+    start = time.perf_counter()
+    predicted = predict_rating_changes(rows, ratings)
+    elapsed = time.perf_counter() - start
+
+    sample = list(ratings.values())[:2000]
+    naive_start = time.perf_counter()
+    _seeds_naive(sample)
+    naive_elapsed = (time.perf_counter() - naive_start) * (len(predicted) / max(len(sample), 1)) ** 2
+
+    errors = [abs(predicted[handle] - actual[handle]) for handle in predicted if handle in actual]
+    print(f'Contest: {contest_id}')
+    print(f'Participants: {len(predicted)}')
+    print(f'Vectorized prediction: {elapsed * 1000:.1f} ms')
+    print(f'Naive seeds (extrapolated): {naive_elapsed:.1f} s')
+    print(f'Exact matches: {sum(error == 0 for error in errors)}/{len(errors)}')
+    print(f'Mean absolute error: {sum(errors) / max(len(errors), 1):.2f}')
+
+    await API.close()
+
+  asyncio.run(async_main(1642))
+
+if __name__ == '__main__':
+  main()
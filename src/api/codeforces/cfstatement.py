@@ -0,0 +1,220 @@
+"""
+api.codeforces.cfstatement
+--------------------------
+
+This module contains the problem statement scraper. Statements are
+not part of the Codeforces API, they are read from the problem pages
+and converted to markdown. Statements of a finished contest never
+change, so every parsed statement is cached on disk and a repeated
+clone does not touch the network.
+"""
+
+import asyncio
+import aiohttp
+import bs4
+import markdownify
+import ratelimit
+import re
+import typing
+
+from .. import cache, profiling
+from .cfexception import StatusFailedError
+from .cfobject import CodeforcesObject, Problem
+
+class ProblemStatement (CodeforcesObject):
+  def __init__ (
+    self,
+    contest_id: int,
+    index: str,
+    name: str,
+    time_limit: str,
+    memory_limit: str,
+    statement: str,
+    samples: typing.List[typing.Tuple[str, str]]
+  ):
+    self.contest_id = contest_id
+    self.index = index
+    self.name = name
+    self.time_limit = time_limit
+    self.memory_limit = memory_limit
+    self.statement = statement
+    self.samples = samples
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.contest_id}{self.index} - {self.name}]>'
+
+def _math (text: str) -> str:
+  # Codeforces writes $$$x$$$ for inline and $$$$$$x$$$$$$ for display math
+  text = re.sub(r'\${6}(.+?)\${6}', r'$$\1$$', text, flags = re.S)
+  return re.sub(r'\${3}(.+?)\${3}', r'$\1$', text, flags = re.S)
+
+def _pre_text (pre) -> str:
+  # newer samples put every line in its own div, older ones use <br>
+  lines = pre.find_all('div', class_ = 'test-example-line')
+  if lines:
+    text = '\n'.join(line.get_text() for line in lines)
+  else:
+    for br in pre.find_all('br'):
+      br.replace_with('\n')
+    text = pre.get_text()
+  return text.strip('\n') + '\n'
+
+def statement_parse (contest_id: int, index: str, html: str) -> ProblemStatement:
+  soup = bs4.BeautifulSoup(html, 'html.parser')
+  root = soup.find('div', class_ = 'problem-statement')
+  if root is None:
+    raise ValueError(f'Problem {contest_id}{index} has no statement')
+
+  header = root.find('div', class_ = 'header')
+  title = header.find('div', class_ = 'title').get_text(strip = True)
+  name = re.sub(r'^[A-Z][0-9]*\.\s*', '', title)
+
+  def limit (class_: str) -> str:
+    node = header.find('div', class_ = class_)
+    if node is None:
+      return ''
+    label = node.find('div', class_ = 'property-title')
+    if label is not None:
+      label.extract()
+    return node.get_text(strip = True)
+
+  time_limit = limit('time-limit')
+  memory_limit = limit('memory-limit')
+
+  samples = []
+  sample_tests = root.find('div', class_ = 'sample-tests')
+  if sample_tests is not None:
+    inputs = [_pre_text(div.find('pre')) for div in sample_tests.find_all('div', class_ = 'input')]
+    outputs = [_pre_text(div.find('pre')) for div in sample_tests.find_all('div', class_ = 'output')]
+    samples = list(zip(inputs, outputs))
+    sample_tests.decompose()
+
+  header.decompose()
+  for section_title in root.find_all('div', class_ = 'section-title'):
+    section_title.name = 'h4'
+
+  statement = markdownify.markdownify(
+    str(root), heading_style = markdownify.ATX, escape_underscores = False
+  )
+  statement = re.sub(r'\n{3,}', '\n\n', _math(statement)).strip()
+
+  return ProblemStatement(contest_id, index, name, time_limit, memory_limit, statement, samples)
+
+def statement_to_markdown (problem: Problem, statement: ProblemStatement) -> str:
+  newline = '\n'
+  return f"""\
+# [{statement.contest_id}{statement.index}] {statement.name}
+
+{f"**[{', '.join(problem.tags)}]**" if problem.tags else ''}
+
+- rating: {problem.rating or 'None'}
+- time limit: {statement.time_limit}
+- memory limit: {statement.memory_limit}
+
+### Statement
+
+{statement.statement}
+
+<br>
+
+### Examples
+
+{newline.join(
+  f'```{newline}{sample_input}```{newline}{newline}```{newline}{sample_output}```{newline}'
+  for sample_input, sample_output in statement.samples
+) if statement.samples else 'None'}
+
+<br>
+
+### Solution
+
+```
+```
+"""
+
+@ratelimit.limits(calls = 2, period = 1)
+async def _website_call (callback, *args, **kwargs):
+  return await callback(*args, **kwargs)
+
+async def _loop_until_success (callback, *args, **kwargs):
+  sleep_duration = 0.5
+
+  while True:
+    try:
+      return await _website_call(callback, *args, **kwargs)
+    except ratelimit.RateLimitException:
+      with profiling.phase('codeforces.ratelimit'):
+        await asyncio.sleep(sleep_duration)
+
+async def contest_problems (api, contest_id: int) -> typing.List[Problem]:
+  """Problems of a contest, from contest.standings or, failing that, problemset.problems"""
+
+  path = cache.cache_path('codeforces', 'statements', str(contest_id), 'problems.json')
+  cached = cache.read_json(path)
+  if cached is not None:
+    return [Problem.from_dict(problem) for problem in cached]
+
+  try:
+    _, problems, _ = await api.contest_standings(contest_id = contest_id, count = 1)
+  except StatusFailedError:
+    # e.g. contests whose standings are hidden
+    problems, _ = await api.problemset_problems()
+    problems = [problem for problem in problems if problem.contest_id == contest_id]
+
+  if not problems:
+    raise ValueError(f'Contest {contest_id} has no problems')
+  cache.write_json(path, [problem.to_dict() for problem in problems])
+  return problems
+
+class StatementFetcher:
+  base_url = 'https://codeforces.com/'
+
+  def __init__ (self, *, concurrency: int = 4, request_timeout: float = 30.0):
+    self.concurrency = concurrency
+    self.timeout = aiohttp.ClientTimeout(total = request_timeout)
+    self.session = None
+    self._semaphore = None
+
+  async def _get_session (self) -> aiohttp.ClientSession:
+    if self.session is None or self.session.closed:
+      self.session = aiohttp.ClientSession(
+        connector = aiohttp.TCPConnector(limit_per_host = self.concurrency),
+        timeout = self.timeout
+      )
+      self._semaphore = asyncio.Semaphore(self.concurrency)
+    return self.session
+
+  async def close (self) -> None:
+    if self.session is not None:
+      await self.session.close()
+
+  def get_url (self, contest_id: int, index: str) -> str:
+    kind = 'gym' if contest_id >= 100000 else 'contest'
+    return f'{self.base_url}{kind}/{contest_id}/problem/{index}'
+
+  async def statement (self, contest_id: int, index: str) -> ProblemStatement:
+    path = cache.cache_path('codeforces', 'statements', str(contest_id), f'{index}.json')
+    cached = cache.read_json(path)
+    if cached is not None:
+      return ProblemStatement.from_dict(cached)
+
+    session = await self._get_session()
+
+    async def request () -> str:
+      with profiling.phase('codeforces.request'):
+        async with session.get(self.get_url(contest_id, index)) as r:
+          r.raise_for_status()
+          return await r.text()
+
+    async with self._semaphore:
+      html = await _loop_until_success(request)
+
+    with profiling.phase('codeforces.statement_parse'):
+      statement = statement_parse(contest_id, index, html)
+    cache.write_json(path, statement.to_dict())
+    return statement
+
+  async def contest (self, problems: typing.List[Problem]) -> typing.List[ProblemStatement]:
+    return await asyncio.gather(*(
+      self.statement(problem.contest_id, problem.index) for problem in problems
+    ))
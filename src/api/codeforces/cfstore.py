@@ -0,0 +1,48 @@
+"""
+api.codeforces.cfstore
+----------------------
+
+This module contains the on-disk store of raw Codeforces API
+responses used by the offline and stale-while-revalidate modes of
+CodeforcesAPI. Responses are kept exactly as received and parsed on
+read, so the store does not depend on the object model.
+"""
+
+import contextvars
+import hashlib
+import os
+import typing
+
+from .. import cache
+
+_response_age: contextvars.ContextVar = contextvars.ContextVar('response_age', default = None)
+
+def last_response_age () -> typing.Optional[float]:
+  """Age in seconds of the last response returned in this task if it was stale, None if it was fresh
+
+  Ages set in tasks (e.g. under asyncio.gather) are not seen by the caller,
+  use CodeforcesAPI.with_age() there.
+  """
+  return _response_age.get()
+
+class ResponseStore:
+  def __init__ (self, path: str = None):
+    self.path = path if path is not None else cache.cache_path('codeforces', 'responses')
+
+  def key (self, route: str, params: dict) -> str:
+    query = '&'.join(f'{key}={value}' for key, value in sorted((key, str(value)) for key, value in params.items()))
+    return os.path.join(route, hashlib.sha1(query.encode()).hexdigest())
+
+  def get (self, route: str, params: dict) -> typing.Optional[typing.Tuple[bytes, float]]:
+    """Return (body, stored_at) of the last stored response"""
+
+    path = os.path.join(self.path, self.key(route, params))
+    try:
+      with open(path, 'rb') as file:
+        return file.read(), os.fstat(file.fileno()).st_mtime
+    except FileNotFoundError:
+      return None
+
+  def put (self, route: str, params: dict, body: bytes) -> None:
+    cache.write_bytes(os.path.join(self.path, self.key(route, params)), body)
+
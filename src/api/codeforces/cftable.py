@@ -0,0 +1,216 @@
+"""
+api.codeforces.cftable
+----------------------
+
+This module contains a column oriented table renderer for CLI
+output. Objects are rendered a chunk at a time: each column is
+extracted and formatted as a whole (timestamps are converted in one
+numpy call), column widths are fixed from a sample of the first
+rows and every chunk is written with a single write call.
+"""
+
+import operator
+import sys
+import time
+import typing
+
+from .cfobject import CodeforcesObject, Party
+
+_TIMESTAMP_COLUMNS = {
+  'creation_time_seconds',
+  'last_online_time_seconds',
+  'modification_time_seconds',
+  'rating_update_time_seconds',
+  'registration_time_seconds',
+  'start_time_seconds',
+  'time_seconds',
+}
+
+_DEFAULT_COLUMNS = {
+  'Submission': [
+    'id', 'creation_time_seconds', 'author', 'problem.index', 'problem.name',
+    'programming_language', 'verdict', 'time_consumed_millis', 'memory_consumed_bytes'
+  ],
+  'RanklistRow': ['rank', 'party', 'points', 'penalty', 'successful_hack_count', 'unsuccessful_hack_count'],
+  'RatingChange': ['contest_id', 'contest_name', 'handle', 'rank', 'old_rating', 'new_rating', 'rating_update_time_seconds'],
+  'Problem': ['contest_id', 'index', 'name', 'rating', 'tags'],
+  'User': ['handle', 'rating', 'max_rating', 'rank', 'country', 'organization', 'last_online_time_seconds'],
+  'Hack': ['id', 'creation_time_seconds', 'hacker', 'defender', 'problem.index', 'verdict'],
+  'Contest': ['id', 'name', 'type', 'phase', 'start_time_seconds', 'duration_seconds'],
+}
+
+def default_columns (obj: CodeforcesObject) -> typing.List[str]:
+  # interned objects are subclasses (FrozenProblem), so the mro is searched
+  for cls in type(obj).__mro__:
+    columns = _DEFAULT_COLUMNS.get(cls.__name__)
+    if columns is not None:
+      return columns
+  return [
+    key for key, value in vars(obj).items()
+    if not isinstance(value, (CodeforcesObject, list, tuple, dict))
+  ]
+
+def _column_values (objects: typing.List[typing.Any], column: str) -> typing.List[typing.Any]:
+  try:
+    return list(map(operator.attrgetter(column), objects))
+  except AttributeError:
+    pass
+
+  # some rows lack a nested object (None), fall back to a per row walk
+  parts = column.split('.')
+  values = []
+  for obj in objects:
+    for part in parts:
+      obj = getattr(obj, part, None)
+    values.append(obj)
+  return values
+
+def _format_timestamps (values: typing.List[typing.Any]) -> typing.List[str]:
+  import numpy as np
+
+  seconds = np.array([value if isinstance(value, int) else 0 for value in values], dtype = np.int64)
+  # local time like datetime.fromtimestamp, with the UTC offset looked up once per
+  # hour (DST changes happen on hour boundaries, a day can have two offsets)
+  hours, inverse = np.unique(seconds // 3600, return_inverse = True)
+  offsets = np.array([time.localtime(int(hour) * 3600).tm_gmtoff for hour in hours], dtype = np.int64)
+  text = np.datetime_as_string((seconds + offsets[inverse]).astype('datetime64[s]'), unit = 's')
+  formatted = np.char.replace(text, 'T', ' ').tolist()
+  return [
+    cell if isinstance(value, int) and value > 0 else ''
+    for cell, value in zip(formatted, values)
+  ]
+
+def _format_cell (value: typing.Any) -> str:
+  if value is None:
+    return ''
+  if isinstance(value, Party):
+    if len(value.members) == 1:
+      return value.members[0].handle
+    return value.team_name or ','.join(member.handle for member in value.members)
+  if isinstance(value, (list, tuple)):
+    if value and isinstance(value[0], CodeforcesObject):
+      return f'[{len(value)}]'
+    return ','.join(map(str, value))
+  if isinstance(value, float):
+    return f'{value:g}'
+  return str(value)
+
+def _format_column (column: str, values: typing.List[typing.Any]) -> typing.List[str]:
+  if column.rpartition('.')[2] in _TIMESTAMP_COLUMNS:
+    return _format_timestamps(values)
+
+  # most columns are homogeneous, so the common cases skip _format_cell
+  types = set(map(type, values))
+  if types == { str }:
+    return values
+  if types == { int }:
+    return list(map(str, values))
+  return list(map(_format_cell, values))
+
+class TableWriter:
+  def __init__ (
+    self,
+    file: typing.TextIO, *,
+    columns: typing.List[str] = None,
+    sample_size: int = 1000,
+    chunk_size: int = 10000,
+    max_width: int = 40
+  ):
+    self.file = file
+    self.columns = columns
+    self.sample_size = sample_size
+    self.chunk_size = chunk_size
+    self.max_width = max_width
+    self.count = 0
+    self._pending = []
+    self._format = None
+
+  def _prepare (self, objects: typing.List[typing.Any], cells: typing.List[typing.List[str]]) -> None:
+    widths = []
+    aligns = []
+    for column, values in zip(self.columns, cells):
+      sample = values[:self.sample_size]
+      widths.append(min(max([len(column)] + list(map(len, sample))), self.max_width))
+      numeric = all(type(value) in (int, float) for value in _column_values(objects[:self.sample_size], column))
+      aligns.append('>' if numeric and column.rpartition('.')[2] not in _TIMESTAMP_COLUMNS else '<')
+
+    self._format = '  '.join(f'{{:{align}{width}.{width}}}' for align, width in zip(aligns, widths))
+    self.file.write(self._format.format(*self.columns).rstrip() + '\n')
+    self.file.write('  '.join('-' * width for width in widths) + '\n')
+
+  def _render (self) -> None:
+    objects = self._pending
+    self._pending = []
+    if not objects:
+      return
+
+    if self.columns is None:
+      self.columns = default_columns(objects[0])
+
+    cells = [_format_column(column, _column_values(objects, column)) for column in self.columns]
+    if self._format is None:
+      self._prepare(objects, cells)
+
+    line = self._format.format
+    self.file.write('\n'.join(line(*row).rstrip() for row in zip(*cells)))
+    self.file.write('\n')
+    self.count += len(objects)
+
+  def write (self, obj: typing.Any) -> None:
+    self._pending.append(obj)
+    if len(self._pending) >= self.chunk_size:
+      self._render()
+
+  def write_many (self, objects: typing.Iterable[typing.Any]) -> None:
+    for obj in objects:
+      self.write(obj)
+
+  def flush (self) -> None:
+    self._render()
+    self.file.flush()
+
+def render (
+  objects: typing.Iterable[typing.Any],
+  columns: typing.List[str] = None,
+  file: typing.TextIO = None,
+  **kwargs
+) -> int:
+  writer = TableWriter(file if file is not None else sys.stdout, columns = columns, **kwargs)
+  writer.write_many(objects)
+  writer.flush()
+  return writer.count
+
+def main ():
+  import io
+
+  from .cfobject import Member, Problem, Submission
+
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+  problems = [Problem(1642, None, index, f'Problem {index}', 'PROGRAMMING', 0.0, 800, []) for index in 'ABCDEF']
+  parties = [Party(1642, [Member(f'user{i}', None)], 'CONTESTANT', None, None, False, None, 0) for i in range(20000)]
+  submissions = [
+    Submission(
+      150000000 + i, 1642, 1646408543 + i, i, problems[i % 6], parties[i % 20000],
+      'GNU C++17', 'OK', 'TESTS', 10, 15, 1024 * (i % 4096), 0.0
+    )
+    for i in range(count)
+  ]
+
+  start = time.perf_counter()
+  output = io.StringIO()
+  for submission in submissions:
+    output.write(str(submission))
+  str_elapsed = time.perf_counter() - start
+
+  start = time.perf_counter()
+  output = io.StringIO()
+  render(submissions, file = output)
+  table_elapsed = time.perf_counter() - start
+
+  print(output.getvalue()[:400])
+  print(f'Rows: {count}')
+  print(f'__str__: {str_elapsed:.2f} s')
+  print(f'Table: {table_elapsed:.2f} s ({str_elapsed / table_elapsed:.1f}x faster)')
+
+if __name__ == '__main__':
+  main()
@@ -1,14 +1,19 @@
 import asyncio
 import aiohttp
 import binascii
-import hashlib
-import random
+import concurrent.futures
 import ratelimit
-import string
-import typing
 import time
+import typing
 
-from cfobject import (
+from .. import jsoncodec, objectcodec, profiling
+from ..deadline import run_with_deadline
+from ..hedge import HedgePolicy
+from ..retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from .cfauth import APIKey, APIKeyPool
+from .cfstore import ResponseStore, _response_age
+from .cfobject import (
+  CodeforcesObject,
   Member, Party, Problem,
   ProblemStatistic, ProblemResult, Submission,
   User, BlogEntry, Comment,
@@ -21,13 +26,39 @@ from cfobject import (
   hack_parse, ranklistrow_parse
 )
 
-from cfexception import (
+from .cfexception import (
   StatusNotFoundError,
   StatusFailedError,
   CommentNotFoundError,
-  ResultNotFoundError
+  ResultNotFoundError,
+  CallLimitExceededError,
+  InvalidResponseError,
+  ServerError,
+  OfflineResponseNotFoundError,
+  StandingsShiftedError
+)
+
+_RETRYABLE_ERRORS = (
+  asyncio.TimeoutError,
+  aiohttp.ClientConnectionError,
+  aiohttp.ClientPayloadError,
+  InvalidResponseError,
+  ServerError
+)
+
+# call limit replies come from a healthy server, they are backed off but
+# not counted as circuit breaker failures
+_TRANSIENT_ERRORS = (
+  CallLimitExceededError,
 )
 
+def default_retry_policy () -> RetryPolicy:
+  return RetryPolicy(
+    retryable = _RETRYABLE_ERRORS,
+    transient = _TRANSIENT_ERRORS,
+    circuit_breaker = CircuitBreaker()
+  )
+
 class CodeforcesAPIRoute:
   base_url = 'https://codeforces.com/api/'
 
@@ -77,7 +108,8 @@ async def _loop_until_success (callback, *args, **kwargs):
     try:
       return_value = await _API_call(callback, *args, **kwargs)
     except ratelimit.RateLimitException:
-      await asyncio.sleep(sleep_duration)
+      with profiling.phase('codeforces.ratelimit'):
+        await asyncio.sleep(sleep_duration)
     else:
       break
 
@@ -90,27 +122,302 @@ def check_status (response: dict):
     if 'result' not in response.keys():
       raise ResultNotFoundError('Codeforces API call response does not contain result')
   else:
-    if 'comment' not in response.keys():
+    if not response.get('comment'):
       raise CommentNotFoundError('Reason for Codeforces API call {"status": "FAILED"} not found')
+    elif response.get('comment').startswith('Call limit exceeded'):
+      raise CallLimitExceededError(response.get('comment'))
     else:
       raise StatusFailedError(response.get('comment'))
 
+def _result (result: typing.Any) -> typing.Any:
+  return result
+
+def _blogentry_view_parse (result: dict) -> typing.List[BlogEntry]:
+  return blogentry_parse([result])
+
+def _contest_standings_parse (
+  result: dict
+) -> typing.Tuple[Contest, typing.List[Problem], typing.List[RanklistRow]]:
+  contest = contest_parse([result.get('contest')])[0]
+  problem_list = problem_parse(result.get('problems'))
+  ranklistrow_list = ranklistrow_parse(result.get('rows'))
+  return contest, problem_list, ranklistrow_list
+
+def _problemset_problems_parse (
+  result: dict
+) -> typing.Tuple[typing.List[Problem], typing.List[ProblemStatistic]]:
+  problem_list = problem_parse(result.get('problems'))
+  problemstatistic_list = problemstatistic_parse(result.get('problemStatistics'))
+  return problem_list, problemstatistic_list
+
+def _decode_and_parse (body: bytes, parser: typing.Callable) -> typing.Any:
+  try:
+    response = jsoncodec.loads(body)
+  except ValueError as e:
+    raise InvalidResponseError(f'Codeforces API call response is not JSON: {body[:80]!r}') from e
+  check_status(response)
+  return parser(response.get('result'))
+
+class _Encoded:
+  """Parsed objects as an api.objectcodec payload, which is far cheaper for
+  the parent process to load than the pickled object graph"""
+
+  def __init__ (self, data: bytes, single: bool):
+    self.data = data
+    self.single = single
+
+def _encode (result: typing.Any) -> typing.Any:
+  if isinstance(result, tuple):
+    return tuple(_encode(item) for item in result)
+  if isinstance(result, CodeforcesObject):
+    return _Encoded(objectcodec.dumps([result]), True)
+  if isinstance(result, list) and result and all(isinstance(item, CodeforcesObject) for item in result):
+    return _Encoded(objectcodec.dumps(result), False)
+  return result
+
+def _unencode (result: typing.Any) -> typing.Any:
+  if isinstance(result, tuple):
+    return tuple(_unencode(item) for item in result)
+  if isinstance(result, _Encoded):
+    objects = objectcodec.loads(result.data)
+    return objects[0] if result.single else objects
+  return result
+
+def _decode_parse_and_encode (body: bytes, parser: typing.Callable) -> typing.Any:
+  return _encode(_decode_and_parse(body, parser))
+
+def _discard (result: typing.Any) -> None:
+  return None
+
+async def _decode (
+  body: bytes,
+  parser: typing.Callable,
+  executor: concurrent.futures.Executor = None,
+  offload_threshold: int = 0
+) -> typing.Any:
+  # decoding and object construction of large responses can take seconds, so
+  # they are sent to the executor (usually a process pool) to keep the event loop
+  # responsive; parser must be a module level function so that it can be pickled
+  if executor is None or len(body) < offload_threshold:
+    return _decode_and_parse(body, parser)
+  
+  # the result comes back as objectcodec payloads (native arrays, dictionary
+  # encoded strings) rather than a pickled object graph, the parent only
+  # rebuilds the objects from their columns, in a thread off the event loop
+  loop = asyncio.get_running_loop()
+  result = await loop.run_in_executor(executor, _decode_parse_and_encode, body, parser)
+  return await loop.run_in_executor(None, _unencode, result)
+
 async def codeforces_api_call (
   route: CodeforcesAPIRoute,
   params: dict,
-) -> dict:
-  async def request () -> dict:
-    async with aiohttp.ClientSession() as session:
-      async with session.get(route.get_url(), params = params) as r:
-        return await r.json()
+  parser: typing.Callable = _result,
+  *,
+  session: aiohttp.ClientSession = None,
+  key_pool: APIKeyPool = None,
+  retry_policy: RetryPolicy = None,
+  executor: concurrent.futures.Executor = None,
+  offload_threshold: int = 0,
+  request_timeout: float = None,
+  call_timeout: float = None,
+  hedge_policy: HedgePolicy = None,
+  response_store: ResponseStore = None
+) -> typing.Any:
+  # request_timeout bounds a single HTTP request and is retried like any
+  # other timeout, call_timeout (and an enclosing api.deadline.deadline())
+  # bounds the whole call including limiter waits and retries
+  timeout = aiohttp.ClientTimeout(total = request_timeout) if request_timeout is not None else None
+
+  async def fetch (session: aiohttp.ClientSession, params: dict) -> bytes:
+    with profiling.phase('codeforces.request'):
+      async with session.get(route.get_url(), params = params, timeout = timeout) as r:
+        # {"status": "FAILED"} comes with HTTP 400 and is handled by check_status
+        if r.status >= 500 or r.status == 429:
+          raise ServerError(r.status, parse_retry_after(r.headers.get('Retry-After')))
+        return await r.read()
+
+  async def request (params: dict = params) -> bytes:
+    if session is not None:
+      return await fetch(session, params)
+    async with aiohttp.ClientSession() as temporary_session:
+      return await fetch(temporary_session, params)
+
+  async def signed_request (key: APIKey) -> bytes:
+    # signed per attempt, so the timestamp is always fresh
+    return await request(key.sign(route.get_path(), params))
   
-  response = await _loop_until_success(request)
-  check_status(response)
-  return response
+  async def limited_request () -> bytes:
+    if key_pool is None:
+      return await _loop_until_success(request)
+    return await key_pool.call(signed_request)
+
+  async def attempt () -> typing.Any:
+    # every API method is an idempotent GET, so a slow request can be hedged;
+    # each hedge goes through the rate limiter like any other request
+    if hedge_policy is None:
+      body = await limited_request()
+    else:
+      body = await hedge_policy.run(route.route, limited_request)
+
+    with profiling.phase('codeforces.decode'):
+      result = await _decode(body, parser, executor, offload_threshold)
+    # only responses that parsed successfully are kept for offline use
+    if response_store is not None:
+      response_store.put(route.route, params, body)
+    return result
+
+  if retry_policy is None:
+    return await run_with_deadline(attempt(), call_timeout)
+  return await run_with_deadline(retry_policy.run(attempt), call_timeout)
 
 class CodeforcesAPI:
-  def __init__ (self):
-    pass
+  def __init__ (
+    self, *,
+    executor: concurrent.futures.Executor = None,
+    offload_threshold: int = 1 << 20,
+    key_pool: APIKeyPool = None,
+    sign_all_requests: bool = False,
+    retry_policy: RetryPolicy = None,
+    route_retry_policies: typing.Dict[str, RetryPolicy] = None,
+    request_timeout: float = 30.0,
+    call_timeout: float = None,
+    hedge_policy: HedgePolicy = None,
+    response_store: ResponseStore = None,
+    stale_while_revalidate: bool = False,
+    offline: bool = False
+  ):
+    # with a response store every response is recorded; stale_while_revalidate
+    # answers from it immediately and refreshes in the background, offline
+    # never touches the network (api.codeforces.cfstore.last_response_age()
+    # tells whether the last result was stale)
+    if response_store is None and (stale_while_revalidate or offline):
+      response_store = ResponseStore()
+    self.response_store = response_store
+    self.stale_while_revalidate = stale_while_revalidate
+    self.offline = offline
+    self._revalidating: typing.Dict[str, asyncio.Task] = {}
+    self.request_timeout = request_timeout
+    self.call_timeout = call_timeout
+    self.hedge_policy = hedge_policy
+    self.retry_policy = retry_policy if retry_policy is not None else default_retry_policy()
+    self.route_retry_policies = route_retry_policies or {}
+    self.executor = executor
+    self.offload_threshold = offload_threshold
+    self.key_pool = key_pool
+    self.sign_all_requests = sign_all_requests
+    self.session = None
+    self._key_pools = {}
+  
+  async def _get_session (self) -> aiohttp.ClientSession:
+    # created lazily so that the session belongs to the loop that uses it
+    if self.session is None or self.session.closed:
+      self.session = aiohttp.ClientSession()
+    return self.session
+  
+  async def close (self, revalidate_timeout: float = 10.0) -> None:
+    # background refreshes get a bounded time to store their response,
+    # only the ones still running after that are cancelled
+    pending = list(self._revalidating.values())
+    if pending:
+      _, unfinished = await asyncio.wait(pending, timeout = revalidate_timeout)
+      for task in unfinished:
+        task.cancel()
+      await asyncio.gather(*unfinished, return_exceptions = True)
+    if self.session is not None:
+      await self.session.close()
+
+  async def with_age (
+    self,
+    method: typing.Callable[..., typing.Awaitable[typing.Any]],
+    **kwargs
+  ) -> typing.Tuple[typing.Any, typing.Optional[float]]:
+    """Call an API method, returns (result, age) where age is None for a fresh response
+
+    Unlike last_response_age(), the age travels with the result, so calls
+    can be gathered: await asyncio.gather(api.with_age(api.user_info, handles = [...]), ...)
+    """
+
+    result = await method(**kwargs)
+    return result, _response_age.get()
+  
+  def _revalidate (self, route: CodeforcesAPIRoute, params: dict, key_pool: APIKeyPool) -> None:
+    key = self.response_store.key(route.route, params)
+    if key in self._revalidating:
+      return
+
+    async def refresh () -> None:
+      # the parser is skipped, the fresh body is only validated and stored
+      await codeforces_api_call(
+        route, params, _discard,
+        session = await self._get_session(),
+        key_pool = key_pool,
+        retry_policy = self.route_retry_policies.get(route.route, self.retry_policy),
+        request_timeout = self.request_timeout,
+        call_timeout = self.call_timeout,
+        response_store = self.response_store
+      )
+
+    def done (task: asyncio.Task) -> None:
+      self._revalidating.pop(key, None)
+      # a failed refresh keeps serving the stored response
+      if not task.cancelled():
+        task.exception()
+
+    task = self._revalidating[key] = asyncio.ensure_future(refresh())
+    task.add_done_callback(done)
+
+  async def _call (
+    self,
+    route: CodeforcesAPIRoute,
+    params: dict,
+    parser: typing.Callable = _result,
+    *,
+    key_pool: APIKeyPool = None
+  ) -> typing.Any:
+    if key_pool is None and self.sign_all_requests:
+      key_pool = self.key_pool
+
+    if self.offline or self.stale_while_revalidate:
+      stored = self.response_store.get(route.route, params)
+      if stored is not None:
+        body, stored_at = stored
+        if not self.offline:
+          self._revalidate(route, params, key_pool)
+        _response_age.set(max(time.time() - stored_at, 0.0))
+        return await _decode(body, parser, self.executor, self.offload_threshold)
+      if self.offline:
+        raise OfflineResponseNotFoundError(f'No stored response for {route.get_path()} {params}')
+
+    _response_age.set(None)
+    return await codeforces_api_call(
+      route, params, parser,
+      session = await self._get_session(),
+      key_pool = key_pool,
+      retry_policy = self.route_retry_policies.get(route.route, self.retry_policy),
+      executor = self.executor,
+      offload_threshold = self.offload_threshold,
+      request_timeout = self.request_timeout,
+      call_timeout = self.call_timeout,
+      hedge_policy = self.hedge_policy,
+      response_store = self.response_store
+    )
+  
+  async def paginate (
+    self,
+    method: typing.Callable[..., typing.Awaitable[typing.List[typing.Any]]],
+    *,
+    page_size: int = 10000,
+    **kwargs
+  ) -> typing.AsyncIterator[typing.List[typing.Any]]:
+    # for methods accepting start_index/count (contest_status, user_status),
+    # only one page is held in memory at a time
+    start_index = 1
+    while True:
+      page = await method(start_index = start_index, count = page_size, **kwargs)
+      yield page
+      if len(page) < page_size:
+        break
+      start_index += page_size
   
   async def blogentry_comments (
     self, *,
@@ -118,8 +425,7 @@ class CodeforcesAPI:
   ) -> typing.List[Comment]:
     route = CodeforcesAPIRoute('blog_comments')
     params = { 'blogEntryId': blogentry_id }
-    response = await codeforces_api_call(route, params)
-    return comment_parse(response.get('result'))
+    return await self._call(route, params, comment_parse)
   
   async def blogentry_view (
     self, *,
@@ -127,8 +433,7 @@ class CodeforcesAPI:
   ) -> typing.List[BlogEntry]:
     route = CodeforcesAPIRoute('blog')
     params = { 'blogEntryId': blogentry_id }
-    response = await codeforces_api_call(route, params)
-    return blogentry_parse([response.get('result')])
+    return await self._call(route, params, _blogentry_view_parse)
   
   async def contest_hacks (
     self, *,
@@ -136,8 +441,7 @@ class CodeforcesAPI:
   ) -> typing.List[Hack]:
     route = CodeforcesAPIRoute('contest_hacks')
     params = { 'contestId': contest_id }
-    response = await codeforces_api_call(route, params)
-    return hack_parse(response.get('result'))
+    return await self._call(route, params, hack_parse)
   
   async def contest_rating_changes (
     self, *,
@@ -145,8 +449,7 @@ class CodeforcesAPI:
   ) -> typing.List[RatingChange]:
     route = CodeforcesAPIRoute('contest_rating_changes')
     params = { 'contestId': contest_id }
-    response = await codeforces_api_call(route, params)
-    return ratingchange_parse(response.get('result'))
+    return await self._call(route, params, ratingchange_parse)
   
   async def contest_standings (
     self, *,
@@ -172,12 +475,63 @@ class CodeforcesAPI:
     if room is not None:
       params['room'] = room
     
-    response = await codeforces_api_call(route, params)
-    result = response.get('result')
-    contest = contest_parse([result.get('contest')])[0]
-    problem_list = problem_parse(result.get('problems'))
-    ranklistrow_list = ranklistrow_parse(result.get('rows'))
-    return contest, problem_list, ranklistrow_list
+    return await self._call(route, params, _contest_standings_parse)
+  
+  async def contest_standings_all (
+    self, *,
+    contest_id: int,
+    show_unofficial: bool = False,
+    page_size: int = 5000,
+    concurrency: int = 4,
+    max_refetches: int = 3
+  ) -> typing.Tuple[Contest, typing.List[Problem], typing.List[RanklistRow]]:
+    """Full standings fetched as from/count slices, `concurrency` slices at a time
+
+    Every slice after the first also requests the last row of the slice before
+    it; if that row differs, rows moved between the two requests (live or
+    re-ranked standings) and the slice is fetched again.
+    """
+
+    def party_key (row: RanklistRow) -> tuple:
+      party = row.party
+      return (tuple(member.handle for member in party.members), party.participant_type, party.team_id)
+
+    async def rows (start_index: int, count: int) -> typing.List[RanklistRow]:
+      _, _, ranklistrow_list = await self.contest_standings(
+        contest_id = contest_id, start_index = start_index,
+        count = count, show_unofficial = show_unofficial
+      )
+      return ranklistrow_list
+
+    contest, problems, first = await self.contest_standings(
+      contest_id = contest_id, start_index = 1,
+      count = page_size, show_unofficial = show_unofficial
+    )
+    ranklist = list(first)
+    complete = len(first) < page_size
+    start_index = page_size + 1
+
+    while not complete:
+      starts = [start_index + i * page_size for i in range(concurrency)]
+      pages = await asyncio.gather(*(rows(start - 1, page_size + 1) for start in starts))
+
+      for start, page in zip(starts, pages):
+        for _ in range(max_refetches):
+          if page and party_key(page[0]) == party_key(ranklist[-1]):
+            break
+          page = await rows(start - 1, page_size + 1)
+        else:
+          if not page or party_key(page[0]) != party_key(ranklist[-1]):
+            raise StandingsShiftedError(f'Standings of contest {contest_id} shifted at row {start}')
+
+        ranklist.extend(page[1:])
+        if len(page) - 1 < page_size:
+          complete = True
+          break
+      
+      start_index = starts[-1] + page_size
+
+    return contest, problems, ranklist
   
   async def contest_status (
     self, *,
@@ -196,8 +550,7 @@ class CodeforcesAPI:
     if count is not None:
       params['count'] = count
     
-    response = await codeforces_api_call(route, params)
-    return submission_parse(response.get('result'))
+    return await self._call(route, params, submission_parse)
   
   async def problemset_problems (
     self, *,
@@ -212,11 +565,7 @@ class CodeforcesAPI:
     if problemset_name is not None:
       params['problemsetName'] = problemset_name
     
-    response = await codeforces_api_call(route, params)
-    result = response.get('result')
-    problem_list = problem_parse(result.get('problems'))
-    problemstatistic_list = problemstatistic_parse(result.get('problemStatistics'))
-    return problem_list, problemstatistic_list
+    return await self._call(route, params, _problemset_problems_parse)
   
   async def problemset_recent_status (
     self, *,
@@ -229,8 +578,7 @@ class CodeforcesAPI:
     if problemset_name is not None:
       params['problemsetName'] = problemset_name
     
-    response = await codeforces_api_call(route, params)
-    return submission_parse(response.get('result'))
+    return await self._call(route, params, submission_parse)
   
   async def recent_actions (
     self, *,
@@ -239,8 +587,7 @@ class CodeforcesAPI:
     route = CodeforcesAPIRoute('recent_actions')
     params = { 'maxCount': max_count }
 
-    response = await codeforces_api_call(route, params)
-    return recentaction_parse(response.get('result'))
+    return await self._call(route, params, recentaction_parse)
   
   async def user_blog_entries (
     self, *,
@@ -249,45 +596,29 @@ class CodeforcesAPI:
     route = CodeforcesAPIRoute('user_blogs')
     params = { 'handle': handle }
 
-    response = await codeforces_api_call(route, params)
-    return blogentry_parse(response.get('result'))
+    return await self._call(route, params, blogentry_parse)
   
   async def user_friends (
     self,
-    api_key: str,
-    secret: str,
-    time: int = round(time.time()),
+    api_key: str = None,
+    secret: str = None,
     *,
     only_online: bool = False
   ) -> typing.List[str]:
     route = CodeforcesAPIRoute('user_friends')
+    params = { 'onlyOnline': 'true' if only_online else 'false' }
+
+    if api_key is not None:
+      # keys passed explicitly keep their limiter across calls
+      if (api_key, secret) not in self._key_pools:
+        self._key_pools[(api_key, secret)] = APIKeyPool([APIKey(api_key, secret)])
+      key_pool = self._key_pools[(api_key, secret)]
+    elif self.key_pool is not None:
+      key_pool = self.key_pool
+    else:
+      raise ValueError('user_friends requires an API key, pass api_key and secret or a key_pool')
 
-    padding = ''.join(random.sample(string.ascii_letters + string.digits, 6))
-    
-    sign = padding
-    sign += '/'
-    sign += route.get_path()
-    sign += '?'
-    sign += f'apiKey={api_key}'
-    sign += '&'
-    sign += f'onlyOnline={"true" if only_online else "false"}'
-    sign += '&'
-    sign += f'time={time}'
-    sign += '#'
-    sign += secret
-
-    hash = hashlib.sha512(sign.encode()).hexdigest()
-    api_sig = padding + hash
-
-    params = {
-      'apiKey': api_key,
-      'time': time,
-      'apiSig': api_sig,
-      'onlyOnline': 'true' if only_online else 'false'
-    }
-
-    response = await codeforces_api_call(route, params)
-    return response.get('result')
+    return await self._call(route, params, key_pool = key_pool)
   
   async def user_info (
     self, *,
@@ -296,8 +627,7 @@ class CodeforcesAPI:
     route = CodeforcesAPIRoute('user_info')
     params = { 'handles': ';'.join(handles) }
 
-    response = await codeforces_api_call(route, params)
-    return user_parse(response.get('result'))
+    return await self._call(route, params, user_parse)
   
   async def user_ratedlist (
     self, *,
@@ -310,8 +640,7 @@ class CodeforcesAPI:
     if contest_id is not None:
       params['contestId'] = contest_id
     
-    response = await codeforces_api_call(route, params)
-    return user_parse(response.get('result'))
+    return await self._call(route, params, user_parse)
   
   async def user_rating (
     self, *,
@@ -320,8 +649,7 @@ class CodeforcesAPI:
     route = CodeforcesAPIRoute('user_rating')
     params = { 'handle': handle }
 
-    response = await codeforces_api_call(route, params)
-    return ratingchange_parse(response.get('result'))
+    return await self._call(route, params, ratingchange_parse)
   
   async def user_status (
     self, *,
@@ -337,8 +665,7 @@ class CodeforcesAPI:
     if count is not None:
       params['count'] = count
     
-    response = await codeforces_api_call(route, params)
-    return submission_parse(response.get('result'))
+    return await self._call(route, params, submission_parse)
 
 def main ():
   async def async_main ():
@@ -391,6 +718,8 @@ def main ():
     #   api_key = os.getenv('API_KEY'),
     #   secret = os.getenv('API_SECRET')
     # )
+    # or, with CODEFORCES_API_KEYS="key:secret;key:secret"
+    # API = CodeforcesAPI(key_pool = APIKeyPool.from_env())
     # print(user_friends)
 
     user_info_list = await API.user_info(handles = ['4rrow'])
@@ -408,6 +737,8 @@ def main ():
     user_status = await API.user_status(handle = '4rrow', start_index = 1, count = 1)
     for status in user_status:
       print(status)
+
+    await API.close()
   
   asyncio.run(async_main())
 
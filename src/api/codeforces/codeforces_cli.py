@@ -0,0 +1,213 @@
+import contextlib
+import os
+import sys
+import typing
+
+from utils import cd
+
+class CodeforcesCLI:
+  """Codeforces CLI"""
+
+  def __init__ (self):
+    self._api = None
+    self._statements = None
+
+  def _get_api (self):
+    # aiohttp is only imported (and the session opened) once a command needs it
+    if self._api is None:
+      from .codeforces import CodeforcesAPI
+      # CPT_OFFLINE=stale answers from stored responses and refreshes them,
+      # CPT_OFFLINE=strict never touches the network
+      mode = os.environ.get('CPT_OFFLINE', '')
+      self._api = CodeforcesAPI(stale_while_revalidate = mode == 'stale', offline = mode == 'strict')
+    return self._api
+
+  def _clients (self) -> typing.List[typing.Any]:
+    return [client for client in (self._api, self._statements) if client is not None]
+
+  @contextlib.contextmanager
+  def _open (self, output: str) -> typing.Iterator[typing.TextIO]:
+    if output is None:
+      yield sys.stdout
+    else:
+      with open(output, 'w', newline = '') as file:
+        yield file
+
+  async def _export (
+    self,
+    pages: typing.AsyncIterator[typing.List[typing.Any]],
+    format: str,
+    output: str,
+    columns: typing.List[str] = None
+  ) -> None:
+    from .cfexport import export, get_writer
+
+    # fire passes a single column as a string
+    if isinstance(columns, str):
+      columns = columns.split(',')
+
+    with self._open(output) as file:
+      await export(pages, get_writer(format, file, columns))
+
+  async def _single (self, coroutine: typing.Awaitable) -> typing.AsyncIterator[typing.List[typing.Any]]:
+    yield await coroutine
+
+  async def contest_status (
+    self,
+    contest_id: int, *,
+    handle: str = None,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    page_size: int = 10000,
+    output: str = None
+  ) -> None:
+    """Export the submissions of a contest
+    :param int contest_id: (required) contest id
+    :param str handle: (optional) only submissions of this handle
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [id,author,problem.index,verdict])
+    :param int page_size: (optional) submissions fetched per API call (default is 10000)
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    api = self._get_api()
+    pages = api.paginate(api.contest_status, page_size = page_size, contest_id = contest_id, handle = handle)
+    await self._export(pages, format, output, columns)
+
+  async def user_status (
+    self,
+    handle: str, *,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    page_size: int = 10000,
+    output: str = None
+  ) -> None:
+    """Export the submissions of a user
+    :param str handle: (required) user handle
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [id,problem.name,programming_language,verdict])
+    :param int page_size: (optional) submissions fetched per API call (default is 10000)
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    api = self._get_api()
+    pages = api.paginate(api.user_status, page_size = page_size, handle = handle)
+    await self._export(pages, format, output, columns)
+
+  async def contest_standings (
+    self,
+    contest_id: int, *,
+    show_unofficial: bool = False,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    page_size: int = 5000,
+    output: str = None
+  ) -> None:
+    """Export the ranklist rows of a contest
+    :param int contest_id: (required) contest id
+    :param bool show_unofficial: (optional) include unofficial participants (default is False)
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [rank,party,points,penalty])
+    :param int page_size: (optional) rows fetched per API call (default is 5000)
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    api = self._get_api()
+
+    async def rows (start_index: int, count: int):
+      _, _, ranklistrow_list = await api.contest_standings(
+        contest_id = contest_id, start_index = start_index,
+        count = count, show_unofficial = show_unofficial
+      )
+      return ranklistrow_list
+
+    await self._export(api.paginate(rows, page_size = page_size), format, output, columns)
+
+  async def contest_rating_changes (
+    self,
+    contest_id: int, *,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    output: str = None
+  ) -> None:
+    """Export the rating changes of a contest
+    :param int contest_id: (required) contest id
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [rank,handle,old_rating,new_rating])
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    api = self._get_api()
+    await self._export(self._single(api.contest_rating_changes(contest_id = contest_id)), format, output, columns)
+
+  async def problemset_problems (
+    self, *,
+    tags: typing.List[str] = None,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    output: str = None
+  ) -> None:
+    """Export the problems of the problemset
+    :param list tags: (optional) only problems with all of these tags
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [contest_id,index,name,rating])
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    async def problems ():
+      problem_list, _ = await self._get_api().problemset_problems(tags = tags)
+      return problem_list
+
+    await self._export(self._single(problems()), format, output, columns)
+
+  async def user_rating (
+    self,
+    handle: str, *,
+    format: str = 'ndjson',
+    columns: typing.List[str] = None,
+    output: str = None
+  ) -> None:
+    """Export the rating history of a user
+    :param str handle: (required) user handle
+    :param str format: (optional) ndjson, csv or table (default is ndjson)
+    :param list columns: (optional) table columns, dotted for nested fields (example: [contest_name,rank,new_rating])
+    :param str output: (optional) output file (default is stdout)
+    """
+
+    api = self._get_api()
+    await self._export(self._single(api.user_rating(handle = handle)), format, output, columns)
+
+  async def clone (self, contest_id: int, *, path: str = '.') -> None:
+    """Clone every problem statement and sample test of a contest
+    :param int contest_id: (required) contest id
+    :param str path: (optional) path (default is current working directory)
+    """
+
+    from .. import cache
+    from .cfstatement import StatementFetcher, contest_problems, statement_to_markdown
+
+    if self._statements is None:
+      self._statements = StatementFetcher()
+
+    problems = await contest_problems(self._get_api(), contest_id)
+    statements = await self._statements.contest(problems)
+
+    with cd(path):
+      for problem, statement in zip(problems, statements):
+        stem = f'{statement.contest_id}{statement.index}'
+        cache.write_text(f'{stem}.md', statement_to_markdown(problem, statement))
+        for index, (sample_input, sample_output) in enumerate(statement.samples, start = 1):
+          cache.write_text(os.path.join(stem, f'{index}.in'), sample_input)
+          cache.write_text(os.path.join(stem, f'{index}.out'), sample_output)
+
+  async def contest_analytics (self, contest_id: int, *, page_size: int = 10000) -> None:
+    """Print verdict, solve time and language statistics of a contest as JSON
+    :param int contest_id: (required) contest id
+    :param int page_size: (optional) submissions fetched per API call (default is 10000)
+    """
+
+    from .. import jsoncodec
+    from .cfanalytics import contest_analytics
+
+    report = await contest_analytics(self._get_api(), contest_id, page_size = page_size)
+    print(jsoncodec.dumps(report))
@@ -0,0 +1,143 @@
+import asyncio
+import aiohttp
+import hashlib
+import ratelimit
+import time
+import typing
+
+from .. import cache, profiling
+from .cses_constants import cses_urls
+from .cses_object import (
+  Task, Problem
+)
+from .cses_utils import (
+  problemset_parse, problem_parse
+)
+
+@ratelimit.limits(calls = 2, period = 1)
+async def _CSES_call (callback, *args, **kwargs):
+  return await callback(*args, **kwargs)
+
+async def _loop_until_success (callback, *args, **kwargs):
+  sleep_duration = 0.5
+
+  while True:
+    try:
+      return await _CSES_call(callback, *args, **kwargs)
+    except ratelimit.RateLimitException:
+      with profiling.phase('cses.ratelimit'):
+        await asyncio.sleep(sleep_duration)
+
+class CSESAPI:
+  def __init__ (
+    self, *,
+    concurrency: int = 4,
+    index_max_age: float = 24 * 60 * 60,
+    request_timeout: float = 30.0
+  ):
+    self.concurrency = concurrency
+    self.index_max_age = index_max_age
+    self.timeout = aiohttp.ClientTimeout(total = request_timeout)
+    self.session = None
+    self._semaphore = None
+
+  async def _get_session (self) -> aiohttp.ClientSession:
+    # one pooled session for every page, created on the loop that uses it
+    if self.session is None or self.session.closed:
+      self.session = aiohttp.ClientSession(
+        connector = aiohttp.TCPConnector(limit_per_host = self.concurrency),
+        timeout = self.timeout
+      )
+      self._semaphore = asyncio.Semaphore(self.concurrency)
+    return self.session
+
+  async def close (self) -> None:
+    if self.session is not None:
+      await self.session.close()
+
+  async def _fetch (self, url: str, entry: typing.Optional[dict]) -> typing.Tuple[typing.Optional[str], dict]:
+    """Conditional GET of url, returns (None, entry) when the page is unchanged
+
+    Politeness: at most `concurrency` requests in flight and the module level
+    rate limit of two requests per second.
+    """
+
+    session = await self._get_session()
+    headers = {}
+    if entry is not None:
+      if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+      if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    async def request () -> typing.Tuple[int, str, dict]:
+      with profiling.phase('cses.request'):
+        async with session.get(url, headers = headers) as r:
+          if r.status == 304:
+            return r.status, '', dict(r.headers)
+          r.raise_for_status()
+          return r.status, await r.text(), dict(r.headers)
+
+    async with self._semaphore:
+      status, html, response_headers = await _loop_until_success(request)
+
+    if status == 304:
+      return None, entry
+
+    # pages served without validators are compared by content
+    digest = hashlib.sha1(html.encode()).hexdigest()
+    if entry is not None and entry.get('digest') == digest:
+      return None, entry
+
+    return html, {
+      'etag': response_headers.get('ETag'),
+      'last_modified': response_headers.get('Last-Modified'),
+      'digest': digest,
+      'fetched': time.time()
+    }
+
+  async def problemset (self, *, refresh: bool = False) -> typing.List[Task]:
+    """List of all tasks, served from the local index while it is fresh"""
+
+    path = cache.cache_path('cses', 'problemset.json')
+    entry = cache.read_json(path)
+
+    if entry is not None and not refresh and time.time() - entry.get('fetched', 0) < self.index_max_age:
+      return [Task.from_dict(task) for task in entry['tasks']]
+
+    html, validators = await self._fetch(cses_urls.get('problemset'), entry)
+    if html is None:
+      tasks = [Task.from_dict(task) for task in entry['tasks']]
+    else:
+      with profiling.phase('cses.parse'):
+        tasks = problemset_parse(html)
+
+    validators['fetched'] = time.time()
+    cache.write_json(path, { **validators, 'tasks': [task.to_dict() for task in tasks] })
+    return tasks
+
+  async def section (self, name: str) -> typing.List[Task]:
+    tasks = await self.problemset()
+    matching = [task for task in tasks if task.section.lower() == name.lower()]
+    if not matching:
+      sections = sorted({ task.section for task in tasks })
+      raise ValueError(f"CSES section '{name}' not found! Choose from:\n" + '\n'.join(sections))
+    return matching
+
+  async def problem (self, id: int) -> typing.Tuple[Problem, bool]:
+    """Fetch a task statement, returns (problem, changed)"""
+
+    path = cache.cache_path('cses', 'tasks', f'{id}.json')
+    entry = cache.read_json(path)
+
+    html, validators = await self._fetch(cses_urls.get('task') + str(id), entry)
+    if html is None:
+      return Problem.from_dict(entry['problem']), False
+
+    with profiling.phase('cses.parse'):
+      problem = problem_parse(id, html)
+    cache.write_json(path, { **validators, 'problem': problem.to_dict() })
+    return problem, True
+
+  async def problems (self, ids: typing.Iterable[int]) -> typing.List[typing.Tuple[Problem, bool]]:
+    return await asyncio.gather(*(self.problem(id) for id in ids))
@@ -0,0 +1,74 @@
+import os
+import typing
+
+from utils import cd
+
+class CSESCLI:
+  """CSES CLI"""
+
+  def __init__ (self):
+    self._api = None
+
+  def _get_api (self):
+    # aiohttp and bs4 are only imported once a command needs them
+    if self._api is None:
+      from .cses import CSESAPI
+      self._api = CSESAPI()
+    return self._api
+
+  def _clients (self) -> typing.List[typing.Any]:
+    return [client for client in (self._api,) if client is not None]
+
+  @staticmethod
+  def _write (problem) -> bool:
+    from .. import cache
+    from .cses_utils import problem_to_markdown, slugify
+
+    stem = f'{problem.id}-{slugify(problem.name)}'
+    changed = cache.write_text(f'{stem}.md', problem_to_markdown(problem))
+    for index, (sample_input, sample_output) in enumerate(problem.samples, start = 1):
+      changed |= cache.write_text(os.path.join(stem, f'{index}.in'), sample_input)
+      changed |= cache.write_text(os.path.join(stem, f'{index}.out'), sample_output)
+    return changed
+
+  async def problems (self, *, section: str = None, refresh: bool = False) -> None:
+    """List CSES Problems
+    :param str section: (optional) only list tasks of this section (example: "Sorting and Searching")
+    :param bool refresh: (optional) refetch the problemset instead of using the local index
+    """
+
+    api = self._get_api()
+    tasks = await api.problemset(refresh = refresh)
+    for task in tasks:
+      if section is None or task.section.lower() == section.lower():
+        print(f'{task.id:>5}  {task.section:<28}  {task.name}')
+
+  async def clone (self, task: str, *, path: str = '.') -> None:
+    """Clone a CSES Problem
+    :param str task: (required) task url or id (example: https://cses.fi/problemset/task/1068)
+    :param str path: (optional) path (default is current working directory)
+    :raises ValueError: invalid url
+    """
+
+    from .cses_utils import task_url_parse
+
+    problem, _ = await self._get_api().problem(task_url_parse(str(task)))
+    with cd(path):
+      self._write(problem)
+
+  async def clone_section (self, section: str, *, path: str = '.') -> None:
+    """Clone every CSES Problem of a section concurrently
+    :param str section: (required) section name (example: "Introductory Problems")
+    :param str path: (optional) path (default is current working directory)
+    :raises ValueError: unknown section
+    """
+
+    api = self._get_api()
+    tasks = await api.section(section)
+    results = await api.problems(task.id for task in tasks)
+
+    written = 0
+    with cd(path):
+      for problem, _ in results:
+        written += self._write(problem)
+    print(f'{len(results)} problems, {written} written, {len(results) - written} unchanged')
@@ -0,0 +1,5 @@
+cses_urls = {
+  'base': 'https://cses.fi/',
+  'problemset': 'https://cses.fi/problemset/',
+  'task': 'https://cses.fi/problemset/task/'
+}
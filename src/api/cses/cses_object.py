@@ -0,0 +1,56 @@
+import inspect
+import typing
+
+from .cses_constants import cses_urls
+
+class CSESObject:
+  def __repr__ (self):
+    return f'<{self.__class__.__name__}>'
+
+  def to_dict (self) -> dict:
+    return dict(vars(self))
+
+  @classmethod
+  def from_dict (cls, data: dict) -> 'CSESObject':
+    parameters = inspect.signature(cls.__init__).parameters
+    return cls(**{ key: value for key, value in data.items() if key in parameters })
+
+class Task (CSESObject):
+  def __init__ (
+    self,
+    id: int,
+    name: str,
+    section: str,
+    solved: int,
+    attempted: int
+  ):
+    self.id = id
+    self.name = name
+    self.section = section
+    self.solved = solved
+    self.attempted = attempted
+    self.url = cses_urls.get('task') + str(id)
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.id} - {self.name}]>'
+
+class Problem (CSESObject):
+  def __init__ (
+    self,
+    id: int,
+    name: str,
+    time_limit: str,
+    memory_limit: str,
+    statement: str,
+    samples: typing.List[typing.Tuple[str, str]]
+  ):
+    self.id = id
+    self.name = name
+    self.time_limit = time_limit
+    self.memory_limit = memory_limit
+    self.statement = statement
+    self.samples = samples
+    self.url = cses_urls.get('task') + str(id)
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.id} - {self.name}]>'
@@ -0,0 +1,121 @@
+import bs4
+import markdownify
+import re
+import typing
+import urllib.parse
+
+from .cses_object import (
+  Task, Problem
+)
+from .cses_constants import cses_urls
+
+def problemset_parse (html: str) -> typing.List[Task]:
+  soup = bs4.BeautifulSoup(html, 'html.parser')
+  tasks = []
+
+  for heading in soup.find_all('h2'):
+    task_list = heading.find_next_sibling()
+    if task_list is None or 'task-list' not in task_list.get('class', []):
+      continue
+    section = heading.get_text(strip = True)
+
+    for item in task_list.find_all('li', class_ = 'task'):
+      link = item.find('a', href = True)
+      match = link and re.search(r'/problemset/task/(\d+)', link['href'])
+      if not match:
+        continue
+      # detail reads "solved / attempted"
+      detail = item.find('span', class_ = 'detail')
+      counts = re.findall(r'\d+', detail.get_text()) if detail is not None else []
+      solved, attempted = (list(map(int, counts)) + [0, 0])[:2]
+      tasks.append(Task(int(match.group(1)), link.get_text(strip = True), section, solved, attempted))
+
+  return tasks
+
+def _samples_parse (content: bs4.Tag) -> typing.List[typing.Tuple[str, str]]:
+  # examples are <p>Input:</p><pre>...</pre><p>Output:</p><pre>...</pre>
+  samples = []
+  sample_input = None
+
+  for pre in content.find_all('pre'):
+    label = pre.find_previous_sibling('p')
+    label = label.get_text(strip = True).lower() if label is not None else ''
+    text = pre.get_text().strip('\n') + '\n'
+
+    if label.startswith('output') and sample_input is not None:
+      samples.append((sample_input, text))
+      sample_input = None
+    elif label.startswith('input') or sample_input is None:
+      sample_input = text
+    else:
+      samples.append((sample_input, text))
+      sample_input = None
+
+  return samples
+
+def problem_parse (id: int, html: str) -> Problem:
+  soup = bs4.BeautifulSoup(html, 'html.parser')
+
+  title = soup.select_one('.title-block h1') or soup.find('h1')
+  name = title.get_text(strip = True) if title is not None else str(id)
+
+  limits = {}
+  for item in soup.select('ul.task-constraints li'):
+    key, _, value = item.get_text(' ', strip = True).partition(':')
+    limits[key.strip().lower()] = value.strip()
+
+  content = soup.find('div', class_ = 'md')
+  if content is None:
+    raise ValueError(f'CSES task {id} has no statement')
+
+  samples = _samples_parse(content)
+
+  # inline math is kept as $...$, markdownify would escape the backslashes
+  for math in content.find_all(class_ = 'math'):
+    text = math.get_text().strip()
+    text = re.sub(r'^\\[(\[]|\\[)\]]$', '', text)
+    delimiter = '$$' if 'display' in math.get('class', []) else '$'
+    math.replace_with(f'{delimiter}{text}{delimiter}')
+
+  # statement headings (Input, Output, Example) sit below the ### sections
+  for heading in content.find_all(['h1', 'h2']):
+    heading.name = 'h4'
+
+  statement = markdownify.markdownify(str(content), heading_style = markdownify.ATX, escape_underscores = False).strip()
+
+  return Problem(
+    id, name,
+    limits.get('time limit', ''), limits.get('memory limit', ''),
+    statement, samples
+  )
+
+def task_url_parse (url: str) -> int:
+  if url.isdigit():
+    return int(url)
+  if not url.startswith(cses_urls.get('task')):
+    raise ValueError(f'task url must start with "{cses_urls.get("task")}" or be a task id')
+  urlsplit = urllib.parse.urlsplit(url)
+  return int(re.search(r'/task/(\d+)', urlsplit.path).group(1))
+
+def slugify (name: str) -> str:
+  return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def problem_to_markdown (problem: Problem):
+  return f"""\
+# [{problem.id}] {problem.name}
+
+- time limit: {problem.time_limit}
+- memory limit: {problem.memory_limit}
+- url: {problem.url}
+
+### Statement
+
+{problem.statement}
+
+<br>
+
+### Solution
+
+```
+```
+"""
@@ -0,0 +1,57 @@
+"""
+api.deadline
+------------
+
+This module contains deadlines for API calls. A deadline set with
+the deadline() context manager applies to every call made inside
+it, including calls in tasks created there, so a whole batch of
+calls can share one time budget.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import time
+import typing
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('deadline', default = None)
+
+class DeadlineExceededError (Exception):
+  """API call did not finish before its deadline"""
+
+@contextlib.contextmanager
+def deadline (seconds: float) -> typing.Iterator[None]:
+  at = time.monotonic() + seconds
+  current = _deadline.get()
+  token = _deadline.set(at if current is None else min(current, at))
+  try:
+    yield
+  finally:
+    _deadline.reset(token)
+
+def remaining () -> typing.Optional[float]:
+  at = _deadline.get()
+  return None if at is None else at - time.monotonic()
+
+async def run_with_deadline (awaitable: typing.Awaitable, timeout: float = None) -> typing.Any:
+  """Await with the tighter of timeout and the current deadline
+
+  On expiry the awaitable is cancelled. Rate limiter slots are only taken
+  when a request is sent, so a call cancelled while waiting for the limiter
+  or sleeping between retries does not use up budget.
+  """
+
+  budgets = [budget for budget in (timeout, remaining()) if budget is not None]
+  if not budgets:
+    return await awaitable
+
+  budget = min(budgets)
+  if budget <= 0:
+    if asyncio.iscoroutine(awaitable):
+      awaitable.close()
+    raise DeadlineExceededError('API call deadline already passed')
+
+  try:
+    return await asyncio.wait_for(awaitable, budget)
+  except asyncio.TimeoutError:
+    raise DeadlineExceededError(f'API call did not finish within {budget:.1f} seconds') from None
@@ -0,0 +1,93 @@
+"""
+api.hedge
+---------
+
+This module contains request hedging for idempotent calls. When a
+call takes longer than a percentile of the recently observed
+latencies, a second attempt is started and whichever finishes
+first wins, the other one is cancelled.
+"""
+
+import asyncio
+import collections
+import time
+import typing
+
+class LatencyTracker:
+  def __init__ (self, size: int = 200):
+    self.samples = collections.deque(maxlen = size)
+
+  def record (self, latency: float) -> None:
+    self.samples.append(latency)
+
+  def percentile (self, percentile: float) -> typing.Optional[float]:
+    if not self.samples:
+      return None
+    ordered = sorted(self.samples)
+    index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+    return ordered[index]
+
+class HedgePolicy:
+  def __init__ (
+    self, *,
+    percentile: float = 95.0,
+    min_samples: int = 20,
+    min_delay: float = 0.5,
+    max_hedges: int = 1
+  ):
+    self.percentile = percentile
+    self.min_samples = min_samples
+    self.min_delay = min_delay
+    self.max_hedges = max_hedges
+    self.trackers: typing.Dict[str, LatencyTracker] = collections.defaultdict(LatencyTracker)
+
+  def hedge_delay (self, key: str) -> typing.Optional[float]:
+    tracker = self.trackers[key]
+    if len(tracker.samples) < self.min_samples:
+      return None
+    return max(tracker.percentile(self.percentile), self.min_delay)
+
+  async def run (self, key: str, callback: typing.Callable[[], typing.Awaitable]) -> typing.Any:
+    start = time.monotonic()
+    delay = self.hedge_delay(key)
+
+    if delay is None:
+      result = await callback()
+    else:
+      result = await hedged(callback, delay, self.max_hedges)
+
+    self.trackers[key].record(time.monotonic() - start)
+    return result
+
+async def hedged (
+  callback: typing.Callable[[], typing.Awaitable],
+  delay: float,
+  max_hedges: int = 1
+) -> typing.Any:
+  tasks = [asyncio.ensure_future(callback())]
+  started = 1
+  error = None
+
+  try:
+    while tasks:
+      can_hedge = started <= max_hedges
+      done, pending = await asyncio.wait(
+        tasks, timeout = delay if can_hedge else None,
+        return_when = asyncio.FIRST_COMPLETED
+      )
+
+      for task in done:
+        tasks.remove(task)
+        if task.exception() is None:
+          return task.result()
+        error = error or task.exception()
+
+      # a failed attempt is replaced right away, a slow one after the delay
+      if can_hedge and (not done or not pending):
+        tasks.append(asyncio.ensure_future(callback()))
+        started += 1
+
+    raise error
+  finally:
+    for task in tasks:
+      task.cancel()
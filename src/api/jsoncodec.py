@@ -0,0 +1,153 @@
+"""
+api.jsoncodec
+-------------
+
+This module contains the JSON codec shared by the API clients.
+The fastest installed backend is used by default, falling back
+to the standard library json module.
+"""
+
+import contextlib
+import gc
+import json
+import threading
+import time
+import typing
+
+class JSONCodec:
+  def __init__ (
+    self,
+    name: str,
+    loads: typing.Callable[[typing.Union[bytes, str]], typing.Any],
+    dumps: typing.Callable[[typing.Any], str]
+  ):
+    self.name = name
+    self.loads = loads
+    self.dumps = dumps
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.name}]>'
+
+def _orjson_codec () -> JSONCodec:
+  import orjson
+  # json and ujson turn int, float and bool keys into strings, orjson only with the option
+  return JSONCodec('orjson', orjson.loads, lambda obj: orjson.dumps(obj, option = orjson.OPT_NON_STR_KEYS).decode())
+
+def _ujson_codec () -> JSONCodec:
+  import ujson
+  return JSONCodec('ujson', ujson.loads, ujson.dumps)
+
+def _json_codec () -> JSONCodec:
+  return JSONCodec('json', json.loads, json.dumps)
+
+_codec_factories = {
+  'orjson': _orjson_codec,
+  'ujson': _ujson_codec,
+  'json': _json_codec,
+}
+
+def available_codecs () -> typing.List[JSONCodec]:
+  codecs = []
+  for factory in _codec_factories.values():
+    try:
+      codecs.append(factory())
+    except ImportError:
+      pass
+  return codecs
+
+def get_codec (name: str = None) -> JSONCodec:
+  if name is None:
+    return available_codecs()[0]
+  if name not in _codec_factories:
+    raise ValueError(f"JSON codec '{name}' is invalid! Choose from: {', '.join(_codec_factories)}")
+  return _codec_factories[name]()
+
+_codec = get_codec()
+
+# decoding a large payload allocates millions of containers, which triggers
+# the cyclic garbage collector over and over although nothing can be freed yet
+_GC_PAUSE_THRESHOLD = 1 << 20
+
+# the collector is process global, so overlapping pauses from several threads
+# are counted and only the last one to finish enables it again (and only if a
+# pause disabled it in the first place)
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+@contextlib.contextmanager
+def gc_paused () -> typing.Iterator[None]:
+  global _gc_pauses, _gc_was_enabled
+  with _gc_lock:
+    if _gc_pauses == 0:
+      _gc_was_enabled = gc.isenabled()
+      gc.disable()
+    _gc_pauses += 1
+  try:
+    yield
+  finally:
+    with _gc_lock:
+      _gc_pauses -= 1
+      if _gc_pauses == 0 and _gc_was_enabled:
+        gc.enable()
+
+def set_codec (name: str) -> JSONCodec:
+  global _codec
+  _codec = get_codec(name)
+  return _codec
+
+def loads (data: typing.Union[bytes, str]) -> typing.Any:
+  if len(data) < _GC_PAUSE_THRESHOLD:
+    return _codec.loads(data)
+
+  with gc_paused():
+    return _codec.loads(data)
+
+def dumps (obj: typing.Any) -> str:
+  return _codec.dumps(obj)
+
+def _sample_payload (count: int) -> bytes:
+  submission = {
+    'id': 150000000, 'contestId': 1642, 'creationTimeSeconds': 1646408543,
+    'relativeTimeSeconds': 2147483647,
+    'problem': {
+      'contestId': 1642, 'index': 'D', 'name': 'Repetitions Decoding',
+      'type': 'PROGRAMMING', 'points': 1750.0, 'rating': 2000,
+      'tags': ['constructive algorithms', 'implementation', 'sortings']
+    },
+    'author': {
+      'contestId': 1642, 'members': [{'handle': '4rrow'}],
+      'participantType': 'PRACTICE', 'ghost': False, 'startTimeSeconds': 1646408100
+    },
+    'programmingLanguage': 'GNU C++17', 'verdict': 'OK', 'testset': 'TESTS',
+    'passedTestCount': 42, 'timeConsumedMillis': 93, 'memoryConsumedBytes': 3584000
+  }
+  return json.dumps({ 'status': 'OK', 'result': [submission] * count }).encode()
+
+def main ():
+  import sys
+
+  if len(sys.argv) > 1:
+    with open(sys.argv[1], 'rb') as file:
+      payload = file.read()
+  else:
+    payload = _sample_payload(200000)
+
+  size = len(payload) / (1 << 20)
+  print(f'Payload: {size:.1f} MiB')
+
+  for codec in available_codecs():
+    start = time.perf_counter()
+    codec.loads(payload)
+    raw = time.perf_counter() - start
+
+    set_codec(codec.name)
+    start = time.perf_counter()
+    loads(payload)
+    paused = time.perf_counter() - start
+
+    print(f'{codec.name:>8}: {raw * 1000:8.1f} ms ({size / raw:5.0f} MiB/s), '
+          f'with gc paused {paused * 1000:8.1f} ms ({size / paused:5.0f} MiB/s)')
+
+if __name__ == '__main__':
+  main()
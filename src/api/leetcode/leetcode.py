@@ -1,41 +1,94 @@
 import asyncio
 import aiohttp
 import ratelimit
+import typing
 
+from .. import jsoncodec, profiling
+from ..deadline import run_with_deadline
+from ..retry import RetryPolicy, parse_retry_after
+from .leetcode_exception import ServerError
 from .leetcode_graphql import get_object
 from .leetcode_object import (
-  Problem
+  Problem, ContestRanking, SubmissionList, ProblemStatus
 )
 from .leetcode_utils import (
-  problem_parse
+  problem_parse, contest_ranking_parse,
+  submission_list_parse, problem_status_parse
 )
 
+_RETRYABLE_ERRORS = (
+  asyncio.TimeoutError,
+  aiohttp.ClientConnectionError,
+  aiohttp.ClientPayloadError,
+  ServerError
+)
+
+# bulk calls (contest pages, submission pages) share this limiter
+@ratelimit.limits(calls = 4, period = 1)
+async def _LC_call (callback, *args, **kwargs):
+  return await callback(*args, **kwargs)
+
+async def _loop_until_success (callback, *args, **kwargs):
+  sleep_duration = 0.25
+
+  while True:
+    try:
+      return await _LC_call(callback, *args, **kwargs)
+    except ratelimit.RateLimitException:
+      with profiling.phase('leetcode.ratelimit'):
+        await asyncio.sleep(sleep_duration)
+
 class LeetcodeAPI:
   __base_url = 'https://leetcode.com/'
   __api_url = __base_url + 'graphql'
 
   @ratelimit.limits(calls = 1, period = 2)
-  async def call (self, data):
+  async def _post (self, data):
     if self.csrf is None:
       await self.get_csrf()
-    async with self.session.post(self.__api_url, data = data, headers = self.headers) as r:
-      return await r.json()
+    with profiling.phase('leetcode.graphql'):
+      async with self.session.post(self.__api_url, data = data, headers = self.headers, timeout = self.timeout) as r:
+        body = await r.read()
+    with profiling.phase('leetcode.decode'):
+      return jsoncodec.loads(body)
+
+  async def call (self, data):
+    # bounded by call_timeout and any enclosing api.deadline.deadline()
+    return await run_with_deadline(self._post(data), self.call_timeout)
 
   async def get_csrf (self):
-    async with self.session.get(self.__base_url) as r:
-      self.csrf = r.cookies.get('csrftoken').value
+    with profiling.phase('leetcode.csrf'):
+      async with self.session.get(self.__base_url, timeout = self.timeout) as r:
+        self.csrf = r.cookies.get('csrftoken').value
       self.headers.update({
         'Referer': self.__base_url,
         'Content-Type': 'application/json',
         'X-CSRFToken': self.csrf
       })
 
-  def __init__ (self):
-    self.session = aiohttp.ClientSession()
+  def __init__ (
+    self, *,
+    request_timeout: float = 30.0,
+    call_timeout: float = None,
+    retry_policy: RetryPolicy = None,
+    session_cookie: str = None
+  ):
+    # session_cookie is the LEETCODE_SESSION cookie of a signed in browser,
+    # it is needed for the calls about the user's own submissions and progress
+    self.session = aiohttp.ClientSession(cookies = { 'LEETCODE_SESSION': session_cookie } if session_cookie else None)
     self.headers = {}
     self.csrf = None
+    self.timeout = aiohttp.ClientTimeout(total = request_timeout)
+    self.call_timeout = call_timeout
+    self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(retryable = _RETRYABLE_ERRORS)
   
+  async def close (self) -> None:
+    await self.session.close()
+
   def __del__ (self):
+    session = getattr(self, 'session', None)
+    if session is None or session.closed:
+      return
     loop = asyncio.get_event_loop()
     if loop.is_running():
       loop.create_task(self.session.close())
@@ -48,3 +101,50 @@ class LeetcodeAPI:
   ) -> Problem:
     obj = get_object('question_data', {'titleSlug': slug})
     return problem_parse((await self.call(obj)).get('data').get('question'))
+
+  async def contest_ranking (
+    self, *,
+    contest_slug: str,
+    page: int = 1,
+    region: str = 'global'
+  ) -> ContestRanking:
+    """One page (25 rows) of a contest ranking, pages start at 1"""
+
+    url = f'{self.__base_url}contest/api/ranking/{contest_slug}/'
+    params = { 'pagination': page, 'region': region }
+    data = await self._limited_request('GET', url, 'leetcode.ranking', params = params)
+    return contest_ranking_parse(contest_slug, page, data)
+
+  async def submission_list (self, *, offset: int = 0, limit: int = 20) -> SubmissionList:
+    """Submissions of the signed in user, newest first"""
+
+    if self.csrf is None:
+      await self.get_csrf()
+    obj = get_object('submission_list', { 'offset': offset, 'limit': limit, 'lastKey': None, 'questionSlug': None })
+    data = await self._limited_request('POST', self.__api_url, 'leetcode.graphql', data = obj, headers = self.headers)
+    if data.get('errors') or not (data.get('data') or {}).get('submissionList'):
+      raise ValueError(f'LeetCode submission list is unavailable (signed in?): {data.get("errors")}')
+    return submission_list_parse(offset, data['data']['submissionList'])
+
+  async def problem_status (self) -> typing.List[ProblemStatus]:
+    """Every problem with the signed in user's status"""
+
+    data = await self._limited_request('GET', f'{self.__base_url}api/problems/all/', 'leetcode.problems')
+    return problem_status_parse(data)
+
+  async def _limited_request (self, method: str, url: str, phase: str, **kwargs) -> typing.Any:
+    # goes through the shared limiter, retried on timeouts, 5xx and 429
+    async def request () -> bytes:
+      with profiling.phase(phase):
+        async with self.session.request(method, url, timeout = self.timeout, **kwargs) as r:
+          if r.status >= 500 or r.status == 429:
+            raise ServerError(r.status, parse_retry_after(r.headers.get('Retry-After')))
+          r.raise_for_status()
+          return await r.read()
+
+    body = await run_with_deadline(
+      self.retry_policy.run(lambda: _loop_until_success(request)),
+      self.call_timeout
+    )
+    with profiling.phase('leetcode.decode'):
+      return jsoncodec.loads(body)
@@ -1,17 +1,27 @@
 import os
+import typing
 
-from .leetcode import LeetcodeAPI
-from .leetcode_utils import (
-  problem_url_parse,
-  problem_to_markdown
-)
 from utils import cd
 
+from .. import profiling
+
 class LeetcodeCLI:
   """LeetCode CLI"""
 
   def __init__ (self):
-    self._api = LeetcodeAPI()
+    self._api = None
+  
+  def _get_api (self):
+    # aiohttp is only imported (and the session opened) once a command needs it
+    if self._api is None:
+      with profiling.phase('leetcode.import'):
+        from .leetcode import LeetcodeAPI
+      # LEETCODE_SESSION (the browser cookie) signs the session in for sync
+      self._api = LeetcodeAPI(session_cookie = os.environ.get('LEETCODE_SESSION'))
+    return self._api
+
+  def _clients (self) -> typing.List[typing.Any]:
+    return [client for client in (self._api,) if client is not None]
   
   async def clone (self, url: str, *, path: str = '.') -> None:
     """Clone a LeetCode Problem
@@ -20,10 +30,56 @@ class LeetcodeCLI:
     :raises ValueError: invalid url
     """
     
+    from .leetcode_utils import (
+      problem_url_parse,
+      problem_to_markdown
+    )
+
     parsed_url = problem_url_parse(url)
-    problem = await self._api.question_data(slug = parsed_url.slug)
+    problem = await self._get_api().question_data(slug = parsed_url.slug)
 
-    with cd(path):
+    with cd(path), profiling.phase('file.write'):
       filename = f'{problem.frontend_id}-{problem.slug}.md'
       with open(filename, 'w') as file:
         file.write(problem_to_markdown(problem))
+
+  async def ranking (
+    self,
+    contest: str, *,
+    region: str = 'global',
+    concurrency: int = 8,
+    refresh: bool = False
+  ) -> None:
+    """Download the ranking of a contest, resuming an interrupted download
+    :param str contest: (required) contest slug or url (example: weekly-contest-400)
+    :param str region: (optional) global or cn (default is global)
+    :param int concurrency: (optional) pages fetched at the same time (default is 8)
+    :param bool refresh: (optional) discard the stored ranking and start over (default is False)
+    """
+
+    from .leetcode_ranking import RankingStore, crawl_ranking
+    from .leetcode_utils import contest_slug_parse
+
+    store = RankingStore(contest_slug_parse(contest)).load()
+    if refresh:
+      store.clear()
+
+    await crawl_ranking(self._get_api(), store, region = region, concurrency = concurrency)
+    print(f'{len(store.pages)}/{store.page_count} pages of {store.contest_slug} ({store.user_num} participants) stored in {store.path}')
+
+  async def sync (self, *, concurrency: int = 4, path: str = None) -> None:
+    """Mirror accepted submissions and problem status, fetching only what changed since the last sync
+    :param int concurrency: (optional) submission pages fetched at the same time (default is 4)
+    :param str path: (optional) store directory (default is the cpt cache)
+    :raises ValueError: LEETCODE_SESSION is not set
+    """
+
+    from .leetcode_sync import SyncStore, sync
+
+    if not os.environ.get('LEETCODE_SESSION'):
+      raise ValueError('LEETCODE_SESSION must be set to the session cookie of a signed in browser')
+
+    store = SyncStore(path)
+    submissions, changed = await sync(self._get_api(), store, concurrency = concurrency)
+    print(f'{len(submissions)} new accepted submissions, {len(changed)} problems changed status')
+    print(f'{len(store.solved())} solved problems, stored in {store.path}')
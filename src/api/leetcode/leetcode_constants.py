@@ -1,4 +1,5 @@
 leetcode_urls = {
   'base': 'https://leetcode.com/',
-  'problems': 'https://leetcode.com/problems/'
+  'problems': 'https://leetcode.com/problems/',
+  'contest': 'https://leetcode.com/contest/'
 }
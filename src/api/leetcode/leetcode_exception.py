@@ -0,0 +1,18 @@
+"""
+api.leetcode.leetcode_exception
+-------------------------------
+
+This module contains a set of exceptions that can be
+raised by the LeetCode API.
+"""
+
+class ServerError (Exception):
+  """LeetCode call failed with an HTTP 5xx or 429 status"""
+
+  def __init__ (self, status: int, retry_after: float = None):
+    super().__init__(status, retry_after)
+    self.status = status
+    self.retry_after = retry_after
+
+  def __str__ (self):
+    return f'HTTP {self.status}'
@@ -1,4 +1,4 @@
-import json
+from .. import jsoncodec
 
 lcgraphql_objects = {
   "question_data": {
@@ -77,6 +77,36 @@ lcgraphql_objects = {
           __typename
         }
       }"""
+  },
+  "submission_list": {
+    "operationName": "submissionList",
+    "variables": {
+      "offset": 0,
+      "limit": 20,
+      "lastKey": None,
+      "questionSlug": None
+    },
+    "query": """\
+      query submissionList($offset: Int!, $limit: Int!, $lastKey: String, $questionSlug: String) {
+        submissionList(offset: $offset, limit: $limit, lastKey: $lastKey, questionSlug: $questionSlug) {
+          lastKey
+          hasNext
+          submissions {
+            id
+            title
+            titleSlug
+            status
+            statusDisplay
+            lang
+            runtime
+            memory
+            timestamp
+            isPending
+            __typename
+          }
+          __typename
+        }
+      }"""
   }
 }
 
@@ -85,4 +115,4 @@ def get_object (name: str, variables: dict) -> str:
   if obj is None:
     raise ValueError(f'Object with name {name} does not exist')
   obj['variables'].update(variables)
-  return json.dumps(obj)
+  return jsoncodec.dumps(obj)
@@ -1,3 +1,4 @@
+import inspect
 import typing
 
 from .leetcode_constants import leetcode_urls
@@ -6,6 +7,14 @@ class LeetcodeObject:
   def __repr__ (self):
     return f'<{self.__class__.__name__}>'
 
+  def to_dict (self) -> dict:
+    return dict(vars(self))
+
+  @classmethod
+  def from_dict (cls, data: dict) -> 'LeetcodeObject':
+    parameters = inspect.signature(cls.__init__).parameters
+    return cls(**{ key: value for key, value in data.items() if key in parameters })
+
 class Problem (LeetcodeObject):
   def __init__ (
     self,
@@ -46,3 +55,115 @@ class ProblemURL (LeetcodeObject):
   def __init__ (self, slug: str):
     self.slug = slug
     self.url = leetcode_urls.get('problems') + self.slug
+
+class ContestQuestion (LeetcodeObject):
+  def __init__ (
+    self,
+    id: int,
+    question_id: int,
+    credit: int,
+    title: str,
+    slug: str
+  ):
+    self.id = id
+    self.question_id = question_id
+    self.credit = credit
+    self.title = title
+    self.slug = slug
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.question_id} - {self.title}]>'
+
+class RankingRow (LeetcodeObject):
+  def __init__ (
+    self,
+    rank: int,
+    username: str,
+    country_code: str,
+    data_region: str,
+    score: int,
+    finish_time: int,
+    solve_times: typing.Dict[int, int],
+    fail_counts: typing.Dict[int, int]
+  ):
+    # solve_times and fail_counts are keyed by question_id, solved questions only
+    self.rank = rank
+    self.username = username
+    self.country_code = country_code
+    self.data_region = data_region
+    self.score = score
+    self.finish_time = finish_time
+    self.solve_times = solve_times
+    self.fail_counts = fail_counts
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.rank} - {self.username}]>'
+
+class ContestRanking (LeetcodeObject):
+  def __init__ (
+    self,
+    contest_slug: str,
+    page: int,
+    user_num: int,
+    questions: typing.List[ContestQuestion],
+    rows: typing.List[RankingRow]
+  ):
+    self.contest_slug = contest_slug
+    self.page = page
+    self.user_num = user_num
+    self.questions = questions
+    self.rows = rows
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.contest_slug} - page {self.page}]>'
+
+class Submission (LeetcodeObject):
+  def __init__ (
+    self,
+    id: int,
+    title: str,
+    slug: str,
+    status: str,
+    lang: str,
+    runtime: str,
+    memory: str,
+    timestamp: int
+  ):
+    self.id = id
+    self.title = title
+    self.slug = slug
+    self.status = status
+    self.lang = lang
+    self.runtime = runtime
+    self.memory = memory
+    self.timestamp = timestamp
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.id} - {self.slug} - {self.status}]>'
+
+class SubmissionList (LeetcodeObject):
+  def __init__ (self, offset: int, has_next: bool, submissions: typing.List[Submission]):
+    self.offset = offset
+    self.has_next = has_next
+    self.submissions = submissions
+
+class ProblemStatus (LeetcodeObject):
+  def __init__ (
+    self,
+    frontend_id: int,
+    title: str,
+    slug: str,
+    difficulty: int,
+    paid_only: bool,
+    status: typing.Optional[str]
+  ):
+    # status is 'ac', 'notac' or None (never attempted)
+    self.frontend_id = frontend_id
+    self.title = title
+    self.slug = slug
+    self.difficulty = difficulty
+    self.paid_only = paid_only
+    self.status = status
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{self.frontend_id} - {self.slug} - {self.status}]>'
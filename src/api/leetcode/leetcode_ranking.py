@@ -0,0 +1,245 @@
+"""
+api.leetcode.leetcode_ranking
+-----------------------------
+
+This module contains a crawler for contest rankings. Pages are
+fetched by a fixed number of workers sharing the module level rate
+limiter of api.leetcode.leetcode, and stored as compressed numpy
+column segments (one row per participant, one column per question
+for solve times and failed attempts). A checkpoint of the stored
+pages is written after every segment, so an interrupted crawl
+resumes where it stopped and a finished one can be reanalyzed
+without refetching.
+"""
+
+import asyncio
+import numpy as np
+import os
+import typing
+
+from .. import cache
+from .leetcode_object import ContestQuestion, ContestRanking, RankingRow
+
+PAGE_SIZE = 25
+
+def _ranges (pages: typing.Iterable[int]) -> typing.List[typing.List[int]]:
+  """Sorted pages as inclusive [start, end] runs, which keeps the checkpoint small"""
+
+  runs = []
+  for page in sorted(pages):
+    if runs and runs[-1][1] + 1 == page:
+      runs[-1][1] = page
+    else:
+      runs.append([page, page])
+  return runs
+
+def _expand (runs: typing.List[typing.List[int]]) -> typing.Set[int]:
+  return { page for start, end in runs for page in range(start, end + 1) }
+
+class RankingStore:
+  _COLUMNS = {
+    'page': np.int32,
+    'rank': np.int32,
+    'score': np.int32,
+    'finish_time': np.int64,
+    'username': str,
+    'country_code': str,
+    'data_region': str,
+  }
+
+  def __init__ (self, contest_slug: str, path: str = None):
+    self.contest_slug = contest_slug
+    self.path = path if path is not None else cache.cache_path('leetcode', 'ranking', contest_slug)
+    self.user_num = None
+    self.questions: typing.List[ContestQuestion] = []
+    self.pages: typing.Set[int] = set()
+    self.segments: typing.List[str] = []
+    self._buffer: typing.List[ContestRanking] = []
+
+  @property
+  def page_count (self) -> typing.Optional[int]:
+    if self.user_num is None:
+      return None
+    return max((self.user_num + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+
+  @property
+  def complete (self) -> bool:
+    return self.page_count is not None and len(self.pages) >= self.page_count
+
+  def _meta_path (self) -> str:
+    return os.path.join(self.path, 'checkpoint.json')
+
+  def load (self) -> 'RankingStore':
+    meta = cache.read_json(self._meta_path())
+    if meta is None:
+      return self
+
+    self.user_num = meta['user_num']
+    self.questions = [ContestQuestion.from_dict(question) for question in meta['questions']]
+    self.pages = _expand(meta['pages'])
+    self.segments = meta['segments']
+    return self
+
+  def clear (self) -> None:
+    for segment in self.segments:
+      path = os.path.join(self.path, segment)
+      if os.path.exists(path):
+        os.remove(path)
+    if os.path.exists(self._meta_path()):
+      os.remove(self._meta_path())
+    self.user_num = None
+    self.questions = []
+    self.pages = set()
+    self.segments = []
+    self._buffer = []
+
+  def add (self, ranking: ContestRanking) -> None:
+    if self.user_num is None:
+      self.user_num = ranking.user_num
+      self.questions = ranking.questions
+    self._buffer.append(ranking)
+
+  @property
+  def buffered (self) -> int:
+    return len(self._buffer)
+
+  def _arrays (self, rankings: typing.List[ContestRanking]) -> typing.Dict[str, np.ndarray]:
+    rows = [(ranking.page, row) for ranking in rankings for row in ranking.rows]
+    question_ids = [question.question_id for question in self.questions]
+
+    solve_time = np.zeros((len(rows), len(question_ids)), dtype = np.int64)
+    fail_count = np.zeros((len(rows), len(question_ids)), dtype = np.int16)
+    for index, (_, row) in enumerate(rows):
+      for column, question_id in enumerate(question_ids):
+        solved = row.solve_times.get(question_id)
+        if solved is not None:
+          solve_time[index, column] = solved
+          fail_count[index, column] = row.fail_counts.get(question_id) or 0
+
+    arrays = {
+      name: np.array(
+        [page if name == 'page' else (getattr(row, name) or (0 if dtype is not str else '')) for page, row in rows],
+        dtype = dtype
+      )
+      for name, dtype in self._COLUMNS.items()
+    }
+    arrays['solve_time'] = solve_time
+    arrays['fail_count'] = fail_count
+    return arrays
+
+  def _save_meta (self) -> None:
+    cache.write_json(self._meta_path(), {
+      'contest_slug': self.contest_slug,
+      'user_num': self.user_num,
+      'questions': [question.to_dict() for question in self.questions],
+      'pages': _ranges(self.pages),
+      'segments': self.segments,
+    })
+
+  def _next_segment (self) -> str:
+    number = max((int(segment.split('.')[0]) for segment in self.segments), default = -1) + 1
+    return f'{number:05}.npz'
+
+  def _write_segment (self, name: str, arrays: typing.Dict[str, np.ndarray]) -> None:
+    os.makedirs(self.path, exist_ok = True)
+    temporary = os.path.join(self.path, name + '.tmp.npz')
+    np.savez_compressed(temporary, **arrays)
+    os.replace(temporary, os.path.join(self.path, name))
+
+  def flush (self) -> None:
+    """Write the buffered pages as a new segment, then checkpoint them"""
+
+    if not self._buffer:
+      return
+    rankings, self._buffer = self._buffer, []
+
+    # the segment is in place before the checkpoint mentions it, a segment
+    # left over from an interrupted flush is simply overwritten later
+    name = self._next_segment()
+    self._write_segment(name, self._arrays(rankings))
+    self.segments.append(name)
+    self.pages.update(ranking.page for ranking in rankings)
+    self._save_meta()
+
+  def columns (self) -> typing.Dict[str, np.ndarray]:
+    """Every stored row as columns, sorted by rank"""
+
+    parts = []
+    for segment in self.segments:
+      with np.load(os.path.join(self.path, segment), allow_pickle = False) as data:
+        parts.append({ name: data[name] for name in data.files })
+
+    if not parts:
+      return self._arrays([])
+    columns = { name: np.concatenate([part[name] for part in parts]) for name in parts[0] }
+    order = np.lexsort((columns['page'], columns['rank']))
+    return { name: values[order] for name, values in columns.items() }
+
+  def compact (self) -> None:
+    """Merge all segments into one"""
+
+    self.flush()
+    if len(self.segments) <= 1:
+      return
+
+    columns = self.columns()
+    old = self.segments
+    name = self._next_segment()
+    self._write_segment(name, columns)
+    self.segments = [name]
+    self._save_meta()
+    for segment in old:
+      os.remove(os.path.join(self.path, segment))
+
+  def rows (self) -> typing.Iterator[RankingRow]:
+    columns = self.columns()
+    question_ids = [question.question_id for question in self.questions]
+    for index in range(len(columns['rank'])):
+      solved = np.flatnonzero(columns['solve_time'][index])
+      yield RankingRow(
+        int(columns['rank'][index]), str(columns['username'][index]),
+        str(columns['country_code'][index]), str(columns['data_region'][index]),
+        int(columns['score'][index]), int(columns['finish_time'][index]),
+        { question_ids[column]: int(columns['solve_time'][index, column]) for column in solved },
+        { question_ids[column]: int(columns['fail_count'][index, column]) for column in solved }
+      )
+
+async def crawl_ranking (
+  api,
+  store: RankingStore, *,
+  region: str = 'global',
+  concurrency: int = 8,
+  flush_every: int = 40
+) -> RankingStore:
+  """Fetch the pages missing from store, returns store
+
+  At most `concurrency` pages are in flight; completed pages are flushed
+  every flush_every pages and when the crawl fails or is cancelled.
+  """
+
+  store.load()
+  if store.user_num is None:
+    store.add(await api.contest_ranking(contest_slug = store.contest_slug, page = 1, region = region))
+    store.flush()
+
+  pending = iter([page for page in range(1, store.page_count + 1) if page not in store.pages])
+
+  async def worker () -> None:
+    # the iterator is shared, every worker takes the next missing page
+    for page in pending:
+      store.add(await api.contest_ranking(contest_slug = store.contest_slug, page = page, region = region))
+      if store.buffered >= flush_every:
+        store.flush()
+
+  workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+  try:
+    await asyncio.gather(*workers)
+  finally:
+    for task in workers:
+      task.cancel()
+    await asyncio.gather(*workers, return_exceptions = True)
+    store.flush()
+
+  if store.complete:
+    store.compact()
+  return store
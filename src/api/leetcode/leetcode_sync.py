@@ -0,0 +1,147 @@
+"""
+api.leetcode.leetcode_sync
+--------------------------
+
+This module contains an incremental mirror of the signed in user's
+accepted submissions and per problem status. Accepted submissions
+are appended to an NDJSON file, and a cursor (the newest submission
+id already synced) in sync.json makes later syncs fetch only the
+newer pages. Pages are fetched in waves that start with a single
+page and widen up to `concurrency` pages in flight, so a routine
+sync costs one call while a first sync still pages in parallel.
+"""
+
+import asyncio
+import os
+import time
+import typing
+
+from .. import cache, jsoncodec
+from .leetcode_object import ProblemStatus, Submission
+
+class SyncStore:
+  def __init__ (self, path: str = None):
+    self.path = path if path is not None else cache.cache_path('leetcode', 'sync')
+    self.cursor = 0
+    self.synced_at = None
+    self.progress: typing.Dict[str, typing.Optional[str]] = {}
+
+  def _state_path (self) -> str:
+    return os.path.join(self.path, 'sync.json')
+
+  def _submissions_path (self) -> str:
+    return os.path.join(self.path, 'submissions.ndjson')
+
+  def load (self) -> 'SyncStore':
+    state = cache.read_json(self._state_path())
+    if state is not None:
+      self.cursor = state['cursor']
+      self.synced_at = state['synced_at']
+      self.progress = state['progress']
+    return self
+
+  def save (self) -> None:
+    cache.write_json(self._state_path(), {
+      'cursor': self.cursor,
+      'synced_at': self.synced_at,
+      'progress': self.progress,
+    })
+
+  def append (self, submissions: typing.List[Submission]) -> None:
+    if not submissions:
+      return
+    os.makedirs(self.path, exist_ok = True)
+    with open(self._submissions_path(), 'a', encoding = 'utf-8') as file:
+      file.writelines(jsoncodec.dumps(submission.to_dict()) + '\n' for submission in submissions)
+
+  def submissions (self) -> typing.List[Submission]:
+    """Stored submissions, oldest first"""
+
+    # appended before the cursor is saved, so an interrupted sync may repeat some
+    submissions = {}
+    try:
+      with open(self._submissions_path(), 'rb') as file:
+        for line in file:
+          if line.strip():
+            submission = Submission.from_dict(jsoncodec.loads(line))
+            submissions[submission.id] = submission
+    except FileNotFoundError:
+      pass
+    return sorted(submissions.values(), key = lambda submission: submission.id)
+
+  def solved (self) -> typing.List[str]:
+    return sorted(slug for slug, status in self.progress.items() if status == 'ac')
+
+async def sync_submissions (
+  api,
+  store: SyncStore, *,
+  page_size: int = 20,
+  concurrency: int = 4,
+  accepted_only: bool = True
+) -> typing.List[Submission]:
+  """Fetch the submissions newer than the store cursor, returns the ones stored"""
+
+  cursor = store.cursor
+  fetched = []
+  offset = 0
+  width = 1
+  done = False
+
+  while not done:
+    pages = await asyncio.gather(*(
+      api.submission_list(offset = offset + index * page_size, limit = page_size)
+      for index in range(width)
+    ))
+    offset += width * page_size
+    width = min(width * 2, concurrency)
+
+    for page in pages:
+      for submission in page.submissions:
+        if submission.id <= cursor:
+          done = True
+          break
+        fetched.append(submission)
+      if done or not page.has_next:
+        done = True
+        break
+
+  # offsets shift when new submissions arrive while paging, which repeats rows
+  fetched = list({ submission.id: submission for submission in fetched }.values())
+  fetched.sort(key = lambda submission: submission.id)
+
+  # the cursor stops below the oldest submission still judging, so it is seen again
+  pending = [submission.id for submission in fetched if submission.status is None]
+  if pending:
+    fetched = [submission for submission in fetched if submission.id < pending[0]]
+
+  stored = [
+    submission for submission in fetched
+    if not accepted_only or submission.status == 'Accepted'
+  ]
+  store.append(stored)
+  if fetched:
+    store.cursor = fetched[-1].id
+  return stored
+
+async def sync_progress (api, store: SyncStore) -> typing.List[ProblemStatus]:
+  """Refresh the per problem status, returns the problems whose status changed"""
+
+  changed = []
+  for problem in await api.problem_status():
+    if problem.slug not in store.progress or store.progress[problem.slug] != problem.status:
+      store.progress[problem.slug] = problem.status
+      changed.append(problem)
+  return changed
+
+async def sync (
+  api,
+  store: SyncStore, *,
+  page_size: int = 20,
+  concurrency: int = 4
+) -> typing.Tuple[typing.List[Submission], typing.List[ProblemStatus]]:
+  store.load()
+  submissions = await sync_submissions(api, store, page_size = page_size, concurrency = concurrency)
+  changed = await sync_progress(api, store)
+  store.synced_at = time.time()
+  store.save()
+  return submissions, changed
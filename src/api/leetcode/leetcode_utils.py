@@ -1,10 +1,13 @@
-import json
 import markdownify
 import re
+import typing
 import urllib.parse
 
+from .. import jsoncodec, profiling
 from .leetcode_object import (
-  Problem, ProblemURL
+  Problem, ProblemURL,
+  ContestQuestion, RankingRow, ContestRanking,
+  Submission, SubmissionList, ProblemStatus
 )
 from .leetcode_constants import leetcode_urls
 
@@ -18,18 +21,19 @@ def problem_parse (data: dict):
   dislikes = data.get('dislikes')
   
   content = data.get('content').strip().replace('<p>', '').replace('&nbsp;', '').replace('</p>', '')
-  statement = markdownify.markdownify(content)
+  with profiling.phase('leetcode.markdownify'):
+    statement = markdownify.markdownify(content)
   
   tags = []
   for tag in data.get('topicTags'):
     tags.append(tag.get('slug'))
   
-  _stats: dict = json.loads(data.get('stats'))
+  _stats: dict = jsoncodec.loads(data.get('stats'))
   total_accepted = _stats.get('totalAcceptedRaw')
   total_submissions = _stats.get('totalSubmissionRaw')
   acceptance_rate = _stats.get('acRate')
   hints = data.get('hints')
-  similar_problems = json.loads(data.get('similarQuestions'))
+  similar_problems = jsoncodec.loads(data.get('similarQuestions'))
   
   return Problem(
     id, frontend_id, title, slug, statement,
@@ -38,6 +42,56 @@ def problem_parse (data: dict):
     acceptance_rate, hints, similar_problems
   )
 
+def contest_ranking_parse (contest_slug: str, page: int, data: dict) -> ContestRanking:
+  questions = [
+    ContestQuestion(
+      question.get('id'), question.get('question_id'), question.get('credit'),
+      question.get('title'), question.get('title_slug')
+    )
+    for question in data.get('questions') or []
+  ]
+
+  rows = []
+  # submissions[i] belongs to total_rank[i], keyed by question_id
+  for row, submissions in zip(data.get('total_rank') or [], data.get('submissions') or []):
+    rows.append(RankingRow(
+      row.get('rank'), row.get('username'), row.get('country_code'), row.get('data_region'),
+      row.get('score'), row.get('finish_time'),
+      { int(question_id): submission.get('date') for question_id, submission in submissions.items() },
+      { int(question_id): submission.get('fail_count') for question_id, submission in submissions.items() }
+    ))
+
+  return ContestRanking(contest_slug, page, data.get('user_num'), questions, rows)
+
+def submission_list_parse (offset: int, data: dict) -> SubmissionList:
+  submissions = [
+    Submission(
+      int(submission.get('id')), submission.get('title'), submission.get('titleSlug'),
+      # pending submissions have no verdict yet
+      None if submission.get('isPending') not in (None, False, 'Not Pending') else submission.get('statusDisplay'),
+      submission.get('lang'), submission.get('runtime'), submission.get('memory'), int(submission.get('timestamp'))
+    )
+    for submission in data.get('submissions') or []
+  ]
+  return SubmissionList(offset, bool(data.get('hasNext')), submissions)
+
+def problem_status_parse (data: dict) -> typing.List[ProblemStatus]:
+  problems = []
+  for pair in data.get('stat_status_pairs') or []:
+    stat = pair.get('stat')
+    problems.append(ProblemStatus(
+      stat.get('frontend_question_id'), stat.get('question__title'), stat.get('question__title_slug'),
+      (pair.get('difficulty') or {}).get('level'), pair.get('paid_only'), pair.get('status')
+    ))
+  return problems
+
+def contest_slug_parse (contest: str) -> str:
+  """Contest slug from a slug or a contest url (example: https://leetcode.com/contest/weekly-contest-400/)"""
+
+  if not contest.startswith(leetcode_urls.get('contest')):
+    return contest.strip('/')
+  return urllib.parse.urlsplit(contest).path.split('/')[2]
+
 def problem_url_parse (url: str) -> ProblemURL:
   if not url.startswith(leetcode_urls.get('problems')):
     raise ValueError(f'problem url must start with "{leetcode_urls.get("problems")}"')
@@ -0,0 +1,291 @@
+"""
+api.objectcodec
+---------------
+
+This module contains a compact binary serialization for lists of
+Codeforces and LeetCode objects.
+
+Objects of one class are stored as a table with one column per
+attribute. Integer and float columns become native arrays, repeated
+values (verdicts, languages, handles) are dictionary encoded and
+nested objects are stored once in their own table and referenced by
+index. Arrays are exposed as pickle protocol 5 buffers, so they can
+travel out-of-band and are read back without copying.
+"""
+
+import array
+import importlib
+import itertools
+import pickle
+import struct
+import sys
+import time
+import typing
+
+from . import jsoncodec
+from .codeforces.cfobject import CodeforcesObject
+from .leetcode.leetcode_object import LeetcodeObject
+
+_OBJECT_TYPES = (CodeforcesObject, LeetcodeObject)
+_MAGIC = b'CPTOBJ1\n'
+_ALIGNMENT = 8
+
+def _buffer (values: array.array, out_of_band: bool) -> typing.Union[pickle.PickleBuffer, bytes]:
+  return pickle.PickleBuffer(values) if out_of_band else values.tobytes()
+
+def _unbuffer (data: typing.Any, typecode: str, byteorder: str) -> typing.List:
+  values = array.array(typecode)
+  values.frombytes(memoryview(data).cast('B'))
+  if byteorder != sys.byteorder:
+    values.byteswap()
+  return values.tolist()
+
+def _int_array (values: typing.List[int]) -> array.array:
+  # the narrowest signed type that holds every value
+  low = min(values, default = 0)
+  high = max(values, default = 0)
+  for typecode in 'bhiq':
+    limit = 1 << (8 * array.array(typecode).itemsize - 1)
+    if -limit <= low and high < limit:
+      return array.array(typecode, values)
+  raise OverflowError('integer column does not fit in 64 bits')
+
+def _typed (value: typing.Any) -> tuple:
+  # 1, 1.0 and True are equal dictionary keys, the type keeps them apart
+  if type(value) is tuple:
+    return (tuple, tuple(map(_typed, value)))
+  return (type(value), value)
+
+def _encode_column (values: typing.List, out_of_band: bool) -> tuple:
+  if all(type(value) is int for value in values):
+    try:
+      codes = _int_array(values)
+      return ('int', _buffer(codes, out_of_band), codes.typecode)
+    except OverflowError:
+      pass
+
+  if all(type(value) is float for value in values):
+    return ('float', _buffer(array.array('d', values), out_of_band))
+
+  if all(value is None or isinstance(value, _OBJECT_TYPES) for value in values) and \
+     any(value is not None for value in values):
+    unique, codes = _intern(values)
+    if unique is not None:
+      codes = _int_array(codes)
+      return ('object', _encode_table(unique, out_of_band), _buffer(codes, out_of_band), codes.typecode)
+
+  # interned (frozen) objects hold tuples instead of lists
+  sequence = type(values[0]) if values and type(values[0]) in (list, tuple) else None
+  if sequence is not None and all(type(value) is sequence for value in values) and \
+     any(isinstance(item, _OBJECT_TYPES) for value in values for item in value):
+    items = list(itertools.chain.from_iterable(values))
+    unique, codes = _intern(items)
+    if unique is not None:
+      codes = _int_array(codes)
+      lengths = _int_array(list(map(len, values)))
+      return (
+        'object_list' if sequence is list else 'object_tuple', _encode_table(unique, out_of_band),
+        _buffer(codes, out_of_band), codes.typecode,
+        _buffer(lengths, out_of_band), lengths.typecode
+      )
+
+  # lists such as tags are dictionary encoded as tuples and rebuilt as lists,
+  # tuples (tags of interned problems) are dictionary encoded as they are
+  kind = 'dictionary'
+  keys = values
+  if sequence is list and all(type(value) is list for value in values):
+    kind = 'list_dictionary'
+    keys = list(map(tuple, values))
+
+  try:
+    typed = list(map(_typed, keys))
+    dictionary = dict(zip(typed, keys))
+  except TypeError:
+    dictionary = None
+
+  if dictionary is not None and len(dictionary) <= len(values) // 2:
+    lookup = { key: code for code, key in enumerate(dictionary) }
+    codes = _int_array(list(map(lookup.__getitem__, typed)))
+    return (kind, list(dictionary.values()), _buffer(codes, out_of_band), codes.typecode)
+
+  return ('raw', values)
+
+def _intern (objects: typing.List) -> typing.Tuple[typing.Optional[typing.List], typing.List[int]]:
+  # nested objects shared by reference are stored once
+  unique = []
+  positions = {}
+  codes = []
+  cls = None
+
+  for obj in objects:
+    if obj is None:
+      codes.append(-1)
+      continue
+    if cls is None:
+      cls = type(obj)
+    elif type(obj) is not cls:
+      return None, []
+    position = positions.get(id(obj))
+    if position is None:
+      position = positions[id(obj)] = len(unique)
+      unique.append(obj)
+    codes.append(position)
+
+  return unique, codes
+
+def _encode_table (objects: typing.List, out_of_band: bool) -> tuple:
+  cls = type(objects[0])
+  fields = list(vars(objects[0]))
+
+  for obj in objects:
+    if type(obj) is not cls or len(vars(obj)) != len(fields):
+      raise ValueError('Only lists of objects with the same class and attributes can be encoded')
+
+  columns = [
+    _encode_column([obj.__dict__[field] for obj in objects], out_of_band)
+    for field in fields
+  ]
+  return (cls.__module__, cls.__qualname__, fields, len(objects), sys.byteorder, columns)
+
+def _decode_column (column: tuple, byteorder: str) -> typing.List:
+  kind = column[0]
+
+  if kind == 'int':
+    return _unbuffer(column[1], column[2], byteorder)
+  if kind == 'float':
+    return _unbuffer(column[1], 'd', byteorder)
+  if kind == 'object':
+    objects = _decode_table(column[1]) + [None]
+    return list(map(objects.__getitem__, _unbuffer(column[2], column[3], byteorder)))
+  if kind == 'object_list':
+    objects = _decode_table(column[1])
+    items = map(objects.__getitem__, _unbuffer(column[2], column[3], byteorder))
+    return [list(itertools.islice(items, length)) for length in _unbuffer(column[4], column[5], byteorder)]
+  if kind == 'object_tuple':
+    objects = _decode_table(column[1])
+    items = map(objects.__getitem__, _unbuffer(column[2], column[3], byteorder))
+    return [tuple(itertools.islice(items, length)) for length in _unbuffer(column[4], column[5], byteorder)]
+  if kind == 'dictionary':
+    return list(map(column[1].__getitem__, _unbuffer(column[2], column[3], byteorder)))
+  if kind == 'list_dictionary':
+    return list(map(list, map(column[1].__getitem__, _unbuffer(column[2], column[3], byteorder))))
+  return column[1]
+
+def _decode_table (table: tuple) -> typing.List:
+  module, qualname, fields, count, byteorder, columns = table
+  cls = getattr(importlib.import_module(module), qualname)
+  new = cls.__new__
+
+  objects = []
+  append = objects.append
+  for values in zip(*(_decode_column(column, byteorder) for column in columns)):
+    obj = new(cls)
+    obj.__dict__.update(zip(fields, values))
+    append(obj)
+
+  if len(objects) != count:
+    raise ValueError(f'Corrupted table, expected {count} objects but decoded {len(objects)}')
+  return objects
+
+class ObjectBatch:
+  """List of objects that pickles into the compact table format
+
+  With protocol 5 the column arrays are emitted as out-of-band buffers.
+  """
+
+  def __init__ (self, objects: typing.List):
+    self.objects = objects
+
+  def __reduce_ex__ (self, protocol: int):
+    table = _encode_table(self.objects, protocol >= 5) if self.objects else None
+    return _batch_from_table, (table,)
+
+  def __repr__ (self):
+    return f'<{self.__class__.__name__} [{len(self.objects)}]>'
+
+def _batch_from_table (table: typing.Optional[tuple]) -> ObjectBatch:
+  return ObjectBatch(_decode_table(table) if table is not None else [])
+
+def dumps (objects: typing.List) -> bytes:
+  buffers = []
+  header = pickle.dumps(ObjectBatch(objects), protocol = 5, buffer_callback = buffers.append)
+
+  chunks = [_MAGIC, struct.pack('<QQ', len(header), len(buffers)), header]
+  offset = sum(map(len, chunks))
+  for buffer in buffers:
+    raw = buffer.raw()
+    padding = -(offset + 8) % _ALIGNMENT
+    chunks.append(struct.pack('<Q', len(raw)) + b'\0' * padding)
+    chunks.append(raw)
+    offset += 8 + padding + len(raw)
+
+  return b''.join(chunks)
+
+def loads (data: typing.Union[bytes, bytearray, memoryview]) -> typing.List:
+  view = memoryview(data)
+  if bytes(view[:len(_MAGIC)]) != _MAGIC:
+    raise ValueError('Not an object codec payload')
+
+  offset = len(_MAGIC)
+  header_length, buffer_count = struct.unpack_from('<QQ', view, offset)
+  offset += 16
+  header = view[offset:offset + header_length]
+  offset += header_length
+
+  buffers = []
+  for _ in range(buffer_count):
+    (length,) = struct.unpack_from('<Q', view, offset)
+    offset += 8 + (-offset % _ALIGNMENT)
+    buffers.append(view[offset:offset + length])
+    offset += length
+
+  # same reasoning as jsoncodec: rebuilding millions of objects would
+  # otherwise trigger the cyclic garbage collector over and over
+  with jsoncodec.gc_paused():
+    return pickle.loads(header, buffers = buffers).objects
+
+def main ():
+  import json
+
+  from .codeforces.cfobject import submission_parse
+
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+  languages = ['GNU C++17', 'GNU C++20 (64)', 'Python 3', 'PyPy 3', 'Java 11']
+  verdicts = ['OK', 'WRONG_ANSWER', 'TIME_LIMIT_EXCEEDED', 'RUNTIME_ERROR']
+  payload = json.dumps({ 'status': 'OK', 'result': [
+    {
+      'id': 150000000 + i, 'contestId': 1642, 'creationTimeSeconds': 1646408543 + i,
+      'relativeTimeSeconds': i,
+      'problem': {
+        'contestId': 1642, 'index': 'ABCDEF'[i % 6], 'name': f'Problem {"ABCDEF"[i % 6]}',
+        'type': 'PROGRAMMING', 'points': 500.0 * (i % 6 + 1), 'rating': 800 + 100 * (i % 6),
+        'tags': ['implementation', 'math']
+      },
+      'author': {
+        'contestId': 1642, 'members': [{'handle': f'user{i % 20000}'}],
+        'participantType': 'CONTESTANT', 'ghost': False, 'startTimeSeconds': 1646408100
+      },
+      'programmingLanguage': languages[i % len(languages)], 'verdict': verdicts[i % len(verdicts)],
+      'testset': 'TESTS', 'passedTestCount': i % 50, 'timeConsumedMillis': i % 2000,
+      'memoryConsumedBytes': 1024 * (i % 4096)
+    }
+    for i in range(count)
+  ]}).encode()
+
+  start = time.perf_counter()
+  submissions = submission_parse(jsoncodec.loads(payload).get('result'))
+  parsed = time.perf_counter() - start
+
+  data = dumps(submissions)
+  start = time.perf_counter()
+  restored = loads(data)
+  loaded = time.perf_counter() - start
+
+  assert [s.to_dict() for s in restored[:1000]] == [s.to_dict() for s in submissions[:1000]]
+
+  print(f'Submissions: {count}')
+  print(f'JSON: {len(payload) / (1 << 20):8.1f} MiB, decode + parse {parsed:6.2f} s')
+  print(f'Binary: {len(data) / (1 << 20):6.1f} MiB, load {loaded:6.2f} s ({parsed / loaded:.1f}x faster)')
+
+if __name__ == '__main__':
+  main()
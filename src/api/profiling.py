@@ -0,0 +1,75 @@
+"""
+api.profiling
+-------------
+
+This module contains a phase profiler. Code marks its phases (a
+request, parsing, writing files) with the phase() context manager,
+which only costs a global lookup while profiling is off. Once
+enable() is called every phase adds its wall clock time to the
+active Profiler, and report() prints the breakdown.
+
+Phases of concurrent tasks overlap, so their times can add up to
+more than the wall clock time of the command.
+"""
+
+import contextlib
+import time
+import typing
+
+_profiler: typing.Optional['Profiler'] = None
+
+class Profiler:
+  def __init__ (self):
+    self.start = time.perf_counter()
+    self.end = None
+    self.phases: typing.Dict[str, typing.List[float]] = {}
+
+  def add (self, name: str, elapsed: float) -> None:
+    phase = self.phases.get(name)
+    if phase is None:
+      self.phases[name] = [1, elapsed, elapsed]
+    else:
+      phase[0] += 1
+      phase[1] += elapsed
+      phase[2] = max(phase[2], elapsed)
+
+  @property
+  def elapsed (self) -> float:
+    return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+  def report (self, file: typing.TextIO) -> None:
+    total = self.elapsed
+    width = max([len(name) for name in self.phases] + [len('total')])
+
+    print(f'{"phase":<{width}}  {"calls":>6}  {"total ms":>10}  {"max ms":>10}  {"%":>6}', file = file)
+    for name, (calls, elapsed, longest) in sorted(self.phases.items(), key = lambda item: -item[1][1]):
+      print(
+        f'{name:<{width}}  {calls:>6}  {elapsed * 1000:>10.1f}  {longest * 1000:>10.1f}  {elapsed / total * 100:>6.1f}',
+        file = file
+      )
+    print(f'{"total":<{width}}  {"":>6}  {total * 1000:>10.1f}  {"":>10}  {100:>6.1f}', file = file)
+
+def enable () -> Profiler:
+  global _profiler
+  _profiler = Profiler()
+  return _profiler
+
+def disable () -> typing.Optional[Profiler]:
+  global _profiler
+  profiler, _profiler = _profiler, None
+  if profiler is not None:
+    profiler.end = time.perf_counter()
+  return profiler
+
+@contextlib.contextmanager
+def phase (name: str) -> typing.Iterator[None]:
+  profiler = _profiler
+  if profiler is None:
+    yield
+    return
+
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    profiler.add(name, time.perf_counter() - start)
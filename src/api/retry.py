@@ -0,0 +1,146 @@
+"""
+api.retry
+---------
+
+This module contains a retry policy with exponential backoff,
+jitter and Retry-After support, and a circuit breaker that stops
+calls while an API keeps failing.
+"""
+
+import asyncio
+import email.utils
+import itertools
+import random
+import time
+import typing
+
+class CircuitOpenError (Exception):
+  """Calls are rejected because the circuit breaker is open"""
+
+  def __init__ (self, retry_after: float):
+    super().__init__(f'Circuit breaker is open, retry in {retry_after:.1f} seconds')
+    self.retry_after = retry_after
+
+def parse_retry_after (value: typing.Optional[str]) -> typing.Optional[float]:
+  """Parse a Retry-After header, given either in seconds or as an HTTP date"""
+
+  if not value:
+    return None
+  try:
+    return max(float(value), 0.0)
+  except ValueError:
+    pass
+  try:
+    return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+  except (TypeError, ValueError):
+    return None
+
+class CircuitBreaker:
+  def __init__ (self, *, failure_threshold: int = 5, reset_timeout: float = 60.0):
+    self.failure_threshold = failure_threshold
+    self.reset_timeout = reset_timeout
+    self.failures = 0
+    self.opened_at = None
+    self._probing = False
+
+  @property
+  def state (self) -> str:
+    if self.opened_at is None:
+      return 'closed'
+    if time.monotonic() - self.opened_at < self.reset_timeout:
+      return 'open'
+    return 'half-open'
+
+  def before_call (self) -> None:
+    state = self.state
+    if state == 'open' or (state == 'half-open' and self._probing):
+      remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+      raise CircuitOpenError(max(remaining, 0.0))
+    if state == 'half-open':
+      # a single probe call decides whether the circuit closes again
+      self._probing = True
+
+  def record_success (self) -> None:
+    self.failures = 0
+    self.opened_at = None
+    self._probing = False
+
+  def record_cancelled (self) -> None:
+    # a cancelled call says nothing about the API, but a cancelled probe
+    # must free the slot so that the next call can probe instead
+    self._probing = False
+
+  def record_failure (self) -> None:
+    self.failures += 1
+    if self._probing or self.failures >= self.failure_threshold:
+      self.opened_at = time.monotonic()
+    self._probing = False
+
+class RetryPolicy:
+  def __init__ (
+    self, *,
+    attempts: int = 5,
+    base_delay: float = 1.0,
+    multiplier: float = 2.0,
+    max_delay: float = 60.0,
+    jitter: float = 1.0,
+    retryable: typing.Tuple[typing.Type[BaseException], ...] = (),
+    transient: typing.Tuple[typing.Type[BaseException], ...] = (),
+    circuit_breaker: CircuitBreaker = None
+  ):
+    self.attempts = attempts
+    self.base_delay = base_delay
+    self.multiplier = multiplier
+    self.max_delay = max_delay
+    self.jitter = jitter
+    self.retryable = retryable
+    # retried with backoff too, but a healthy server answers with them
+    # (call limits), so they never count towards the circuit breaker
+    self.transient = transient
+    self.circuit_breaker = circuit_breaker
+
+  def is_retryable (self, error: BaseException) -> bool:
+    return isinstance(error, self.retryable) or isinstance(error, self.transient)
+
+  def is_transient (self, error: BaseException) -> bool:
+    return isinstance(error, self.transient)
+
+  def delay (self, attempt: int, error: BaseException = None) -> float:
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+      return min(retry_after, self.max_delay)
+
+    # exponential backoff where the jitter fraction of the delay is randomized
+    delay = min(self.base_delay * self.multiplier ** attempt, self.max_delay)
+    return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+  async def run (self, callback: typing.Callable[[], typing.Awaitable]) -> typing.Any:
+    breaker = self.circuit_breaker
+
+    for attempt in itertools.count():
+      if breaker is not None:
+        breaker.before_call()
+
+      try:
+        result = await callback()
+      except Exception as e:
+        retryable = self.is_retryable(e)
+        if breaker is not None:
+          # permanent errors (handle not found, ...) and transient ones (call
+          # limit exceeded) mean the API itself is up
+          if retryable and not self.is_transient(e):
+            breaker.record_failure()
+          else:
+            breaker.record_success()
+        if not retryable or attempt + 1 >= self.attempts:
+          raise
+        await asyncio.sleep(self.delay(attempt, e))
+      except BaseException:
+        # cancellation (deadlines, losing hedges, close()) is not an Exception
+        if breaker is not None:
+          breaker.record_cancelled()
+        raise
+      else:
+        if breaker is not None:
+          breaker.record_success()
+        return result
@@ -1,17 +1,103 @@
 #!/usr/bin/env python3
 
-import asyncio
-import fire
+import sys
+import typing
 
+from api.codeforces.codeforces_cli import CodeforcesCLI
+from api.cses.cses_cli import CSESCLI
 from api.leetcode.leetcode_cli import LeetcodeCLI
 
 class CLI:
+  # subcommand CLIs are cheap to construct, their API clients and heavy
+  # dependencies (aiohttp, markdownify) are imported on first use
   def __init__ (self):
+    self.codeforces = CodeforcesCLI()
+    self.cses = CSESCLI()
     self.leetcode = LeetcodeCLI()
 
-if __name__ == '__main__':
+  def _clients (self) -> typing.List[typing.Any]:
+    return self.codeforces._clients() + self.cses._clients() + self.leetcode._clients()
+
+def _close (cli: CLI) -> None:
+  clients = cli._clients()
+  if not clients:
+    return
+
+  import asyncio
+  # the loop fire ran the command on, which the sessions belong to
+  loop = asyncio.get_event_loop()
+  loop.run_until_complete(asyncio.gather(*(client.close() for client in clients)))
+
+def _profile_option (argv: typing.List[str]) -> typing.Tuple[typing.List[str], bool, typing.Optional[str]]:
+  """Strip --profile or --profile=FILE (a cProfile dump) from argv"""
+
+  rest = []
+  profile = False
+  output = None
+  for index, arg in enumerate(argv):
+    if arg == '--':
+      # everything after the separator belongs to fire
+      rest.extend(argv[index:])
+      break
+    if arg == '--profile':
+      profile = True
+    elif arg.startswith('--profile='):
+      profile = True
+      output = arg.partition('=')[2] or None
+    else:
+      rest.append(arg)
+  return rest, profile, output
+
+def run (argv: typing.List[str] = None, *, cli: CLI = None) -> None:
+  import fire
   fire.core.Display = lambda lines, out: print(*lines, file = out)
-  fire.Fire(CLI())
+
+  argv, profile, output = _profile_option(sys.argv[1:] if argv is None else list(argv))
+  owned = cli is None
+  cli = cli if cli is not None else CLI()
+
+  def command () -> None:
+    try:
+      fire.Fire(cli, command = argv, name = 'cpt.py')
+    finally:
+      # a one-shot run closes its sessions (waiting for background refreshes),
+      # the daemon passes its own CLI and keeps the sessions warm
+      if owned:
+        _close(cli)
+
+  if not profile:
+    command()
+    return
+
+  import cProfile
+  from api import profiling
+
+  profiler = profiling.enable()
+  cprofile = cProfile.Profile() if output is not None else None
+  try:
+    if cprofile is not None:
+      cprofile.runcall(command)
+    else:
+      command()
+  finally:
+    profiling.disable()
+    profiler.report(sys.stderr)
+    if cprofile is not None:
+      cprofile.dump_stats(output)
+      print(f'cProfile stats written to {output}', file = sys.stderr)
+
+def main ():
+  import daemon
+
+  # a running daemon (python daemon.py start) serves the command with warm
+  # sessions and a shared rate limiter, otherwise it is run in this process
+  code = daemon.forward(sys.argv[1:])
+  if code is not None:
+    sys.exit(code)
+  run()
+
+if __name__ == '__main__':
+  main()
 
 # if __name__ == '__main__':
 #   async def main ():
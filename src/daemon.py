@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+"""
+daemon
+------
+
+Optional resident daemon for the cpt CLI. The daemon keeps one CLI
+instance, its HTTP sessions, caches and the module level rate
+limiters alive and serves commands over a local Unix socket, so that
+repeated invocations neither pay interpreter and import start up
+nor reset the limiter budget. Command output is streamed back in
+JSON line frames as it is written, so exports keep constant memory.
+
+  python daemon.py start|stop|status|serve
+"""
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import typing
+
+def socket_path () -> str:
+  return os.environ.get('CPT_DAEMON_SOCKET') or \
+    os.path.join(tempfile.gettempdir(), f'cpt-{os.getuid()}.sock')
+
+def _request (message: dict, timeout: float = None) -> dict:
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+    client.settimeout(timeout)
+    client.connect(socket_path())
+    client.sendall(json.dumps(message).encode() + b'\n')
+    with client.makefile('rb') as stream:
+      return json.loads(stream.readline())
+
+# the daemon acknowledges a command before running it, a command itself may stay silent
+_ACK_TIMEOUT = 5.0
+_FRAME_SIZE = 1 << 16
+
+def is_running () -> bool:
+  if not os.path.exists(socket_path()):
+    return False
+  try:
+    _request({ 'control': 'ping' }, timeout = 1)
+  except (OSError, ValueError):
+    return False
+  return True
+
+def forward (argv: typing.List[str]) -> typing.Optional[int]:
+  """Run a command on the daemon, returns None if it was not started there
+
+  Without an acknowledgement (no daemon, or an empty or broken reply) the
+  caller runs the command in-process. Once the daemon started it, it is
+  never run twice: a reply cut short afterwards is an error.
+  """
+
+  if os.environ.get('CPT_NO_DAEMON') or not os.path.exists(socket_path()):
+    return None
+
+  started = False
+  try:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+      client.settimeout(_ACK_TIMEOUT)
+      client.connect(socket_path())
+      client.sendall(json.dumps({ 'argv': argv, 'cwd': os.getcwd() }).encode() + b'\n')
+
+      with client.makefile('rb') as stream:
+        if json.loads(stream.readline()).get('started') is not True:
+          raise ValueError('command was not acknowledged')
+        started = True
+        client.settimeout(None)
+
+        for line in stream:
+          frame = json.loads(line)
+          if 'code' in frame:
+            return frame['code']
+          for name, file in (('stdout', sys.stdout), ('stderr', sys.stderr)):
+            if name in frame:
+              file.write(frame[name])
+              file.flush()
+    raise ValueError('reply ended without an exit code')
+  except (OSError, ValueError) as e:
+    if not started:
+      return None
+    print(f'cpt daemon: {e}', file = sys.stderr)
+    return 1
+
+class _Frames:
+  """Output of the running command, sent in frames of consecutive writes to one stream"""
+
+  def __init__ (self, stream: typing.BinaryIO):
+    self.stream = stream
+    self.name = None
+    self.buffer: typing.List[str] = []
+    self.size = 0
+
+  def write (self, name: str, text: str) -> None:
+    if name != self.name:
+      self.flush()
+      self.name = name
+    self.buffer.append(text)
+    self.size += len(text)
+    if self.size >= _FRAME_SIZE:
+      self.flush()
+
+  def send (self, message: dict) -> None:
+    self.stream.write(json.dumps(message).encode() + b'\n')
+    self.stream.flush()
+
+  def flush (self) -> None:
+    if self.buffer:
+      text = ''.join(self.buffer)
+      self.buffer = []
+      self.size = 0
+      self.send({ self.name: text })
+
+class _FrameWriter (io.TextIOBase):
+  def __init__ (self, frames: _Frames, name: str):
+    self.frames = frames
+    self.name = name
+
+  def writable (self) -> bool:
+    return True
+
+  def write (self, text: str) -> int:
+    self.frames.write(self.name, text)
+    return len(text)
+
+  def flush (self) -> None:
+    self.frames.flush()
+
+def _invalid (message: typing.Any) -> typing.Optional[str]:
+  """Why a command message cannot be run, None if it can"""
+
+  # run(None) would parse the daemon's own sys.argv instead of the command
+  if not isinstance(message, dict):
+    return 'message is not an object'
+  argv = message.get('argv')
+  if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+    return 'argv must be a list of strings'
+  if not isinstance(message.get('cwd'), str):
+    return 'cwd must be a string'
+  return None
+
+def _execute (cli: typing.Any, argv: typing.List[str], cwd: str, frames: _Frames) -> int:
+  import contextlib
+
+  from cpt import run
+  from utils import cd
+
+  stdout = _FrameWriter(frames, 'stdout')
+  stderr = _FrameWriter(frames, 'stderr')
+  code = 0
+
+  with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+    try:
+      with cd(cwd):
+        run(argv, cli = cli)
+    except SystemExit as e:
+      code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+      print(f'{e.__class__.__name__}: {e}', file = sys.stderr)
+      code = 1
+
+  frames.flush()
+  return code
+
+def serve () -> None:
+  import asyncio
+
+  from cpt import CLI, _close
+
+  # commands are executed one at a time on this thread, and fire runs async
+  # commands on the thread's event loop, so sessions bound to it stay usable
+  asyncio.set_event_loop(asyncio.new_event_loop())
+  cli = CLI()
+
+  path = socket_path()
+  if os.path.exists(path):
+    os.unlink(path)
+
+  server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  # created owner only, there is no window where others could connect
+  umask = os.umask(0o177)
+  try:
+    server.bind(path)
+  finally:
+    os.umask(umask)
+  server.listen()
+
+  try:
+    while True:
+      connection, _ = server.accept()
+      with connection, connection.makefile('rwb') as stream:
+        try:
+          message = json.loads(stream.readline())
+        except ValueError:
+          continue
+
+        control = message.get('control') if isinstance(message, dict) else None
+        error = _invalid(message) if control is None else None
+        try:
+          if error is not None:
+            # not acknowledged, so a forwarding client runs the command itself
+            stream.write(json.dumps({ 'error': error }).encode() + b'\n')
+            stream.flush()
+          elif control is None:
+            frames = _Frames(stream)
+            frames.send({ 'started': True })
+            frames.send({ 'code': _execute(cli, message.get('argv'), message.get('cwd'), frames) })
+          else:
+            stream.write(json.dumps({ 'control': control }).encode() + b'\n')
+            stream.flush()
+        except OSError:
+          # the client went away, the daemon keeps serving
+          pass
+
+        if control == 'stop':
+          break
+  finally:
+    server.close()
+    os.unlink(path)
+    _close(cli)
+
+def start () -> None:
+  if is_running():
+    return
+  subprocess.Popen(
+    [sys.executable, os.path.abspath(__file__), 'serve'],
+    cwd = os.path.dirname(os.path.abspath(__file__)),
+    stdin = subprocess.DEVNULL,
+    stdout = subprocess.DEVNULL,
+    stderr = subprocess.DEVNULL,
+    start_new_session = True
+  )
+
+def stop () -> None:
+  if is_running():
+    _request({ 'control': 'stop' })
+
+def main ():
+  commands = {
+    'start': start,
+    'stop': stop,
+    'serve': serve,
+    'status': lambda: print('running' if is_running() else 'stopped'),
+  }
+
+  if len(sys.argv) != 2 or sys.argv[1] not in commands:
+    print(f'usage: {sys.argv[0]} {"|".join(commands)}', file = sys.stderr)
+    sys.exit(2)
+
+  commands[sys.argv[1]]()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+import typing
+
+_cpt = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cpt.py')
+
+_commands = [
+  ['--help'],
+  ['leetcode', '--help'],
+  ['leetcode', 'clone', '--help'],
+]
+
+def measure (argv: typing.List[str], repeat: int = 5) -> float:
+  timings = []
+
+  for _ in range(repeat):
+    start = time.perf_counter()
+    subprocess.run(argv, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    timings.append(time.perf_counter() - start)
+  
+  return statistics.median(timings)
+
+def slowest_imports (arguments: typing.List[str], count: int = 5) -> typing.List[typing.Tuple[int, str]]:
+  process = subprocess.run(
+    [sys.executable, '-X', 'importtime', _cpt, *arguments],
+    stdout = subprocess.DEVNULL,
+    stderr = subprocess.PIPE,
+    text = True
+  )
+
+  imports = []
+  for line in process.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line[len('import time:'):].split('|')
+    # only top level imports, nested ones are already part of their cumulative time
+    if not name.startswith('  '):
+      imports.append((int(cumulative), name.strip()))
+  
+  return sorted(imports, reverse = True)[:count]
+
+def main ():
+  interpreter = measure([sys.executable, '-c', 'pass'])
+  print(f'{"python -c pass":<32} {interpreter * 1000:8.1f} ms')
+
+  for arguments in _commands:
+    elapsed = measure([sys.executable, _cpt, *arguments])
+    print(f'{"cpt " + " ".join(arguments):<32} {elapsed * 1000:8.1f} ms')
+    for cumulative, name in slowest_imports(arguments):
+      print(f'{"":<4}{name:<28} {cumulative / 1000:8.1f} ms')
+
+if __name__ == '__main__':
+  main()
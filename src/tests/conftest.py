@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the modules import each other as top level packages (api, utils), like
+# cpt.py run from src does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+from api.blocking import BlockingClient, get_loop_thread
+
+class _Client:
+  def __init__ (self, pages: int):
+    self.pages = pages
+    self.threads = set()
+    self.closed = []
+    self.finished = []
+
+  async def page (self, number: int) -> list:
+    self.threads.add(threading.current_thread().name)
+    await asyncio.sleep(0)
+    return [number]
+
+  async def paginate (self):
+    try:
+      for number in range(self.pages):
+        yield await self.page(number)
+    finally:
+      self.finished.append(True)
+
+  async def close (self) -> None:
+    self.closed.append(True)
+
+def test_coroutines_run_on_the_background_loop ():
+  client = BlockingClient(_Client, 2)
+  assert client.page(3) == [3]
+  assert client._client.threads == { get_loop_thread().thread.name }
+  assert client.pages == 2
+
+def test_async_generators_become_iterators ():
+  client = BlockingClient(_Client, 3)
+  assert list(client.paginate()) == [[0], [1], [2]]
+  assert client._client.finished == [True]
+  assert client._client.threads == { get_loop_thread().thread.name }
+
+def test_abandoned_iteration_closes_the_generator ():
+  client = BlockingClient(_Client, 10)
+  pages = client.paginate()
+  assert next(pages) == [0]
+  pages.close()
+  assert client._client.finished == [True]
+
+def test_close_once ():
+  with BlockingClient(_Client, 1) as client:
+    pass
+  client.close()
+  assert client._client.closed == [True]
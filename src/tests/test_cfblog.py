@@ -0,0 +1,67 @@
+from api.codeforces.cfblog import BlogIndex, build_comment_tree, tokenize
+from api.codeforces.cfobject import BlogEntry, Comment
+
+def _blog (id: int, title: str, content: str = '') -> BlogEntry:
+  return BlogEntry(id, 'en', 0, 'author', title, content, 'en', 0, True, [], 0)
+
+def _comment (id: int, text: str, parent: int = None, rating: int = 0) -> Comment:
+  return Comment(id, 0, 'user', 'en', text, rating, parent)
+
+def _found (index: BlogIndex, query: str) -> list:
+  return [document for document, _ in index.search(query)]
+
+def test_tokenize_strips_markup ():
+  assert tokenize('<p>Segment &amp; Fenwick <b>trees</b></p> a') == ['segment', 'fenwick', 'trees']
+
+def test_search_needs_every_word (tmp_path):
+  index = BlogIndex(str(tmp_path / 'index.json'))
+  index.add_blog_entry(_blog(1, 'Segment tree beats', 'lazy propagation'))
+  index.add_comments(1, [_comment(10, 'segment tree with lazy tags'), _comment(11, 'use a fenwick tree')])
+
+  assert set(_found(index, 'segment lazy')) == { ('blog', 1, None), ('comment', 1, 10) }
+  assert _found(index, 'fenwick') == [('comment', 1, 11)]
+  assert _found(index, 'fenwick segment') == []
+
+def test_remove_touches_only_its_own_postings (tmp_path):
+  index = BlogIndex(str(tmp_path / 'index.json'))
+  index.add_comments(1, [_comment(10, 'dijkstra heap'), _comment(11, 'dijkstra')])
+  index.remove(('comment', 1, 10))
+
+  assert _found(index, 'dijkstra') == [('comment', 1, 11)]
+  assert 'heap' not in index.postings
+  index.remove(('comment', 1, 10))
+
+def test_reindexing_reuses_document_numbers (tmp_path):
+  index = BlogIndex(str(tmp_path / 'index.json'))
+  for version in range(5):
+    index.add_blog_entry(_blog(1, f'editorial version{version}'))
+    index.add_comments(1, [_comment(10, f'first comment v{version}')])
+
+  assert len(index.documents) == 2
+  assert _found(index, 'version4') == [('blog', 1, None)]
+  assert _found(index, 'version3') == []
+
+def test_save_and_load_round_trip (tmp_path):
+  path = str(tmp_path / 'index.json')
+  index = BlogIndex(path)
+  index.add_blog_entry(_blog(1, 'binary search'))
+  index.add_comments(1, [_comment(10, 'binary lifting'), _comment(11, 'ternary search')])
+  index.remove(('comment', 1, 10))
+  index.save()
+
+  loaded = BlogIndex(path).load()
+  assert _found(loaded, 'search') == _found(index, 'search')
+  loaded.add_comments(1, [_comment(12, 'binary search again')])
+  assert len(loaded.documents) == 3
+  assert set(_found(loaded, 'binary')) == { ('blog', 1, None), ('comment', 1, 12) }
+
+def test_comment_tree_aggregates ():
+  comments = [
+    _comment(1, 'root', rating = 5), _comment(2, 'reply', 1, 2),
+    _comment(3, 'nested', 2, 1), _comment(4, 'orphan', 99, 7),
+  ]
+  roots = build_comment_tree(comments)
+
+  assert [root.comment.id for root in roots] == [1, 4]
+  assert (roots[0].reply_count, roots[0].rating_sum) == (2, 8)
+  assert [node.depth for node in roots[0].walk()] == [0, 1, 2]
@@ -0,0 +1,48 @@
+from api.codeforces.cfindex import ProblemIndex
+from api.codeforces.cfobject import Problem, Submission
+
+def _problem (contest_id: int, index: str, rating: int, tags: list) -> Problem:
+  return Problem(contest_id, None, index, f'{contest_id}{index}', 'PROGRAMMING', None, rating, tags)
+
+def _solve (problem: Problem, verdict: str = 'OK') -> Submission:
+  return Submission(1, problem.contest_id, 0, 0, problem, None, 'Python 3', verdict, 'TESTS', 1, 1, 1, None)
+
+PROBLEMS = [
+  _problem(1, 'A', 800, ['math']),
+  _problem(1, 'B', 1250, ['dp', 'math']),
+  _problem(2, 'A', 1300, ['dp']),
+  _problem(2, 'B', 2000, ['graphs', 'dp']),
+  _problem(3, 'A', None, ['dp']),
+  _problem(3, 'B', 0, ['math']),
+]
+
+def _names (problems) -> list:
+  return [problem.name for problem in problems]
+
+def test_tags_all_and_any ():
+  index = ProblemIndex(PROBLEMS)
+  assert _names(index.query(tags = ['dp', 'math'])) == ['1B']
+  assert _names(index.query(tags = ['graphs', 'math'], any_tag = True)) == ['1A', '1B', '2B', '3B']
+  assert index.query(tags = ['strings']) == []
+
+def test_rating_bounds_are_exact_within_buckets ():
+  index = ProblemIndex(PROBLEMS)
+  assert _names(index.query(rating_low = 1260, rating_high = 2000)) == ['2A', '2B']
+  assert _names(index.query(rating_low = 1250, rating_high = 1299)) == ['1B']
+
+def test_unrated_problems_are_left_out_of_rating_queries ():
+  index = ProblemIndex(PROBLEMS)
+  assert _names(index.query(rating_high = 1000)) == ['1A']
+  assert _names(index.query(rating_low = 0)) == ['1A', '1B', '2A', '2B']
+  assert _names(index.query(tags = ['dp'])) == ['1B', '2A', '2B', '3A']
+
+def test_unsolved_by_every_handle ():
+  index = ProblemIndex(PROBLEMS)
+  index.add_submissions('alice', [_solve(PROBLEMS[1]), _solve(PROBLEMS[2], 'WRONG_ANSWER')])
+  index.add_submissions('bob', [_solve(PROBLEMS[3])])
+  assert _names(index.unsolved(['alice', 'bob'], tags = ['dp'])) == ['2A', '3A']
+  assert _names(index.unsolved(['carol'], tags = ['graphs'])) == ['2B']
+
+def test_duplicate_problems_are_indexed_once ():
+  index = ProblemIndex(PROBLEMS + [_problem(1, 'A', 800, ['math'])])
+  assert len(index.problems) == len(PROBLEMS)
@@ -0,0 +1,61 @@
+import pytest
+
+from api.codeforces.cfobject import (
+  FrozenParty, FrozenProblem, IdentityMap, Submission,
+  identity_map, problem_parse, submission_parse
+)
+
+def _problem (rating: int = 800) -> dict:
+  return { 'contestId': 1, 'index': 'A', 'name': 'A', 'type': 'PROGRAMMING', 'rating': rating, 'tags': ['math'] }
+
+def _author (handle: str = 'tourist', team_name: str = None) -> dict:
+  return { 'contestId': 1, 'members': [{ 'handle': handle }], 'participantType': 'CONTESTANT', 'ghost': False, 'teamName': team_name }
+
+def _submission (id: int, problem: dict = None, author: dict = None) -> dict:
+  return {
+    'id': id, 'contestId': 1, 'creationTimeSeconds': 1, 'relativeTimeSeconds': 1,
+    'problem': problem or _problem(), 'author': author or _author(),
+    'programmingLanguage': 'Python 3', 'verdict': 'OK', 'testset': 'TESTS',
+    'passedTestCount': 1, 'timeConsumedMillis': 1, 'memoryConsumedBytes': 1
+  }
+
+def test_parses_share_instances_within_an_identity_map ():
+  with identity_map():
+    first = submission_parse([_submission(1), _submission(2)])
+    second = submission_parse([_submission(3)])
+  assert first[0].problem is first[1].problem is second[0].problem
+  assert first[0].author is second[0].author
+  assert first[0].author.members[0] is second[0].author.members[0]
+  assert submission_parse([_submission(4)])[0].problem is not first[0].problem
+
+def test_interned_instances_are_read_only ():
+  problem = submission_parse([_submission(1)])[0].problem
+  assert type(problem) is FrozenProblem and problem.tags == ('math',)
+  with pytest.raises(AttributeError):
+    problem.rating = 900
+  with pytest.raises(AttributeError):
+    del problem.name
+
+def test_changed_data_replaces_the_canonical_instance ():
+  objects = IdentityMap()
+  old = objects.problem(_problem(800))
+  new = objects.problem(_problem(900))
+  assert new is not old and (old.rating, new.rating) == (800, 900)
+  assert objects.problem(_problem(900)) is new
+
+def test_teams_with_the_same_members_stay_apart ():
+  objects = IdentityMap()
+  assert objects.party(_author(team_name = 'red')) is not objects.party(_author(team_name = 'blue'))
+  assert type(objects.party(_author())) is FrozenParty
+
+def test_identity_map_is_bounded ():
+  objects = IdentityMap(max_size = 2)
+  for index in 'ABC':
+    objects.problem(dict(_problem(), index = index))
+  assert [key[2] for key in objects.problems] == ['B', 'C']
+
+def test_frozen_round_trip_through_dicts ():
+  submission = submission_parse([_submission(1)])[0]
+  restored = Submission.from_dict(submission.to_dict())
+  assert restored.to_dict() == submission.to_dict()
+  assert problem_parse([_problem()])[0].tags == ['math']
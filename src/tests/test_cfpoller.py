@@ -0,0 +1,83 @@
+import asyncio
+
+from api.codeforces.cfpoller import FirehosePoller, SeenIds
+
+class _Feed:
+  """Latest events newest first, like recentActions and problemset.recentStatus"""
+
+  def __init__ (self):
+    self.events = []
+    self.failures = 0
+
+  def publish (self, *events) -> None:
+    self.events.extend(events)
+
+  async def fetch (self, count: int) -> list:
+    if self.failures:
+      self.failures -= 1
+      raise ConnectionError('down')
+    return list(reversed(self.events))[:count]
+
+def _poller (feed: _Feed, **kwargs) -> FirehosePoller:
+  return FirehosePoller(feed.fetch, lambda event: event['id'], min_interval = 0, **kwargs)
+
+def test_seen_ids_forget_the_oldest ():
+  seen = SeenIds(size = 2)
+  assert seen.add(1) and seen.add(2) and not seen.add(1)
+  assert seen.add(3)
+  assert 1 not in seen and 3 in seen
+
+def test_overlapping_windows_deliver_each_event_once ():
+  feed = _Feed()
+  poller = _poller(feed, min_count = 5)
+  subscription = poller.subscribe()
+
+  async def scenario () -> list:
+    feed.publish({ 'id': 1 }, { 'id': 2 })
+    first = await poller.poll()
+    again = await poller.poll()
+    feed.publish({ 'id': 3 })
+    third = await poller.poll()
+    poller.close()
+    delivered = [event['id'] async for event in subscription]
+    return [[event['id'] for event in first], again, [event['id'] for event in third], delivered]
+
+  assert asyncio.run(scenario()) == [[1, 2], [], [3], [1, 2, 3]]
+
+def test_rejected_events_are_delivered_once_accepted ():
+  feed = _Feed()
+  poller = _poller(feed, accept = lambda event: event['verdict'] != 'TESTING')
+  feed.publish({ 'id': 1, 'verdict': 'TESTING' })
+
+  async def scenario () -> list:
+    first = await poller.poll()
+    feed.events[0] = { 'id': 1, 'verdict': 'OK' }
+    second = await poller.poll()
+    third = await poller.poll()
+    return [len(first), [event['verdict'] for event in second], len(third)]
+
+  assert asyncio.run(scenario()) == [0, ['OK'], 0]
+
+def test_full_window_without_overlap_widens ():
+  feed = _Feed()
+  poller = _poller(feed, min_count = 2, max_count = 8)
+  feed.publish(*({ 'id': id } for id in range(10)))
+  asyncio.run(poller.poll())
+  assert poller.count == 4
+
+def test_run_survives_errors_and_closes_subscriptions ():
+  feed = _Feed()
+  feed.failures = 2
+  feed.publish({ 'id': 1 })
+  poller = _poller(feed, max_interval = 0)
+  subscription = poller.subscribe()
+
+  async def scenario () -> list:
+    task = asyncio.ensure_future(poller.run())
+    first = await asyncio.wait_for(subscription.__anext__(), 5)
+    task.cancel()
+    rest = [event async for event in subscription]
+    return [first['id'], rest, poller.subscribers]
+
+  assert asyncio.run(scenario()) == [1, [], []]
+  assert isinstance(poller.last_error, ConnectionError)
@@ -0,0 +1,51 @@
+import asyncio
+import concurrent.futures
+import json
+
+from api.codeforces import codeforces
+from api.codeforces.cfobject import submission_parse
+
+def _body (result) -> bytes:
+  return json.dumps({ 'status': 'OK', 'result': result }).encode()
+
+SUBMISSIONS = [
+  {
+    'id': 100 + i, 'contestId': 1, 'creationTimeSeconds': 1000 + i, 'relativeTimeSeconds': i,
+    'problem': { 'contestId': 1, 'index': 'AB'[i % 2], 'name': 'AB'[i % 2], 'type': 'PROGRAMMING', 'rating': 800, 'tags': ['math'] },
+    'author': { 'contestId': 1, 'members': [{ 'handle': f'user{i % 3}' }], 'participantType': 'CONTESTANT', 'ghost': False },
+    'programmingLanguage': 'Python 3', 'verdict': 'OK', 'testset': 'TESTS',
+    'passedTestCount': i, 'timeConsumedMillis': 15, 'memoryConsumedBytes': 1024
+  }
+  for i in range(20)
+]
+
+STANDINGS = {
+  'contest': { 'id': 1, 'name': 'Round', 'type': 'CF', 'phase': 'FINISHED', 'frozen': False, 'durationSeconds': 7200 },
+  'problems': [{ 'contestId': 1, 'index': 'A', 'name': 'A', 'type': 'PROGRAMMING', 'tags': [] }],
+  'rows': [],
+}
+
+def _offloaded (body: bytes, parser):
+  async def decode ():
+    with concurrent.futures.ProcessPoolExecutor(1) as executor:
+      return await codeforces._decode(body, parser, executor)
+  return asyncio.run(decode())
+
+def test_offloaded_objects_match_in_process_parse ():
+  body = _body(SUBMISSIONS)
+  expected = codeforces._decode_and_parse(body, submission_parse)
+  assert [submission.to_dict() for submission in _offloaded(body, submission_parse)] == [
+    submission.to_dict() for submission in expected
+  ]
+
+def test_offloaded_tuples_and_plain_results ():
+  contest, problems, rows = _offloaded(_body(STANDINGS), codeforces._contest_standings_parse)
+  assert (contest.name, [problem.index for problem in problems], rows) == ('Round', ['A'], [])
+  assert _offloaded(_body({ 'x': [1, 2] }), codeforces._result) == { 'x': [1, 2] }
+
+def test_encode_keeps_structure ():
+  parsed = codeforces._decode_and_parse(_body(SUBMISSIONS), submission_parse)
+  encoded = codeforces._encode((parsed, parsed[0], [], { 'a': 1 }))
+  objects, single, empty, plain = codeforces._unencode(encoded)
+  assert [submission.id for submission in objects] == [submission.id for submission in parsed]
+  assert single.id == parsed[0].id and empty == [] and plain == { 'a': 1 }
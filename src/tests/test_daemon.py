@@ -0,0 +1,53 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import daemon
+
+@pytest.mark.parametrize('message, error', [
+  ({ 'argv': ['codeforces', 'contests'], 'cwd': '/' }, None),
+  ({ 'cwd': '/' }, 'argv must be a list of strings'),
+  ({ 'argv': 'codeforces contests', 'cwd': '/' }, 'argv must be a list of strings'),
+  ({ 'argv': ['codeforces', 1], 'cwd': '/' }, 'argv must be a list of strings'),
+  ({ 'argv': [] }, 'cwd must be a string'),
+  (['codeforces'], 'message is not an object'),
+])
+def test_invalid_messages (message, error):
+  assert daemon._invalid(message) == error
+
+def test_serve_rejects_a_command_without_argv (tmp_path, monkeypatch):
+  path = str(tmp_path / 'cpt.sock')
+  monkeypatch.setenv('CPT_DAEMON_SOCKET', path)
+  server = threading.Thread(target = daemon.serve, daemon = True)
+  server.start()
+  for _ in range(100):
+    if os.path.exists(path):
+      break
+    threading.Event().wait(0.05)
+
+  assert daemon._request({ 'cwd': str(tmp_path) }, timeout = 5) == { 'error': 'argv must be a list of strings' }
+  assert daemon._request({ 'control': 'stop' }, timeout = 5) == { 'control': 'stop' }
+  server.join(5)
+  assert not server.is_alive()
+
+def test_frames_group_writes_per_stream ():
+  class Stream:
+    def __init__ (self):
+      self.lines = []
+    def write (self, data):
+      self.lines.append(json.loads(data))
+    def flush (self):
+      pass
+
+  stream = Stream()
+  frames = daemon._Frames(stream)
+  out = daemon._FrameWriter(frames, 'stdout')
+  err = daemon._FrameWriter(frames, 'stderr')
+  out.write('a')
+  out.write('b')
+  err.write('c')
+  out.flush()
+  assert stream.lines == [{ 'stdout': 'ab' }, { 'stderr': 'c' }]
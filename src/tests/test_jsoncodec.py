@@ -0,0 +1,62 @@
+import gc
+import json
+import threading
+
+import pytest
+
+from api import jsoncodec
+
+CODECS = [codec.name for codec in jsoncodec.available_codecs()]
+
+@pytest.fixture(params = CODECS)
+def codec (request):
+  previous = jsoncodec._codec
+  yield jsoncodec.set_codec(request.param)
+  jsoncodec._codec = previous
+
+def test_non_string_keys_match_json (codec):
+  value = { 1: 'a', 'b': [1, 2.5, None, True], 'c': { 2: False } }
+  assert json.loads(jsoncodec.dumps(value)) == json.loads(json.dumps(value))
+
+def test_round_trip (codec):
+  value = { 'status': 'OK', 'result': [{ 'id': 1, 'handle': 'tourist', 'rating': 3779.5 }] }
+  assert jsoncodec.loads(jsoncodec.dumps(value)) == value
+  assert jsoncodec.loads(jsoncodec.dumps(value).encode()) == value
+
+def test_large_payloads_restore_the_collector (codec):
+  payload = jsoncodec._sample_payload(5000)
+  assert len(payload) >= jsoncodec._GC_PAUSE_THRESHOLD
+  assert len(jsoncodec.loads(payload)['result']) == 5000
+  assert gc.isenabled()
+
+def test_overlapping_pauses_are_counted ():
+  inside = threading.Event()
+  release = threading.Event()
+
+  def pause ():
+    with jsoncodec.gc_paused():
+      inside.set()
+      release.wait(5)
+
+  thread = threading.Thread(target = pause)
+  thread.start()
+  inside.wait(5)
+  with jsoncodec.gc_paused():
+    pass
+  assert not gc.isenabled()
+  release.set()
+  thread.join()
+  assert gc.isenabled()
+
+def test_pause_keeps_a_disabled_collector_disabled ():
+  gc.disable()
+  try:
+    with jsoncodec.gc_paused():
+      pass
+    assert not gc.isenabled()
+  finally:
+    gc.enable()
+
+def test_unknown_codec ():
+  with pytest.raises(ValueError):
+    jsoncodec.get_codec('simplejson')
@@ -0,0 +1,71 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from api.leetcode.leetcode_object import ContestQuestion, ContestRanking, RankingRow
+from api.leetcode.leetcode_ranking import PAGE_SIZE, RankingStore, _expand, _ranges, crawl_ranking
+
+QUESTIONS = [ContestQuestion(1, 101, 3, 'A', 'a'), ContestQuestion(2, 102, 5, 'B', 'b')]
+USERS = PAGE_SIZE * 4 + 3
+
+class _API:
+  def __init__ (self, fail_on: int = None):
+    self.pages = []
+    self.fail_on = fail_on
+
+  async def contest_ranking (self, *, contest_slug: str, page: int, region: str) -> ContestRanking:
+    await asyncio.sleep(0)
+    if page == self.fail_on:
+      raise ConnectionError(f'page {page}')
+    self.pages.append(page)
+    first = (page - 1) * PAGE_SIZE
+    rows = [
+      RankingRow(
+        rank, f'user{rank}', 'US', 'US', 8 - rank % 2, 1000 + rank,
+        { 101: 60 * rank } if rank % 3 else {}, { 101: rank % 2 } if rank % 3 else {}
+      )
+      for rank in range(first + 1, min(first + PAGE_SIZE, USERS) + 1)
+    ]
+    return ContestRanking(contest_slug, page, USERS, QUESTIONS, rows)
+
+def test_page_ranges ():
+  assert _ranges([5, 1, 2, 3, 7]) == [[1, 3], [5, 5], [7, 7]]
+  assert _expand(_ranges({ 1, 2, 4 })) == { 1, 2, 4 }
+
+def test_crawl_stores_every_row_once (tmp_path):
+  api = _API()
+  store = asyncio.run(crawl_ranking(api, RankingStore('weekly', str(tmp_path)), concurrency = 3, flush_every = 2))
+
+  assert store.complete and len(store.segments) == 1
+  assert sorted(api.pages) == [1, 2, 3, 4, 5]
+  rows = list(RankingStore('weekly', str(tmp_path)).load().rows())
+  assert [row.rank for row in rows] == list(range(1, USERS + 1))
+  assert rows[0].solve_times == { 101: 60 } and rows[2].solve_times == {}
+
+def test_interrupted_crawl_resumes_with_missing_pages (tmp_path):
+  with pytest.raises(ConnectionError):
+    asyncio.run(crawl_ranking(_API(fail_on = 4), RankingStore('weekly', str(tmp_path)), concurrency = 1, flush_every = 10))
+
+  interrupted = RankingStore('weekly', str(tmp_path)).load()
+  assert interrupted.pages == { 1, 2, 3 } and not interrupted.complete
+
+  api = _API()
+  store = asyncio.run(crawl_ranking(api, RankingStore('weekly', str(tmp_path)), concurrency = 2))
+  assert sorted(api.pages) == [4, 5]
+  assert store.complete
+  columns = store.columns()
+  assert np.array_equal(columns['rank'], np.arange(1, USERS + 1))
+  assert columns['solve_time'].shape == (USERS, len(QUESTIONS))
+
+def test_finished_crawl_fetches_nothing (tmp_path):
+  asyncio.run(crawl_ranking(_API(), RankingStore('weekly', str(tmp_path))))
+  api = _API()
+  asyncio.run(crawl_ranking(api, RankingStore('weekly', str(tmp_path))))
+  assert api.pages == []
+
+def test_clear (tmp_path):
+  store = asyncio.run(crawl_ranking(_API(), RankingStore('weekly', str(tmp_path))))
+  store.clear()
+  assert RankingStore('weekly', str(tmp_path)).load().user_num is None
+  assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+import asyncio
+
+from api.leetcode.leetcode_object import ProblemStatus, Submission, SubmissionList
+from api.leetcode.leetcode_sync import SyncStore, sync
+
+def _submission (id: int, status: str = 'Accepted') -> Submission:
+  return Submission(id, f'Problem {id}', f'problem-{id}', status, 'python3', '40 ms', '16 MB', 1700000000 + id)
+
+class _API:
+  """Submissions newest first, paged by offset like the GraphQL submissionList"""
+
+  def __init__ (self):
+    self.submissions = []
+    self.statuses = []
+    self.calls = []
+
+  def submit (self, *submissions) -> None:
+    self.submissions[:0] = reversed(submissions)
+
+  async def submission_list (self, *, offset: int, limit: int) -> SubmissionList:
+    await asyncio.sleep(0)
+    self.calls.append(offset)
+    page = self.submissions[offset:offset + limit]
+    return SubmissionList(offset, offset + limit < len(self.submissions), page)
+
+  async def problem_status (self) -> list:
+    return self.statuses
+
+def _sync (api: _API, path: str) -> tuple:
+  return asyncio.run(sync(api, SyncStore(path), page_size = 2, concurrency = 4))
+
+def _ids (submissions) -> list:
+  return [submission.id for submission in submissions]
+
+def test_first_sync_pages_everything_and_keeps_accepted (tmp_path):
+  api = _API()
+  api.submit(*(_submission(id, 'Accepted' if id % 2 else 'Wrong Answer') for id in range(1, 12)))
+  stored, _ = _sync(api, str(tmp_path))
+
+  assert _ids(stored) == [1, 3, 5, 7, 9, 11]
+  store = SyncStore(str(tmp_path)).load()
+  assert store.cursor == 11
+  assert _ids(store.submissions()) == [1, 3, 5, 7, 9, 11]
+
+def test_later_syncs_stop_at_the_cursor (tmp_path):
+  api = _API()
+  api.submit(*(_submission(id) for id in range(1, 12)))
+  _sync(api, str(tmp_path))
+
+  api.calls = []
+  assert _ids(_sync(api, str(tmp_path))[0]) == []
+  assert api.calls == [0]
+
+  api.submit(_submission(12), _submission(13))
+  assert _ids(_sync(api, str(tmp_path))[0]) == [12, 13]
+  assert _ids(SyncStore(str(tmp_path)).load().submissions()) == list(range(1, 14))
+
+def test_cursor_stops_below_pending_submissions (tmp_path):
+  api = _API()
+  api.submit(_submission(1), _submission(2), _submission(3, None), _submission(4))
+  assert _ids(_sync(api, str(tmp_path))[0]) == [1, 2]
+  assert SyncStore(str(tmp_path)).load().cursor == 2
+
+  api.submissions[1] = _submission(3)
+  assert _ids(_sync(api, str(tmp_path))[0]) == [3, 4]
+  assert SyncStore(str(tmp_path)).load().cursor == 4
+
+def test_progress_reports_changes_only (tmp_path):
+  api = _API()
+  api.statuses = [ProblemStatus(1, 'A', 'a', 1, False, 'ac'), ProblemStatus(2, 'B', 'b', 2, False, 'notac')]
+  _, changed = _sync(api, str(tmp_path))
+  assert [problem.slug for problem in changed] == ['a', 'b']
+
+  api.statuses[1] = ProblemStatus(2, 'B', 'b', 2, False, 'ac')
+  _, changed = _sync(api, str(tmp_path))
+  assert [problem.slug for problem in changed] == ['b']
+  store = SyncStore(str(tmp_path)).load()
+  assert store.solved() == ['a', 'b'] and store.synced_at is not None
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from api import objectcodec
+from api.codeforces.cfobject import FrozenProblem, Problem, identity_map, submission_parse
+
+def _submission (id: int, index: str, handle: str, verdict: str) -> dict:
+  return {
+    'id': id, 'contestId': 1, 'creationTimeSeconds': 1600000000 + id, 'relativeTimeSeconds': id,
+    'problem': { 'contestId': 1, 'index': index, 'name': f'Problem {index}', 'type': 'PROGRAMMING', 'rating': 800, 'tags': ['math', 'dp'] },
+    'author': { 'contestId': 1, 'members': [{ 'handle': handle }], 'participantType': 'CONTESTANT', 'ghost': False },
+    'programmingLanguage': 'GNU C++17', 'verdict': verdict, 'testset': 'TESTS',
+    'passedTestCount': id % 7, 'timeConsumedMillis': 15 * id, 'memoryConsumedBytes': 1 << 40
+  }
+
+SUBMISSIONS = [_submission(id, 'ABC'[id % 3], f'user{id % 4}', ['OK', 'WRONG_ANSWER'][id % 2]) for id in range(40)]
+
+def _dicts (objects) -> list:
+  return [obj.to_dict() for obj in objects]
+
+def test_round_trip_of_interned_submissions ():
+  with identity_map():
+    submissions = submission_parse(SUBMISSIONS)
+  restored = objectcodec.loads(objectcodec.dumps(submissions))
+
+  assert _dicts(restored) == _dicts(submissions)
+  # shared (frozen) instances stay shared and frozen
+  assert restored[0].problem is restored[3].problem
+  assert type(restored[0].problem) is FrozenProblem
+  assert isinstance(restored[0].problem.tags, tuple)
+
+def test_round_trip_of_plain_objects_keeps_lists ():
+  problems = [Problem(1, None, index, index, 'PROGRAMMING', 500.0, 800, ['math']) for index in 'ABCDEF']
+  restored = objectcodec.loads(objectcodec.dumps(problems))
+  assert _dicts(restored) == _dicts(problems)
+  assert type(restored[0].tags) is list
+
+def test_equal_values_of_different_types_stay_apart ():
+  values = [1, 1.0, True, (1,), (True,), None] * 4
+  problems = [Problem(1, None, 'A', 'A', 'PROGRAMMING', value, 800, []) for value in values]
+  restored = [problem.points for problem in objectcodec.loads(objectcodec.dumps(problems))]
+  assert restored == values
+  assert [type(value) for value in restored] == [type(value) for value in values]
+  assert [type(value[0]) for value in restored if type(value) is tuple] == [int, bool] * 4
+
+def test_batches_pickle_in_and_out_of_band ():
+  problems = [Problem(1, None, str(index), 'A', 'PROGRAMMING', 0.5, index, ['dp']) for index in range(100)]
+  for protocol in (4, 5):
+    restored = pickle.loads(pickle.dumps(objectcodec.ObjectBatch(problems), protocol = protocol))
+    assert _dicts(restored.objects) == _dicts(problems)
+
+def test_empty_and_invalid_payloads ():
+  assert objectcodec.loads(objectcodec.dumps([])) == []
+  with pytest.raises(ValueError):
+    objectcodec.loads(b'not a payload')
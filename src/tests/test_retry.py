@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+
+from api.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+def _policy (breaker: CircuitBreaker, **kwargs) -> RetryPolicy:
+  return RetryPolicy(base_delay = 0, jitter = 0, retryable = (ValueError,), circuit_breaker = breaker, **kwargs)
+
+async def _fail ():
+  raise ValueError('down')
+
+async def _ok ():
+  return 'ok'
+
+def test_breaker_opens_after_threshold ():
+  breaker = CircuitBreaker(failure_threshold = 2, reset_timeout = 60)
+  policy = _policy(breaker, attempts = 2)
+
+  with pytest.raises(ValueError):
+    asyncio.run(policy.run(_fail))
+  assert breaker.state == 'open'
+  with pytest.raises(CircuitOpenError):
+    asyncio.run(policy.run(_ok))
+
+def test_half_open_probe_closes_or_reopens ():
+  breaker = CircuitBreaker(failure_threshold = 1, reset_timeout = 0)
+  policy = _policy(breaker, attempts = 1)
+
+  with pytest.raises(ValueError):
+    asyncio.run(policy.run(_fail))
+  assert breaker.state == 'half-open'
+  with pytest.raises(ValueError):
+    asyncio.run(policy.run(_fail))
+  assert breaker.state == 'half-open'
+  assert asyncio.run(policy.run(_ok)) == 'ok'
+  assert breaker.state == 'closed'
+
+def test_cancelled_probe_frees_the_probe_slot ():
+  breaker = CircuitBreaker(failure_threshold = 1, reset_timeout = 0)
+  policy = _policy(breaker, attempts = 1)
+  with pytest.raises(ValueError):
+    asyncio.run(policy.run(_fail))
+
+  async def cancel_probe ():
+    task = asyncio.ensure_future(policy.run(lambda: asyncio.sleep(10)))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+      await task
+
+  asyncio.run(cancel_probe())
+  assert asyncio.run(policy.run(_ok)) == 'ok'
+  assert breaker.state == 'closed'
+
+def test_permanent_errors_keep_the_circuit_closed ():
+  breaker = CircuitBreaker(failure_threshold = 1)
+  policy = RetryPolicy(retryable = (OSError,), circuit_breaker = breaker)
+
+  for _ in range(3):
+    with pytest.raises(ValueError):
+      asyncio.run(policy.run(_fail))
+  assert breaker.state == 'closed'
+
+def test_transient_errors_are_retried_but_not_counted ():
+  breaker = CircuitBreaker(failure_threshold = 1)
+  policy = _policy(breaker, attempts = 3, transient = (KeyError,))
+  calls = []
+
+  async def limited ():
+    calls.append(1)
+    raise KeyError('call limit exceeded')
+
+  with pytest.raises(KeyError):
+    asyncio.run(policy.run(limited))
+  assert len(calls) == 3
+  assert breaker.state == 'closed'
+
+def test_retry_after_overrides_backoff ():
+  error = ValueError()
+  error.retry_after = 5.0
+  assert RetryPolicy(max_delay = 3).delay(0, error) == 3
+  assert RetryPolicy(jitter = 0).delay(2) == 4